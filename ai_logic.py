@@ -1,8 +1,18 @@
 from datetime import datetime, timedelta
+import numpy as np
 from models import ParkingSlot
+from free_time_model import free_time_model, PRIOR_DURATION_MINUTES
+from metrics import timed
 
 ZONE_SCORES = {"A": 100, "B": 70, "C": 40}
-AVG_PARKING_DURATION = 60
+# Only the free-time model's fallback now; predictions come from booking history
+AVG_PARKING_DURATION = PRIOR_DURATION_MINUTES
+AVAILABLE_BONUS = 50
+FREEING_SOON_BONUS = 30
+FREEING_SOON_MINUTES = 15
+# Nearby search: each km of distance costs this many score points
+DISTANCE_PENALTY_PER_KM = 100
+MAX_SLOT_SCORE = max(ZONE_SCORES.values()) + AVAILABLE_BONUS
 
 def calculate_slot_score(slot: ParkingSlot) -> int:
     score = 0
@@ -10,11 +20,11 @@ def calculate_slot_score(slot: ParkingSlot) -> int:
     score += ZONE_SCORES.get(slot.zone, 0)
     
     if not slot.is_occupied:
-        score += 50
+        score += AVAILABLE_BONUS
     else:
         estimated_free = predict_free_time(slot)
-        if estimated_free < 15:
-            score += 30
+        if estimated_free < FREEING_SOON_MINUTES:
+            score += FREEING_SOON_BONUS
     
     return score
 
@@ -22,13 +32,75 @@ def predict_free_time(slot: ParkingSlot) -> int:
     if not slot.is_occupied or not slot.last_occupied_time:
         return 0
     
-    elapsed = (datetime.utcnow() - slot.last_occupied_time).total_seconds() / 60
-    remaining = max(0, AVG_PARKING_DURATION - elapsed)
+    remaining = free_time_model.remaining_minutes(
+        slot.zone, getattr(slot, "occupied_vehicle_type", None), slot.last_occupied_time
+    )
     return int(remaining)
 
 def recommend_best_slot(slots: list) -> ParkingSlot or None:
     if not slots:
         return None
     
-    best_slot = max(slots, key=lambda s: calculate_slot_score(s))
-    return best_slot
+    scores = score_slots(slots)
+    return slots[int(np.argmax(scores))]
+
+# ─────────────────────────────────────────
+#  Batched (columnar) scoring
+# ─────────────────────────────────────────
+
+_EPOCH = datetime(1970, 1, 1)
+
+def _to_epoch(values) -> np.ndarray:
+    return np.array(
+        [(v - _EPOCH).total_seconds() if v is not None else np.nan for v in values],
+        dtype=np.float64,
+    )
+
+@timed("scoring")
+def score_slot_columns(zones, is_occupied, last_occupied_time, now: datetime = None,
+                       vehicle_types=None) -> np.ndarray:
+    """Score every slot in one pass; same rules as calculate_slot_score.
+
+    vehicle_types are those of the parked vehicles (None where unknown).
+    """
+    now = now or datetime.utcnow()
+    occupied = np.asarray(is_occupied, dtype=bool)
+    if not len(occupied):
+        return np.zeros(0, dtype=np.int64)
+
+    zones = np.asarray(zones)
+    scores = np.zeros(len(zones), dtype=np.int64)
+    for label, weight in ZONE_SCORES.items():
+        scores[zones == label] = weight
+
+    if isinstance(last_occupied_time, np.ndarray) and last_occupied_time.dtype == np.float64:
+        last_ts = last_occupied_time
+    else:
+        last_ts = _to_epoch(last_occupied_time)
+    remaining = np.zeros(len(occupied))
+    if occupied.any():
+        # Batch inference only for the occupied slots
+        rows = np.flatnonzero(occupied)
+        remaining[rows] = free_time_model.predict_remaining(
+            zones[rows],
+            None if vehicle_types is None else np.asarray(vehicle_types, dtype=object)[rows],
+            last_ts[rows],
+            (now - _EPOCH).total_seconds(),
+        )
+        remaining = np.floor(remaining)  # whole minutes, as predict_free_time returns
+
+    scores = scores + np.where(
+        occupied,
+        np.where(remaining < FREEING_SOON_MINUTES, FREEING_SOON_BONUS, 0),
+        AVAILABLE_BONUS,
+    )
+    return scores
+
+def score_slots(slots: list, now: datetime = None) -> np.ndarray:
+    return score_slot_columns(
+        [s.zone for s in slots],
+        [bool(s.is_occupied) for s in slots],
+        [s.last_occupied_time for s in slots],
+        now=now,
+        vehicle_types=[getattr(s, "occupied_vehicle_type", None) for s in slots],
+    )
@@ -0,0 +1,234 @@
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import bindparam, delete, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from models import Booking, ParkingSlot, ZoneHourRollup
+
+HOUR = timedelta(hours=1)
+DAY = timedelta(days=1)
+PERIODS = {"hour": HOUR, "day": DAY}
+# Bookings read per chunk when rebuilding; memory is bounded by the number of
+# (zone, hour) buckets, not by the size of the bookings table.
+REBUILD_CHUNK = 5000
+MAX_REPORT_PERIODS = 10_000  # hours or days per report
+
+
+def hour_of(value: datetime) -> datetime:
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def split_stay(start: datetime, end: datetime):
+    """(hour, minutes) for each UTC hour that [start, end) covers."""
+    hour = hour_of(start)
+    while hour < end:
+        following = hour + HOUR
+        yield hour, (min(end, following) - max(start, hour)).total_seconds() / 60
+        hour = following
+
+
+# ─────────────────────────────────────────
+#  Incremental updates (called from crud)
+# ─────────────────────────────────────────
+
+class RollupDeltas:
+    """Rollup changes gathered for one transaction, written by apply() as one
+    executemany upsert however many bookings and hours they cover."""
+
+    def __init__(self):
+        self._buckets = {}  # (zone, hour) -> [bookings, minutes, revenue]
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def _bucket(self, zone, hour):
+        bucket = self._buckets.get((zone, hour))
+        if bucket is None:
+            bucket = self._buckets[(zone, hour)] = [0, 0.0, 0.0]
+        return bucket
+
+    def booking_created(self, zone: str, start_time: datetime):
+        self._bucket(zone, hour_of(start_time))[0] += 1
+
+    def booking_cancelled(self, zone: str, start_time: datetime):
+        """A reservation cancelled before it started no longer counts."""
+        self._bucket(zone, hour_of(start_time))[0] -= 1
+
+    def booking_completed(self, zone: str, start_time: datetime, end_time: datetime, revenue: float):
+        """Occupied minutes per hour of the stay, revenue spread pro rata."""
+        spans = list(split_stay(start_time, end_time))
+        if not spans:
+            # Ended before it started: nothing occupied, revenue on the start hour
+            self._bucket(zone, hour_of(start_time))[2] += revenue
+            return
+        total = sum(minutes for _, minutes in spans)
+        for hour, minutes in spans:
+            bucket = self._bucket(zone, hour)
+            bucket[1] += minutes
+            bucket[2] += revenue * minutes / total
+
+    def apply(self, db: Session):
+        """Add the deltas inside the caller's transaction."""
+        params = [
+            {"r_zone": zone, "r_hour": hour, "r_bookings": bookings, "r_minutes": minutes, "r_revenue": revenue}
+            for (zone, hour), (bookings, minutes, revenue) in self._buckets.items() if zone is not None
+        ]
+        self._buckets = {}
+        if not params:
+            return
+        table = ZoneHourRollup.__table__
+        changes = {
+            "booking_count": table.c.booking_count + bindparam("r_bookings"),
+            "occupied_minutes": table.c.occupied_minutes + bindparam("r_minutes"),
+            "revenue": table.c.revenue + bindparam("r_revenue"),
+        }
+        dialect = db.get_bind().dialect.name
+        if dialect in ("sqlite", "postgresql"):
+            module = sqlite if dialect == "sqlite" else postgresql
+            db.execute(
+                module.insert(table)
+                .values(zone=bindparam("r_zone"), hour=bindparam("r_hour"), booking_count=bindparam("r_bookings"),
+                        occupied_minutes=bindparam("r_minutes"), revenue=bindparam("r_revenue"))
+                .on_conflict_do_update(index_elements=["zone", "hour"], set_=changes),
+                params,
+            )
+            return
+        for row in params:
+            result = db.execute(
+                update(table)
+                .where(table.c.zone == bindparam("r_zone"), table.c.hour == bindparam("r_hour"))
+                .values(**changes),
+                row,
+            )
+            if result.rowcount == 0:
+                db.add(ZoneHourRollup(zone=row["r_zone"], hour=row["r_hour"], booking_count=row["r_bookings"],
+                                      occupied_minutes=row["r_minutes"], revenue=row["r_revenue"]))
+
+
+def record_booking_created(db: Session, zone: str, start_time: datetime):
+    deltas = RollupDeltas()
+    deltas.booking_created(zone, start_time)
+    deltas.apply(db)
+
+
+def record_booking_cancelled(db: Session, zone: str, start_time: datetime):
+    deltas = RollupDeltas()
+    deltas.booking_cancelled(zone, start_time)
+    deltas.apply(db)
+
+
+def record_booking_completed(db: Session, zone: str, start_time: datetime, end_time: datetime, revenue: float):
+    deltas = RollupDeltas()
+    deltas.booking_completed(zone, start_time, end_time, revenue)
+    deltas.apply(db)
+
+
+# ─────────────────────────────────────────
+#  Rebuild from history
+# ─────────────────────────────────────────
+
+def rebuild_rollups(db: Session, chunk_size: int = REBUILD_CHUNK) -> dict:
+    """Recompute every rollup from the bookings table.
+
+    Bookings are read through a streaming cursor chunk_size at a time and
+    folded into in-memory buckets; the table is then replaced in one short
+    transaction. Cancelled reservations are left out, as crud takes them out
+    of the rollups when they are cancelled. Bookings changing while the read
+    runs may be counted as of either state; run it again (it is idempotent)
+    if that matters.
+    """
+    started = time.perf_counter()
+    deltas = RollupDeltas()
+    query = (
+        select(ParkingSlot.zone, Booking.start_time, Booking.end_time, Booking.total_cost, Booking.status)
+        .join(ParkingSlot, ParkingSlot.id == Booking.slot_id)
+        .where(Booking.start_time.is_not(None), Booking.status != "cancelled")
+        .order_by(Booking.id)
+        .execution_options(stream_results=True, yield_per=chunk_size)
+    )
+    bookings = 0
+    for chunk in db.execute(query).partitions(chunk_size):
+        for zone, start_time, end_time, total_cost, status in chunk:
+            deltas.booking_created(zone, start_time)
+            if status == "completed" and end_time is not None:
+                deltas.booking_completed(zone, start_time, end_time, total_cost or 0.0)
+        bookings += len(chunk)
+    buckets = len(deltas)
+    db.execute(delete(ZoneHourRollup))
+    deltas.apply(db)
+    db.commit()
+    return {"bookings": bookings, "buckets": buckets, "seconds": round(time.perf_counter() - started, 3)}
+
+
+# ─────────────────────────────────────────
+#  Reports (read only the rollups)
+# ─────────────────────────────────────────
+
+def rollup_report(db: Session, start: datetime, end: datetime, slot_counts: dict,
+                  zone: str = None, by: str = "hour") -> list:
+    """Per zone and hour (or day) in [start, end): bookings, occupied minutes,
+    revenue and utilization, the share of the zone's slot-minutes occupied.
+
+    Cost depends on the range and the number of zones, never on how many
+    bookings there are.
+    """
+    query = select(
+        ZoneHourRollup.zone, ZoneHourRollup.hour, ZoneHourRollup.booking_count,
+        ZoneHourRollup.occupied_minutes, ZoneHourRollup.revenue,
+    ).where(ZoneHourRollup.hour >= start, ZoneHourRollup.hour < end)
+    if zone is not None:
+        query = query.where(ZoneHourRollup.zone == zone)
+    buckets = {}
+    for row_zone, hour, bookings, minutes, revenue in db.execute(query):
+        key = (row_zone, hour if by == "hour" else hour.replace(hour=0))
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = [0, 0.0, 0.0]
+        bucket[0] += bookings
+        bucket[1] += minutes
+        bucket[2] += revenue
+    period_minutes = PERIODS[by].total_seconds() / 60
+    report = []
+    for (row_zone, period), (bookings, minutes, revenue) in sorted(buckets.items(), key=lambda item: (item[0][1], item[0][0])):
+        capacity = slot_counts.get(row_zone, 0) * period_minutes
+        report.append({
+            "zone": row_zone,
+            "period": period.isoformat(),
+            "bookings": bookings,
+            "occupied_minutes": round(minutes, 1),
+            "utilization": round(minutes / capacity, 4) if capacity else None,
+            "revenue": round(revenue, 2),
+        })
+    return report
+
+
+# ─────────────────────────────────────────
+#  Command line
+# ─────────────────────────────────────────
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Rebuild the zone x hour analytics rollups from booking history. "
+                    "Uses PARKWISE_DATABASE_URL.",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+    rebuild = sub.add_parser("rebuild", help="recompute all rollups from the bookings table")
+    rebuild.add_argument("--chunk-size", type=int, default=REBUILD_CHUNK)
+    args = parser.parse_args(argv)
+
+    from database import SessionLocal, engine
+    from migrations import apply_migrations
+
+    apply_migrations(engine)
+    with SessionLocal() as db:
+        print(json.dumps(rebuild_rollups(db, args.chunk_size)), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+import asyncio
+from datetime import datetime
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from models import ParkingSlot, Booking
+from schemas import BookingCreate
+from database import GROUP_COMMIT, async_engine, write_queue
+from cache import slot_cache, SLOT_CATALOG_KEY, SLOT_OCCUPANCY_KEY, SLOT_COUNT_KEY, SLOT_INVENTORY_BODY_KEY
+import crud
+import group_commit
+import bulk_io
+import analytics
+import serialization
+
+# Reads are native async queries. Writes run the sync crud functions on the
+# write engine's own thread through a bounded queue (or on the group-commit
+# writer when enabled) so booking rules (atomic claim, index hooks) live in
+# one place, every write transaction takes SQLite's write lock up front and a
+# burst of writes never ties up the shared threadpool.
+
+async def count_slots(db: AsyncSession) -> int:
+    return (await db.execute(select(func.count(ParkingSlot.id)))).scalar_one()
+
+async def get_all_slots(db: AsyncSession, zone: str = None):
+    query = select(ParkingSlot)
+    if zone:
+        query = query.where(ParkingSlot.zone == zone)
+    return (await db.execute(query)).scalars().all()
+
+async def get_zones(db: AsyncSession):
+    return (await db.execute(select(ParkingSlot.zone).distinct().order_by(ParkingSlot.zone))).scalars().all()
+
+async def get_available_slots(db: AsyncSession):
+    return (await db.execute(select(ParkingSlot).where(ParkingSlot.is_occupied == False))).scalars().all()
+
+# ─────────────────────────────────────────
+#  Cached slot inventory (read-through, invalidated by crud writes)
+# ─────────────────────────────────────────
+
+async def get_slot_count(db: AsyncSession) -> int:
+    return await slot_cache.get_or_load(SLOT_COUNT_KEY, lambda: count_slots(db))
+
+async def get_slot_catalog(db: AsyncSession) -> dict:
+    """Static slot metadata: {"all": [...], "by_zone": {zone: [...]}}, ordered by id."""
+    async def load():
+        query = select(
+            ParkingSlot.id, ParkingSlot.slot_number, ParkingSlot.zone,
+            ParkingSlot.price_per_hour, ParkingSlot.vehicle_types,
+        ).order_by(ParkingSlot.id)
+        rows = [dict(row) for row in (await db.execute(query)).mappings()]
+        by_zone = {}
+        for row in rows:
+            by_zone.setdefault(row["zone"], []).append(row)
+        return {"all": rows, "by_zone": by_zone}
+    return await slot_cache.get_or_load(SLOT_CATALOG_KEY, load)
+
+async def get_occupancy(db: AsyncSession) -> dict:
+    """{slot_id: (is_occupied, last_occupied_time, occupied_vehicle_type)} for every slot."""
+    async def load():
+        query = select(
+            ParkingSlot.id, ParkingSlot.is_occupied, ParkingSlot.last_occupied_time, ParkingSlot.occupied_vehicle_type,
+        )
+        return {
+            row.id: (bool(row.is_occupied), row.last_occupied_time, row.occupied_vehicle_type)
+            for row in await db.execute(query)
+        }
+    return await slot_cache.get_or_load(SLOT_OCCUPANCY_KEY, load)
+
+async def get_cached_zones(db: AsyncSession) -> list:
+    return sorted((await get_slot_catalog(db))["by_zone"])
+
+async def get_slot_inventory_body(db: AsyncSession) -> bytes:
+    """The full /api/slots body as JSON bytes, encoded once per occupancy state
+    and price signature. Only the latest encoding is cached."""
+    engine = await get_pricing_engine(db)
+    signature = engine.signature()
+
+    async def load():
+        return signature, await encode_slot_inventory(db)
+
+    cached_signature, body = await slot_cache.get_or_load(SLOT_INVENTORY_BODY_KEY, load)
+    if cached_signature != signature:
+        # Prices moved since it was encoded
+        slot_cache.invalidate(SLOT_INVENTORY_BODY_KEY)
+        _, body = await slot_cache.get_or_load(SLOT_INVENTORY_BODY_KEY, load)
+    return body
+
+async def encode_slot_inventory(db: AsyncSession) -> bytes:
+    """Every slot's id, number, zone, occupancy, base and current price, encoded
+    straight from the cached catalog and occupancy (no per-slot view dicts)."""
+    catalog = await get_slot_catalog(db)
+    occupancy = await get_occupancy(db)
+    engine = await get_pricing_engine(db)
+    rows = catalog["all"]
+    prices = engine.price_many([row["zone"] for row in rows], [row["price_per_hour"] for row in rows]).tolist()
+    return serialization.dumps([
+        {
+            "id": row["id"], "slot_number": row["slot_number"], "zone": row["zone"],
+            "is_occupied": occupancy.get(row["id"], (False,))[0],
+            "price_per_hour": row["price_per_hour"], "current_price": price,
+        }
+        for row, price in zip(rows, prices)
+    ])
+
+async def get_slot_views(db: AsyncSession, zone: str = None) -> list:
+    """Catalog rows merged with current occupancy and current_price, as plain dicts."""
+    catalog = await get_slot_catalog(db)
+    occupancy = await get_occupancy(db)
+    engine = await get_pricing_engine(db)
+    rows = catalog["by_zone"].get(zone, []) if zone else catalog["all"]
+    prices = engine.price_many([row["zone"] for row in rows], [row["price_per_hour"] for row in rows]).tolist()
+    views = []
+    for row, price in zip(rows, prices):
+        is_occupied, last_occupied_time, vehicle_type = occupancy.get(row["id"], (False, None, None))
+        views.append({
+            **row, "is_occupied": is_occupied, "last_occupied_time": last_occupied_time,
+            "occupied_vehicle_type": vehicle_type, "current_price": price,
+        })
+    return views
+
+async def create_booking(db: AsyncSession, booking: BookingCreate):
+    if GROUP_COMMIT:
+        return await asyncio.wrap_future(group_commit.submit_create_booking(booking))
+    return await write_queue.submit(crud.create_booking, booking)
+
+async def end_booking(db: AsyncSession, booking_id: int):
+    if GROUP_COMMIT:
+        return await asyncio.wrap_future(group_commit.submit_end_booking(booking_id))
+    return await write_queue.submit(crud.end_booking, booking_id)
+
+async def seed_parking_slots(db: AsyncSession):
+    return await write_queue.submit(crud.seed_parking_slots)
+
+async def get_recommendation_index(db: AsyncSession):
+    return await db.run_sync(crud.get_recommendation_index)
+
+async def get_pricing_engine(db: AsyncSession):
+    if not crud.pricing_engine.loaded:
+        await db.run_sync(crud.get_pricing_engine)
+    return crud.pricing_engine
+
+async def get_geo_index(db: AsyncSession):
+    return await db.run_sync(crud.get_geo_index)
+
+# ─────────────────────────────────────────
+#  Time-range availability
+# ─────────────────────────────────────────
+
+async def get_availability_index(db: AsyncSession):
+    return await db.run_sync(crud.get_availability_index)
+
+async def get_listings_available(db: AsyncSession, start_time: datetime, end_time: datetime = None):
+    return (await db.execute(crud.listings_available_query(start_time, end_time))).scalars().all()
+
+async def get_free_slots(db: AsyncSession, start_time: datetime, end_time: datetime = None,
+                         zone: str = None, vehicle_type: str = None) -> list:
+    """Slot views with no active booking overlapping [start_time, end_time).
+
+    Windows starting within the reservation grace also need the slot to be
+    free right now (seeded or sensor occupancy has no booking behind it).
+    """
+    index = await get_availability_index(db)
+    check_current = start_time <= datetime.utcnow() + crud.RESERVATION_GRACE
+    candidates = [
+        view for view in await get_slot_views(db, zone)
+        if not (check_current and view["is_occupied"])
+        and (not vehicle_type or vehicle_type in (view["vehicle_types"] or "").split(","))
+    ]
+    free = set(index.free_slot_ids([view["id"] for view in candidates], start_time, end_time))
+    return [view for view in candidates if view["id"] in free]
+
+# ─────────────────────────────────────────
+#  Keyset pages and NDJSON streams (column-only, no ORM objects)
+# ─────────────────────────────────────────
+
+SLOT_API_COLUMNS = (
+    ParkingSlot.id, ParkingSlot.slot_number, ParkingSlot.zone,
+    ParkingSlot.is_occupied, ParkingSlot.price_per_hour,
+)
+BOOKING_API_COLUMNS = (
+    Booking.id, Booking.slot_id, Booking.user_name, Booking.phone_number,
+    Booking.vehicle_type, Booking.vehicle_number, Booking.start_time,
+    Booking.end_time, Booking.total_cost, Booking.status,
+)
+
+def slot_rows_query(after_id: int = 0, limit: int = None):
+    query = select(*SLOT_API_COLUMNS).where(ParkingSlot.id > after_id).order_by(ParkingSlot.id)
+    return query.limit(limit) if limit else query
+
+def booking_rows_query(before: tuple = None, limit: int = None, user_email: str = None):
+    """Newest first; before is the (start_time, id) of the last row already seen.
+    With user_email, only that user's bookings."""
+    query = select(*BOOKING_API_COLUMNS).order_by(Booking.start_time.desc(), Booking.id.desc())
+    if user_email is not None:
+        query = query.where(Booking.user_email == user_email)
+    if before:
+        query = query.where(tuple_(Booking.start_time, Booking.id) < before)
+    return query.limit(limit) if limit else query
+
+def encode_booking_cursor(row: dict) -> str:
+    return crud.encode_booking_cursor(row["start_time"], row["id"])
+
+decode_booking_cursor = crud.decode_booking_cursor
+
+async def get_rows(db: AsyncSession, query) -> list:
+    # Core execution on the session's connection: plain tuples, no ORM result layer
+    result = await (await db.connection()).execute(query)
+    return serialization.records(tuple(result.keys()), result.all())
+
+async def stream_ndjson(query, chunk_size: int = 1000):
+    """Yield one JSON line per row from a server-side cursor, chunk_size rows at a time."""
+    async with async_engine.connect() as conn:
+        result = await conn.stream(query.execution_options(yield_per=chunk_size))
+        keys = tuple(result.keys())
+        async for chunk in result.partitions(chunk_size):
+            yield b"".join(serialization.dumps(dict(zip(keys, row))) + b"\n" for row in chunk)
+
+async def stream_export(query, fmt: str, chunk_size: int = bulk_io.BATCH_SIZE):
+    """Like stream_ndjson, encoded by bulk_io (CSV with a header row, or JSON lines)."""
+    columns = [column.name for column in query.selected_columns]
+    if fmt == "csv":
+        yield bulk_io.encode_chunk([], columns, fmt, header=True)
+    async with async_engine.connect() as conn:
+        result = await conn.stream(query.execution_options(yield_per=chunk_size))
+        async for chunk in result.partitions(chunk_size):
+            yield bulk_io.encode_chunk(chunk, columns, fmt)
+
+# ─────────────────────────────────────────
+#  Analytics (served from the zone x hour rollups)
+# ─────────────────────────────────────────
+
+async def get_rollup_report(db: AsyncSession, start: datetime, end: datetime, zone: str = None, by: str = "hour") -> list:
+    catalog = await get_slot_catalog(db)
+    slot_counts = {name: len(rows) for name, rows in catalog["by_zone"].items()}
+    return await db.run_sync(analytics.rollup_report, start, end, slot_counts, zone, by)
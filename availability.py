@@ -0,0 +1,165 @@
+import math
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+
+_EPOCH = datetime(1970, 1, 1)
+OPEN_END = math.inf  # active booking without an end_time
+
+
+def as_naive_utc(value: datetime):
+    """Stored times are naive UTC; convert aware query parameters to match."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def to_ts(value: datetime) -> float:
+    return OPEN_END if value is None else (value - _EPOCH).total_seconds()
+
+
+def from_ts(value: float):
+    return None if value == OPEN_END else datetime.utcfromtimestamp(value)
+
+
+class SlotSchedule:
+    """Reserved time on one slot: the booking intervals plus their union.
+
+    The union is kept as two sorted arrays of disjoint [start, end) spans, so an
+    overlap test is one bisect. Removing a booking rebuilds the union from the
+    slot's own bookings, which only touches that slot.
+    """
+
+    __slots__ = ("bookings", "starts", "ends")
+
+    def __init__(self):
+        self.bookings = {}
+        self.starts = array("d")
+        self.ends = array("d")
+
+    def add(self, booking_id: int, start: float, end: float):
+        self.bookings[booking_id] = (start, end)
+        # Spans touching [start, end) are merged into one
+        lo = bisect_left(self.ends, start)
+        hi = bisect_right(self.starts, end)
+        if lo < hi:
+            start = min(start, self.starts[lo])
+            end = max(end, self.ends[hi - 1])
+        del self.starts[lo:hi]
+        del self.ends[lo:hi]
+        self.starts.insert(lo, start)
+        self.ends.insert(lo, end)
+
+    def remove(self, booking_id: int):
+        if self.bookings.pop(booking_id, None) is None:
+            return
+        self.starts = array("d")
+        self.ends = array("d")
+        for start, end in sorted(self.bookings.values()):
+            if self.ends and start <= self.ends[-1]:
+                self.ends[-1] = max(self.ends[-1], end)
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    def overlaps(self, start: float, end: float) -> bool:
+        i = bisect_left(self.starts, end)
+        return i > 0 and self.ends[i - 1] > start
+
+    def free_windows(self, start: float, end: float, min_length: float = 0.0):
+        """Yield the (start, end) gaps inside [start, end) at least min_length long."""
+        i = bisect_right(self.ends, start)
+        cursor = start
+        while cursor < end:
+            if i < len(self.starts) and self.starts[i] < end:
+                gap_end, next_cursor = self.starts[i], self.ends[i]
+            else:
+                gap_end, next_cursor = end, end
+            if gap_end - cursor >= min_length and gap_end > cursor:
+                yield cursor, gap_end
+            cursor = max(cursor, next_cursor)
+            i += 1
+
+
+class AvailabilityIndex:
+    """Per-slot schedules of active bookings, answering "is slot X free
+    between A and B" in O(log n) and "which slots are free" in O(slots log n).
+
+    The database stays the authority for booking creation (crud.claim_slot
+    runs the same overlap test as an indexed range query); this index serves
+    search and is refreshed by crud's write hooks.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._slots = {}
+        self.loaded = False
+
+    def load(self, rows):
+        """rows: (booking_id, slot_id, start_time, end_time) of active bookings."""
+        with self._lock:
+            self._slots = {}
+            for booking_id, slot_id, start_time, end_time in rows:
+                self._schedule(slot_id).add(booking_id, to_ts(start_time), to_ts(end_time))
+            self.loaded = True
+
+    def clear(self):
+        with self._lock:
+            self._slots = {}
+            self.loaded = False
+
+    def _schedule(self, slot_id) -> SlotSchedule:
+        schedule = self._slots.get(slot_id)
+        if schedule is None:
+            schedule = self._slots[slot_id] = SlotSchedule()
+        return schedule
+
+    # ── write hooks (called from crud) ────
+
+    def update_booking(self, booking):
+        if not self.loaded:
+            return
+        with self._lock:
+            schedule = self._schedule(booking.slot_id)
+            schedule.remove(booking.id)
+            if booking.status == "active":
+                schedule.add(booking.id, to_ts(booking.start_time), to_ts(booking.end_time))
+
+    def remove_bookings(self, rows):
+        """rows: (booking_id, slot_id) of bookings that are no longer active."""
+        if not self.loaded:
+            return
+        with self._lock:
+            for booking_id, slot_id in rows:
+                schedule = self._slots.get(slot_id)
+                if schedule is not None:
+                    schedule.remove(booking_id)
+
+    # ── reads ─────────────────────────────
+
+    def is_free(self, slot_id: int, start: datetime, end: datetime = None) -> bool:
+        schedule = self._slots.get(slot_id)
+        return schedule is None or not schedule.overlaps(to_ts(start), to_ts(end))
+
+    def free_slot_ids(self, slot_ids, start: datetime, end: datetime = None) -> list:
+        start_ts, end_ts = to_ts(start), to_ts(end)
+        free = []
+        for slot_id in slot_ids:
+            schedule = self._slots.get(slot_id)
+            if schedule is None or not schedule.overlaps(start_ts, end_ts):
+                free.append(slot_id)
+        return free
+
+    def free_windows(self, slot_id: int, start: datetime, end: datetime, min_minutes: float = 0) -> list:
+        schedule = self._slots.get(slot_id)
+        start_ts, end_ts = to_ts(start), to_ts(end)
+        if schedule is None:
+            return [(start, end)] if end_ts - start_ts >= min_minutes * 60 else []
+        return [
+            (from_ts(a), from_ts(b))
+            for a, b in schedule.free_windows(start_ts, end_ts, min_minutes * 60)
+        ]
+
+
+availability_index = AvailabilityIndex()
@@ -0,0 +1,130 @@
+"""Zone x hour analytics: rollup rebuild and dashboard queries vs. scanning bookings.
+
+  rebuild    analytics.rebuild_rollups over the whole history, streamed in chunks
+             (peak Python memory from a second, tracemalloc-traced run)
+  rollups    analytics.rollup_report for 30 days, per hour and per day
+  raw scan   the same hourly report computed from the bookings overlapping the
+             range, which is what answering it without rollups takes
+
+History grows in steps up to --bookings completed stays spread over a year; the
+rollup queries stay flat while the raw scan grows with the bookings in range.
+
+Run from the repo root:  python benchmarks/bench_analytics.py --bookings 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("PARKWISE_DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+
+from sqlalchemy import delete, func, insert, select  # noqa: E402
+
+import analytics  # noqa: E402
+from database import SessionLocal, engine  # noqa: E402
+from migrations import apply_migrations  # noqa: E402
+from models import Booking, ParkingSlot  # noqa: E402
+
+ZONES = "ABCDEFGH"
+SLOTS = 800
+YEAR_START = datetime(2030, 1, 1)
+RANGE = (datetime(2030, 6, 1), datetime(2030, 7, 1))
+
+
+def populate(first, last, rng):
+    rows = []
+    for i in range(first, last):
+        start = YEAR_START + timedelta(minutes=rng.randrange(365 * 24 * 60))
+        minutes = rng.randrange(15, 240)
+        rows.append({
+            "slot_id": i % SLOTS + 1, "user_email": f"user{i % 5000}@parkwise", "user_name": "bench",
+            "start_time": start, "end_time": start + timedelta(minutes=minutes),
+            "total_cost": round(minutes / 60 * 20.0, 2), "price_per_hour": 20.0, "status": "completed",
+        })
+        if len(rows) == 50_000:
+            with engine.begin() as conn:
+                conn.execute(insert(Booking), rows)
+            rows = []
+    if rows:
+        with engine.begin() as conn:
+            conn.execute(insert(Booking), rows)
+
+
+def timed(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def raw_hourly(db):
+    deltas = analytics.RollupDeltas()
+    rows = db.execute(
+        select(ParkingSlot.zone, Booking.start_time, Booking.end_time, Booking.total_cost)
+        .join(ParkingSlot, ParkingSlot.id == Booking.slot_id)
+        .where(Booking.start_time < RANGE[1], Booking.end_time > RANGE[0], Booking.status == "completed")
+    )
+    for zone, start_time, end_time, total_cost in rows:
+        if start_time >= RANGE[0]:
+            deltas.booking_created(zone, start_time)
+        deltas.booking_completed(zone, start_time, end_time, total_cost)
+    return len(deltas)
+
+
+def db_count(start, end):
+    with SessionLocal() as db:
+        return db.scalar(
+            select(func.count()).select_from(Booking).where(Booking.start_time >= start, Booking.start_time < end)
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--bookings", type=int, default=1_000_000)
+    parser.add_argument("--steps", type=int, default=3, help="history sizes, each 10x the previous")
+    parser.add_argument("--chunk-size", type=int, default=analytics.REBUILD_CHUNK)
+    args = parser.parse_args()
+
+    apply_migrations(engine)
+    with engine.begin() as conn:
+        conn.execute(delete(Booking))
+        conn.execute(delete(ParkingSlot))
+        conn.execute(insert(ParkingSlot), [
+            {"id": i + 1, "slot_number": f"X{i:05d}", "zone": ZONES[i % len(ZONES)], "price_per_hour": 20.0}
+            for i in range(SLOTS)
+        ])
+    slot_counts = {zone: SLOTS // len(ZONES) for zone in ZONES}
+    sizes = [args.bookings // 10 ** k for k in reversed(range(args.steps))]
+    rng = random.Random(1)
+
+    print(f"{'bookings':>9} {'rebuild s':>10} {'bookings/s':>11} {'peak MB':>8} {'buckets':>8} "
+          f"{'hourly ms':>10} {'daily ms':>9} {'raw ms':>8}")
+    done = 0
+    for size in sizes:
+        populate(done, size, rng)
+        done = size
+        with SessionLocal() as db:
+            stats = analytics.rebuild_rollups(db, args.chunk_size)
+            assert stats["bookings"] == size, stats
+            tracemalloc.start()
+            analytics.rebuild_rollups(db, args.chunk_size)
+            peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+            tracemalloc.stop()
+            hourly, report = timed(lambda: analytics.rollup_report(db, *RANGE, slot_counts))
+            daily, _ = timed(lambda: analytics.rollup_report(db, *RANGE, slot_counts, by="day"))
+            raw, _ = timed(lambda: raw_hourly(db), repeat=3)
+        assert sum(row["bookings"] for row in report) == db_count(*RANGE)
+        print(f"{size:9d} {stats['seconds']:10.2f} {size / stats['seconds']:11.0f} {peak:8.1f} "
+              f"{stats['buckets']:8d} {hourly * 1000:10.2f} {daily * 1000:9.2f} {raw * 1000:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
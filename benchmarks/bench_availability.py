@@ -0,0 +1,121 @@
+"""Time-range availability at scale: "which slots are free between A and B".
+
+  scan        filter every active booking in Python (what a naive search does)
+  sql         one indexed overlap query per slot (the check claim_slot runs)
+  index       availability.AvailabilityIndex, one bisect per slot
+
+Run from the repo root:  python benchmarks/bench_availability.py --bookings 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmp = tempfile.mkdtemp()
+os.environ.setdefault("PARKWISE_DATABASE_URL", f"sqlite:///{_tmp}/bench.db")
+
+from sqlalchemy import insert, select  # noqa: E402
+
+import crud  # noqa: E402
+from availability import AvailabilityIndex  # noqa: E402
+from database import SessionLocal, engine  # noqa: E402
+from migrations import apply_migrations  # noqa: E402
+from models import Booking, ParkingSlot  # noqa: E402
+
+BASE = datetime(2030, 1, 1)
+
+
+def populate(slots, bookings, days):
+    """Back-to-back reservations of 1-4 h with random gaps, spread over `days`."""
+    apply_migrations(engine)
+    rng = random.Random(7)
+    per_slot = bookings // slots
+    with engine.begin() as conn:
+        conn.execute(insert(ParkingSlot), [
+            {"slot_number": f"S{i:05d}", "zone": "ABC"[i % 3], "is_occupied": False} for i in range(slots)
+        ])
+        step = days * 24 * 60 / per_slot
+        batch = []
+        for slot_id in range(1, slots + 1):
+            minute = rng.uniform(0, step)
+            for _ in range(per_slot):
+                length = rng.choice((60, 120, 180, 240))
+                start = BASE + timedelta(minutes=minute)
+                batch.append({
+                    "slot_id": slot_id, "user_name": "bench", "status": "active",
+                    "start_time": start, "end_time": start + timedelta(minutes=min(length, step * 0.9)),
+                })
+                minute += step
+            if len(batch) >= 50000:
+                conn.execute(insert(Booking), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(Booking), batch)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--slots", type=int, default=2000)
+    parser.add_argument("--bookings", type=int, default=1000000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--queries", type=int, default=20)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    populate(args.slots, args.bookings, args.days)
+    print(f"populated {args.bookings} bookings on {args.slots} slots in {time.perf_counter() - start:.1f}s")
+
+    rng = random.Random(1)
+    windows = []
+    for _ in range(args.queries):
+        a = BASE + timedelta(minutes=rng.uniform(0, args.days * 24 * 60))
+        windows.append((a, a + timedelta(hours=3)))
+    slot_ids = list(range(1, args.slots + 1))
+
+    with SessionLocal() as db:
+        start = time.perf_counter()
+        rows = db.execute(
+            select(Booking.slot_id, Booking.start_time, Booking.end_time).where(Booking.status == "active")
+        ).all()
+        load_rows = time.perf_counter() - start
+
+        start = time.perf_counter()
+        scan_results = []
+        for a, b in windows:
+            busy = {slot_id for slot_id, s, e in rows if s < b and (e is None or e > a)}
+            scan_results.append([i for i in slot_ids if i not in busy])
+        scan = (time.perf_counter() - start) / len(windows)
+
+        start = time.perf_counter()
+        sql_results = []
+        for a, b in windows[:5]:
+            sql_results.append([
+                i for i in slot_ids
+                if not db.execute(select(crud.overlapping_bookings(i, a, b))).scalar()
+            ])
+        sql = (time.perf_counter() - start) / 5
+
+        index = AvailabilityIndex()
+        start = time.perf_counter()
+        index.load(db.query(Booking.id, Booking.slot_id, Booking.start_time, Booking.end_time)
+                   .filter(Booking.status == "active").yield_per(10000))
+        build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index_results = [index.free_slot_ids(slot_ids, a, b) for a, b in windows]
+    lookup = (time.perf_counter() - start) / len(windows)
+
+    assert index_results == scan_results and index_results[:5] == sql_results
+    print(f"rows fetched for scan: {load_rows:.2f}s, index build: {build:.2f}s")
+    print(f"free-slot search over a 3h window, mean ms: "
+          f"scan {scan * 1000:.1f}  sql {sql * 1000:.1f}  index {lookup * 1000:.2f}")
+    print(f"mean free slots per window: {sum(map(len, index_results)) / len(windows):.0f}")
+
+
+if __name__ == "__main__":
+    main()
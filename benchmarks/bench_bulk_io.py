@@ -0,0 +1,141 @@
+"""Bulk slot import and booking export vs. the per-row ORM approach.
+
+  orm      one ParkingSlot object per row, session.add + a single commit
+  bulk     bulk_io.import_file: validated dict batches, one executemany each
+  export   bulk_io.export_bookings through a streaming cursor, chunked
+
+Peak memory is the tracemalloc high-water mark for each step (Python
+allocations only), taken on a second run because tracing slows it down.
+
+Run from the repo root:  python benchmarks/bench_bulk_io.py --slots 200000 --bookings 1000000
+"""
+import argparse
+import csv
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmp = tempfile.mkdtemp()
+os.environ.setdefault("PARKWISE_DATABASE_URL", f"sqlite:///{_tmp}/bench.db")
+
+from sqlalchemy import delete, insert  # noqa: E402
+
+import bulk_io  # noqa: E402
+from database import SessionLocal, engine  # noqa: E402
+from migrations import apply_migrations  # noqa: E402
+from models import Booking, ParkingSlot  # noqa: E402
+
+BASE = datetime(2030, 1, 1)
+
+
+def write_slots_csv(path, n):
+    rng = random.Random(1)
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["slot_number", "zone", "price_per_hour", "vehicle_types", "latitude", "longitude"])
+        for i in range(n):
+            writer.writerow([
+                f"B{i:07d}", "ABC"[i % 3], rng.choice((40, 50, 60)), "Car,Bike,SUV",
+                round(12.9716 + rng.uniform(-0.1, 0.1), 6), round(77.5946 + rng.uniform(-0.1, 0.1), 6),
+            ])
+
+
+def measure(fn, reset=None):
+    start = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - start
+    if reset:
+        reset()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    if reset:
+        reset()
+    return result, seconds, peak / 2**20
+
+
+def orm_import(path):
+    with SessionLocal() as db, open(path, newline="") as f:
+        count = 0
+        for record in csv.DictReader(f):
+            db.add(ParkingSlot(**bulk_io.validate_slot(record)))
+            count += 1
+        db.commit()
+    return count
+
+
+def bulk_import(path):
+    with SessionLocal() as db, open(path, newline="") as f:
+        return bulk_io.import_file(db, "slots", f, "csv").inserted
+
+
+def clear_slots():
+    with engine.begin() as conn:
+        conn.execute(delete(ParkingSlot))
+
+
+def populate_bookings(n):
+    rng = random.Random(2)
+    with engine.begin() as conn:
+        conn.execute(insert(ParkingSlot), [{"slot_number": f"E{i:04d}", "zone": "A", "is_occupied": False} for i in range(100)])
+        for lo in range(0, n, 50000):
+            rows = []
+            for i in range(lo, min(n, lo + 50000)):
+                start = BASE + timedelta(minutes=i)
+                rows.append({
+                    "slot_id": 1 + i % 100, "user_name": f"user{i % 5000}", "phone_number": "9000000000",
+                    "vehicle_type": rng.choice(("Car", "Bike", "SUV")), "vehicle_number": f"KA01{i:06d}",
+                    "start_time": start, "end_time": start + timedelta(hours=2),
+                    "total_cost": 100.0, "status": "completed", "created_at": start,
+                })
+            conn.execute(insert(Booking), rows)
+
+
+class CountingSink(io.TextIOBase):
+    """Discards output, like a socket would after sending it."""
+
+    def __init__(self):
+        self.bytes = 0
+
+    def write(self, text):
+        self.bytes += len(text)
+        return len(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--slots", type=int, default=200000)
+    parser.add_argument("--bookings", type=int, default=1000000)
+    args = parser.parse_args()
+
+    apply_migrations(engine)
+    path = os.path.join(_tmp, "slots.csv")
+    write_slots_csv(path, args.slots)
+    print(f"import {args.slots} slots from a {os.path.getsize(path) / 2**20:.1f} MiB CSV")
+    print(f"{'':<8} {'seconds':>8} {'rows/s':>10} {'peak MiB':>9}")
+    for name, fn in (("orm", orm_import), ("bulk", bulk_import)):
+        count, seconds, peak = measure(lambda: fn(path), reset=clear_slots)
+        assert count == args.slots, count
+        print(f"{name:<8} {seconds:8.2f} {count / seconds:10.0f} {peak:9.1f}")
+
+    populate_bookings(args.bookings)
+    print(f"export {args.bookings} bookings")
+    for fmt in bulk_io.FORMATS:
+        sink = CountingSink()
+        with SessionLocal() as db:
+            rows, seconds, peak = measure(lambda: bulk_io.export_bookings(db, sink, fmt))
+        sink.bytes //= 2
+        assert rows == args.bookings, rows
+        print(f"{fmt:<8} {seconds:8.2f} {rows / seconds:10.0f} {peak:9.1f}   {sink.bytes / 2**20:.0f} MiB written")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Cost of polling /slots and /api/slots when inventory is unchanged vs changed.
+
+  changed      every request follows an inventory write: full load + render
+  unchanged    same inventory version, no validator: cached fragment/JSON rows
+  304          same inventory version with If-None-Match: nothing rendered
+
+Run from the repo root:  python benchmarks/bench_conditional_get.py --slots 5000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmp = tempfile.mkdtemp()
+os.environ.setdefault("PARKWISE_DATABASE_URL", f"sqlite:///{_tmp}/bench.db")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import main  # noqa: E402
+from cache import SLOT_OCCUPANCY_KEY, slot_cache  # noqa: E402
+from database import SessionLocal, engine  # noqa: E402
+from http_cache import inventory_version  # noqa: E402
+from migrations import apply_migrations  # noqa: E402
+from models import ParkingSlot  # noqa: E402
+
+
+def timed(client, path, requests, before=None, headers=None):
+    start = time.perf_counter()
+    for _ in range(requests):
+        if before:
+            before()
+        response = client.get(path, headers=headers or {})
+    return (time.perf_counter() - start) / requests * 1000, response.status_code
+
+
+def simulate_write():
+    # What crud.notify_slot_changed does after a booking commit
+    slot_cache.invalidate(SLOT_OCCUPANCY_KEY)
+    inventory_version.bump()
+
+
+def main_():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--slots", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=30)
+    args = parser.parse_args()
+
+    apply_migrations(engine)
+    with SessionLocal() as db:
+        db.add_all(
+            ParkingSlot(slot_number=f"{'ABC'[i % 3]}{i:05d}", zone="ABC"[i % 3], is_occupied=i % 4 == 0)
+            for i in range(args.slots)
+        )
+        db.commit()
+
+    with TestClient(main.app) as client:
+        login = client.post("/login", data={"email": "bench@parkwise", "name": "Bench"}, follow_redirects=False)
+        client.cookies.set("session_id", login.cookies["session_id"])
+
+        print(f"{args.slots} slots, mean ms/request")
+        print(f"{'path':<14} {'changed':>9} {'unchanged':>10} {'304':>8}")
+        for path in ("/slots", "/slots?zone=A", "/api/slots"):
+            changed, _ = timed(client, path, args.requests, before=simulate_write)
+            unchanged, _ = timed(client, path, args.requests)
+            etag = client.get(path).headers["etag"]
+            not_modified, status = timed(client, path, args.requests, headers={"If-None-Match": etag})
+            assert status == 304
+            print(f"{path:<14} {changed:9.2f} {unchanged:10.2f} {not_modified:8.2f}")
+
+
+if __name__ == "__main__":
+    main_()
@@ -0,0 +1,94 @@
+"""Requests/sec and latency percentiles for the same slot query served by a
+sync route (threadpool + Session) and an async route (AsyncSession).
+
+Run from the repo root:  python benchmarks/bench_db_modes.py --requests 2000 --concurrency 200
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmp = tempfile.mkdtemp()
+os.environ.setdefault("PARKWISE_DATABASE_URL", f"sqlite:///{_tmp}/bench.db")
+
+import httpx  # noqa: E402
+from fastapi import Depends, FastAPI  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+import async_crud  # noqa: E402
+import crud  # noqa: E402
+from database import Base, SessionLocal, async_engine, engine, get_async_db, get_db  # noqa: E402
+from models import ParkingSlot  # noqa: E402
+
+app = FastAPI()
+
+
+def _payload(slots):
+    return [{"id": s.id, "zone": s.zone, "is_occupied": s.is_occupied} for s in slots]
+
+
+@app.get("/sync")
+def sync_slots(db: Session = Depends(get_db)):
+    return _payload(crud.get_available_slots(db))
+
+
+@app.get("/async")
+async def async_slots(db: AsyncSession = Depends(get_async_db)):
+    return _payload(await async_crud.get_available_slots(db))
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run(path, requests, concurrency):
+    latencies = []
+    sem = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one():
+            async with sem:
+                start = time.perf_counter()
+                response = await client.get(path)
+                latencies.append(time.perf_counter() - start)
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        elapsed = time.perf_counter() - start
+    return requests / elapsed, percentile(latencies, 50), percentile(latencies, 99)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--slots", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        db.add_all(
+            ParkingSlot(slot_number=f"S{i:05d}", zone="ABC"[i % 3], is_occupied=i % 2 == 0)
+            for i in range(args.slots)
+        )
+        db.commit()
+
+    print(f"{'mode':<6} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for mode in ("sync", "async"):
+        await run(f"/{mode}", 50, 10)  # warm up pools
+        rps, p50, p99 = await run(f"/{mode}", args.requests, args.concurrency)
+        print(f"{mode:<6} {rps:9.1f} {p50 * 1000:8.2f} {p99 * 1000:8.2f}")
+
+    await async_engine.dispose()
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,116 @@
+"""Auto-expiry of overdue bookings: bulk lifecycle pass vs. ending them one by one.
+
+  per-row    crud.end_booking for each overdue booking (one transaction each),
+             timed on a sample and extrapolated
+  bulk       crud.apply_due_lifecycle: batched UPDATEs, one transaction per batch
+  recovery   crud.get_lifecycle_deadlines for bookings ending within the horizon
+             (what the scheduler reads on startup)
+
+Every booking is active and overdue, on its own occupied slot.
+
+Run from the repo root:  python benchmarks/bench_expiry.py --bookings 100000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("PARKWISE_DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+
+from sqlalchemy import delete, event, func, insert, select  # noqa: E402
+
+import crud  # noqa: E402
+from booking_lifecycle import SCHEDULE_HORIZON  # noqa: E402
+from database import SessionLocal, engine  # noqa: E402
+from migrations import apply_migrations  # noqa: E402
+from models import Booking, ParkingSlot, UserBookingSummary  # noqa: E402
+
+
+def populate(n, now, ends_in=timedelta(minutes=-1)):
+    with engine.begin() as conn:
+        conn.execute(delete(Booking))
+        conn.execute(delete(ParkingSlot))
+        conn.execute(delete(UserBookingSummary))
+        conn.execute(insert(ParkingSlot), [
+            {"id": i + 1, "slot_number": f"X{i:06d}", "zone": "ABC"[i % 3], "price_per_hour": 20.0,
+             "is_occupied": True, "last_occupied_time": now - timedelta(hours=2)}
+            for i in range(n)
+        ])
+        conn.execute(insert(Booking), [
+            {"slot_id": i + 1, "user_email": f"user{i % 1000}@parkwise", "user_name": "bench",
+             "start_time": now - timedelta(hours=2), "end_time": now + ends_in - timedelta(seconds=i % 600),
+             "total_cost": 40.0, "price_per_hour": 20.0, "status": "active"}
+            for i in range(n)
+        ])
+        conn.execute(insert(UserBookingSummary), [
+            {"user_email": f"user{u}@parkwise", "booking_count": n // 1000, "active_count": n // 1000,
+             "total_spend": 0.0, "updated_at": now}
+            for u in range(1000)
+        ])
+
+
+def count_statements():
+    counter = {"n": 0}
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count(*args):
+        counter["n"] += 1
+    return counter, lambda: event.remove(engine, "before_cursor_execute", count)
+
+
+def check(n):
+    with SessionLocal() as db:
+        active = db.scalar(select(func.count()).select_from(Booking).where(Booking.status == "active"))
+        occupied = db.scalar(select(func.count()).select_from(ParkingSlot).where(ParkingSlot.is_occupied == True))
+    assert active == 0 and occupied == 0, (active, occupied)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--bookings", type=int, default=100000)
+    parser.add_argument("--sample", type=int, default=2000, help="bookings ended one by one")
+    args = parser.parse_args()
+
+    apply_migrations(engine)
+    now = datetime.utcnow()
+    print(f"{args.bookings} overdue bookings")
+    print(f"{'':<10} {'seconds':>9} {'bookings/s':>11} {'statements':>11}")
+
+    populate(args.sample, now)
+    counter, stop = count_statements()
+    start = time.perf_counter()
+    with SessionLocal() as db:
+        for booking_id in range(1, args.sample + 1):
+            crud.end_booking(db, booking_id)
+    seconds = (time.perf_counter() - start) * args.bookings / args.sample
+    stop()
+    check(args.sample)
+    print(f"{'per-row':<10} {seconds:9.2f} {args.bookings / seconds:11.0f} "
+          f"{counter['n'] * args.bookings // args.sample:11d}  (extrapolated from {args.sample})")
+
+    populate(args.bookings, now)
+    counter, stop = count_statements()
+    start = time.perf_counter()
+    with SessionLocal() as db:
+        expired, _ = crud.apply_due_lifecycle(db, datetime.utcnow())
+    seconds = time.perf_counter() - start
+    stop()
+    assert expired == args.bookings, expired
+    check(args.bookings)
+    print(f"{'bulk':<10} {seconds:9.2f} {args.bookings / seconds:11.0f} {counter['n']:11d}")
+
+    populate(args.bookings, now, ends_in=timedelta(minutes=15))
+    start = time.perf_counter()
+    with SessionLocal() as db:
+        deadlines = crud.get_lifecycle_deadlines(db, now, now + SCHEDULE_HORIZON)
+    seconds = time.perf_counter() - start
+    print(f"{'recovery':<10} {seconds:9.2f} {args.bookings / seconds:11.0f} {2:11d}  "
+          f"({len(deadlines)} distinct deadlines)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Learned free-time model vs. the constant AVG_PARKING_DURATION heuristic.
+
+Synthetic stays depend on zone, vehicle type and time of day (short errands,
+office-hours commuters, overnight parking). The model is trained on 80% of
+them; for each held-out stay we look at the car some time into its stay and
+ask how long it has left and whether it frees up within FREEING_SOON_MINUTES.
+
+Run from the repo root:  python benchmarks/bench_free_time.py --bookings 200000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_logic import AVG_PARKING_DURATION, FREEING_SOON_MINUTES  # noqa: E402
+from free_time_model import FreeTimeModel, _ts  # noqa: E402
+
+BASE = datetime(2026, 1, 5)  # a Monday
+
+
+def stay_minutes(rng, zone, vehicle, start):
+    hour, weekday = start.hour, start.weekday() < 5
+    if weekday and 7 <= hour < 10 and vehicle != "Bike":
+        return rng.gauss(9 * 60, 45)  # commuters
+    if hour >= 20:
+        return rng.gauss(10 * 60, 60)  # overnight
+    if vehicle == "Bike":
+        return rng.expovariate(1 / 25)
+    return rng.lognormvariate(3.6 + 0.3 * "ABC".index(zone), 0.6)  # errands, longer in cheaper zones
+
+
+def make_stays(n, seed=11):
+    rng = random.Random(seed)
+    stays = []
+    for _ in range(n):
+        zone = rng.choice("ABC")
+        vehicle = rng.choice(("Car", "Car", "Bike", "SUV"))
+        start = BASE + timedelta(minutes=rng.uniform(0, 8 * 7 * 24 * 60))
+        minutes = max(1.0, stay_minutes(rng, zone, vehicle, start))
+        stays.append((zone, vehicle, start, start + timedelta(minutes=minutes)))
+    return stays
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--bookings", type=int, default=200000)
+    parser.add_argument("--occupied", type=int, default=100000, help="slots per batch-inference call")
+    args = parser.parse_args()
+
+    stays = make_stays(args.bookings)
+    split = int(len(stays) * 0.8)
+    train, test = stays[:split], stays[split:]
+
+    start = time.perf_counter()
+    model = FreeTimeModel.fit(train)
+    fit_s = time.perf_counter() - start
+    path = os.path.join(tempfile.mkdtemp(), "model.npz")
+    model.save(path)
+    start = time.perf_counter()
+    model = FreeTimeModel.load(path)
+    load_s = time.perf_counter() - start
+
+    rng = random.Random(5)
+    zones, vehicles, start_ts, now_ts, truth = [], [], [], [], []
+    for zone, vehicle, s, e in test:
+        total = (e - s).total_seconds() / 60
+        elapsed = rng.uniform(0, total)
+        zones.append(zone)
+        vehicles.append(vehicle)
+        start_ts.append(_ts(s))
+        now_ts.append(_ts(s) + elapsed * 60)
+        truth.append(total - elapsed)
+    start_ts, now_ts, truth = np.array(start_ts), np.array(now_ts), np.array(truth)
+    elapsed = (now_ts - start_ts) / 60
+
+    learned = model.predict_remaining(zones, vehicles, start_ts, now_ts)
+    heuristic = np.maximum(0.0, AVG_PARKING_DURATION - elapsed)
+
+    soon = truth < FREEING_SOON_MINUTES
+    print(f"trained on {len(train)} stays in {fit_s:.2f}s; model file {os.path.getsize(path) / 1024:.0f} KiB, "
+          f"loads in {load_s * 1000:.0f} ms")
+    print(f"{'':<10} {'MAE min':>9} {'median AE':>10} {'soon acc':>9} {'soon prec':>10} {'soon rec':>9}")
+    for name, pred in (("heuristic", heuristic), ("learned", learned)):
+        err = np.abs(pred - truth)
+        flagged = pred < FREEING_SOON_MINUTES
+        precision = (flagged & soon).sum() / max(1, flagged.sum())
+        recall = (flagged & soon).sum() / max(1, soon.sum())
+        print(f"{name:<10} {err.mean():9.1f} {np.median(err):10.1f} {(flagged == soon).mean():9.1%} "
+              f"{precision:10.1%} {recall:9.1%}")
+
+    idx = np.random.default_rng(0).integers(0, len(zones), args.occupied)
+    batch = ([zones[i] for i in idx], [vehicles[i] for i in idx], start_ts[idx], now_ts[idx])
+    timings = []
+    for _ in range(5):
+        start = time.perf_counter()
+        model.predict_remaining(*batch)
+        timings.append(time.perf_counter() - start)
+    h_timings = []
+    for _ in range(5):
+        start = time.perf_counter()
+        np.maximum(0.0, AVG_PARKING_DURATION - (batch[3] - batch[2]) / 60)
+        h_timings.append(time.perf_counter() - start)
+    print(f"batch inference for {args.occupied} occupied slots: learned {min(timings) * 1000:.1f} ms, "
+          f"heuristic {min(h_timings) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Nearest-k parking search over garage slots and peer listings.
+
+  scan    score every location (distance penalty + calculate_slot_score), take k best
+  grid    geo_index.nearby_parking over the ring-walking grid index
+
+Run from the repo root:  python benchmarks/bench_geo.py --slots 200000 --listings 100000
+"""
+import argparse
+import heapq
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_logic import DISTANCE_PENALTY_PER_KM, calculate_slot_score  # noqa: E402
+from geo_index import LISTING, SLOT, GeoEntry, GeoIndex, haversine_km, nearby_parking  # noqa: E402
+
+from make_geo_dataset import CENTER, generate  # noqa: E402
+
+
+def entries(slot_rows, listing_rows):
+    for i, row in enumerate(slot_rows, 1):
+        yield GeoEntry(
+            SLOT, i, row["slot_number"], row["latitude"], row["longitude"], zone=row["zone"],
+            price_per_hour=row["price_per_hour"], vehicle_types=frozenset(row["vehicle_types"].split(",")),
+            is_occupied=row["is_occupied"],
+        )
+    for i, row in enumerate(listing_rows, 1):
+        yield GeoEntry(
+            LISTING, i, row["title"], row["latitude"], row["longitude"],
+            price_per_hour=row["price_per_hour"], is_occupied=not row["is_available"],
+        )
+
+
+def scan(all_entries, lat, lon, k, vehicle_type):
+    candidates = (
+        (DISTANCE_PENALTY_PER_KM * haversine_km(lat, lon, e.lat, e.lon) - calculate_slot_score(e), e.kind, e.id)
+        for e in all_entries
+        if not e.is_occupied and (e.vehicle_types is None or vehicle_type in e.vehicle_types)
+    )
+    return heapq.nsmallest(k, candidates)
+
+
+def percentile(values, p):
+    return sorted(values)[min(len(values) - 1, int(len(values) * p))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--slots", type=int, default=200000)
+    parser.add_argument("--listings", type=int, default=100000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--cell-km", type=float, default=0.25)
+    args = parser.parse_args()
+
+    slot_rows, listing_rows = generate(args.slots, args.listings)
+    all_entries = list(entries(slot_rows, listing_rows))
+
+    index = GeoIndex(cell_km=args.cell_km)
+    start = time.perf_counter()
+    index.load(all_entries)
+    print(f"{len(index)} locations indexed in {time.perf_counter() - start:.2f}s")
+
+    rng = random.Random(3)
+    queries = [
+        (CENTER[0] + rng.gauss(0, 0.08), CENTER[1] + rng.gauss(0, 0.08), rng.choice(("Car", "Bike", "SUV")))
+        for _ in range(args.queries)
+    ]
+
+    grid_ms = []
+    for lat, lon, vehicle_type in queries:
+        start = time.perf_counter()
+        nearby_parking(index, lat, lon, args.k, vehicle_type)
+        grid_ms.append((time.perf_counter() - start) * 1000)
+
+    scan_ms = []
+    for lat, lon, vehicle_type in queries[:10]:
+        start = time.perf_counter()
+        expected = scan(all_entries, lat, lon, args.k, vehicle_type)
+        scan_ms.append((time.perf_counter() - start) * 1000)
+        got = nearby_parking(index, lat, lon, args.k, vehicle_type)
+        assert [(e.kind, e.id) for _, _, _, e in got] == [(kind, id) for _, kind, id in expected]
+
+    print(f"k={args.k}, ms per query")
+    print(f"scan  mean {statistics.mean(scan_ms):8.2f}")
+    print(f"grid  mean {statistics.mean(grid_ms):8.3f}  p50 {percentile(grid_ms, 0.5):.3f}  p99 {percentile(grid_ms, 0.99):.3f}")
+
+
+if __name__ == "__main__":
+    main()
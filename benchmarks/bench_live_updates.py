@@ -0,0 +1,78 @@
+"""Broadcast latency of the live occupancy channel at 1k/5k idle subscribers.
+
+Events are published from a worker thread, as crud does, and every subscriber
+records when each event reaches it.
+
+Run from the repo root:  python benchmarks/bench_live_updates.py --subscribers 1000 5000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from live_updates import OccupancyBroadcaster  # noqa: E402
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run(subscribers, events, interval, zones):
+    broadcaster = OccupancyBroadcaster(history=events + 1)
+    broadcaster.bind(asyncio.get_running_loop())
+    sent_at = {}
+    latencies = []
+
+    async def listen(sub):
+        # Events arrive in publish order, so the n-th event frame is event n.
+        seen = 0
+        stream = broadcaster.stream(sub)
+        async for chunk in stream:
+            now = time.perf_counter()
+            for _ in range(chunk.count(b"event: slot")):
+                latencies.append(now - sent_at[seen])
+                seen += 1
+            if seen == events:
+                break
+        await stream.aclose()
+
+    # Half listen to everything, half to a single zone, like the /slots filter.
+    subs = [broadcaster.subscribe(None if i % 2 else zones[0]) for i in range(subscribers)]
+    tasks = [asyncio.create_task(listen(sub)) for sub in subs]
+
+    def publish():
+        for seq in range(events):
+            sent_at[seq] = time.perf_counter()
+            broadcaster.publish({"slot_id": seq, "zone": zones[0], "is_occupied": bool(seq % 2)})
+            time.sleep(interval)
+
+    start = time.perf_counter()
+    await asyncio.gather(asyncio.to_thread(publish), *tasks)
+    elapsed = time.perf_counter() - start
+    broadcaster.close()
+    return len(latencies), elapsed, latencies
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--subscribers", type=int, nargs="+", default=[1000, 5000])
+    parser.add_argument("--events", type=int, default=100)
+    parser.add_argument("--rate", type=float, default=50, help="published events per second")
+    args = parser.parse_args()
+
+    print(f"{args.events} events at {args.rate:g}/s")
+    print(f"{'subscribers':>11} {'deliveries':>10} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for n in args.subscribers:
+        delivered, _, lat = await run(n, args.events, 1 / args.rate, ["A", "B", "C"])
+        print(
+            f"{n:>11} {delivered:>10} {percentile(lat, 50) * 1000:8.2f} "
+            f"{percentile(lat, 99) * 1000:8.2f} {max(lat) * 1000:8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,92 @@
+"""Overhead of request instrumentation (metrics.py) on typical routes.
+
+Each mode runs in its own process, because PARKWISE_METRICS is read at import:
+
+  off        PARKWISE_METRICS=0: no middleware, no SQL hooks, no wrappers
+  on         middleware + SQL/template/scoring timing (the default)
+  profiled   on, with every request asking for a Server-Timing header
+
+Run from the repo root:  python benchmarks/bench_metrics.py --slots 2000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROUTES = ("/api/slots", "/find-parking", "/slots", "/history", "/api/availability?start=2031-01-01T10:00")
+
+
+def worker(slots, requests, profiled):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from fastapi.testclient import TestClient
+
+    import main
+    from database import SessionLocal, engine
+    from migrations import apply_migrations
+    from models import ParkingSlot
+
+    apply_migrations(engine)
+    with SessionLocal() as db:
+        db.add_all(
+            ParkingSlot(slot_number=f"{'ABC'[i % 3]}{i:05d}", zone="ABC"[i % 3], is_occupied=i % 4 == 0)
+            for i in range(slots)
+        )
+        db.commit()
+
+    headers = {"X-Profile": "1"} if profiled else {}
+    results = {}
+    with TestClient(main.app) as client:
+        login = client.post("/login", data={"email": "bench@parkwise", "name": "Bench"}, follow_redirects=False)
+        client.cookies.set("session_id", login.cookies["session_id"])
+        client.post("/vehicle-type", data={"vehicle_type": "Car"})
+        for route in ROUTES:
+            for _ in range(3):
+                client.get(route, headers=headers)
+            best = float("inf")
+            for _ in range(5):
+                start = time.perf_counter()
+                for _ in range(requests):
+                    client.get(route, headers=headers)
+                best = min(best, (time.perf_counter() - start) / requests)
+            results[route] = best * 1000
+    print(json.dumps(results))
+
+
+def run(mode, args):
+    env = dict(os.environ)
+    env["PARKWISE_DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+    env["PARKWISE_METRICS"] = "0" if mode == "off" else "1"
+    env["PARKWISE_PROFILE_HEADER"] = "1" if mode == "profiled" else "0"
+    out = subprocess.run(
+        [sys.executable, __file__, "--worker", "--slots", str(args.slots), "--requests", str(args.requests)]
+        + (["--profiled"] if mode == "profiled" else []),
+        env=env, check=True, capture_output=True, text=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--slots", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--profiled", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        return worker(args.slots, args.requests, args.profiled)
+
+    modes = ("off", "on", "profiled")
+    results = {mode: run(mode, args) for mode in modes}
+    print(f"ms per request (best of 5 x {args.requests}), {args.slots} slots")
+    print(f"{'route':<45}" + "".join(f"{mode:>10}" for mode in modes) + f"{'overhead':>10}")
+    for route in ROUTES:
+        off, on = results["off"][route], results["on"][route]
+        print(f"{route:<45}" + "".join(f"{results[mode][route]:10.3f}" for mode in modes)
+              + f"{(on - off) / off:10.1%}")
+
+
+if __name__ == "__main__":
+    main()
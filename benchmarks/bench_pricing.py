@@ -0,0 +1,109 @@
+"""Dynamic pricing cost: incremental occupancy vs. counting rows per request.
+
+  count     per quote: SELECT zone occupied/total counts, then price the slot
+            (what pricing would cost without the in-memory engine)
+  engine    per quote: PricingEngine.price from its maintained counts
+  per-slot  pricing a full inventory one engine.price call at a time
+  bulk      pricing a full inventory with one price_many call
+  quotes    QuoteBook.quote + redeem round trips
+
+Run from the repo root:  python benchmarks/bench_pricing.py --slots 10000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("PARKWISE_DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+
+from sqlalchemy import case, func, insert, select  # noqa: E402
+
+import crud  # noqa: E402
+from database import SessionLocal, engine  # noqa: E402
+from migrations import apply_migrations  # noqa: E402
+from models import ParkingSlot  # noqa: E402
+from pricing import PricingEngine, QuoteBook  # noqa: E402
+
+ZONES = "ABCDEFGH"
+
+
+def populate(n):
+    rng = random.Random(1)
+    with engine.begin() as conn:
+        conn.execute(insert(ParkingSlot), [
+            {"slot_number": f"P{i:06d}", "zone": ZONES[i % len(ZONES)],
+             "is_occupied": rng.random() < 0.7, "price_per_hour": rng.choice((40.0, 50.0, 60.0))}
+            for i in range(n)
+        ])
+
+
+def rate(fn, n):
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        fn(n)
+        best = min(best, time.perf_counter() - start)
+    return n / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--slots", type=int, default=10000)
+    parser.add_argument("--quotes", type=int, default=2000)
+    args = parser.parse_args()
+
+    apply_migrations(engine)
+    populate(args.slots)
+    with SessionLocal() as db:
+        slots = db.execute(select(ParkingSlot.id, ParkingSlot.zone, ParkingSlot.price_per_hour)).all()
+        pricing = crud.get_pricing_engine(db)
+    rng = random.Random(2)
+    for _ in range(200):
+        pricing.record_arrival(rng.choice(slots).id)
+    sample = [rng.choice(slots) for _ in range(args.quotes)]
+
+    def by_count(n):
+        with SessionLocal() as db:
+            for slot in sample[:n]:
+                occupied, total = db.execute(
+                    select(func.sum(case((ParkingSlot.is_occupied, 1), else_=0)), func.count())
+                    .where(ParkingSlot.zone == slot.zone)
+                ).one()
+                round(slot.price_per_hour * (1.0 + max(0.0, occupied / total - 0.6)), 2)
+
+    def by_engine(n):
+        for slot in sample[:n]:
+            pricing.price(slot.zone, slot.price_per_hour)
+
+    zones = [s.zone for s in slots]
+    bases = [s.price_per_hour for s in slots]
+
+    def per_slot(n):
+        multipliers = pricing.multipliers()
+        [pricing.price(zone, base, multipliers) for zone, base in zip(zones, bases)]
+
+    def bulk(n):
+        pricing.price_many(zones, bases)
+
+    book = QuoteBook()
+
+    def quotes(n):
+        for i, slot in enumerate(sample[:n]):
+            quote = book.quote(slot.id, "bench@parkwise", slot.price_per_hour + i)  # a new price every time
+            assert book.redeem(quote.id, slot.id, "bench@parkwise") == quote.price_per_hour
+
+    print(f"{args.slots} slots in {len(ZONES)} zones, multipliers {pricing.multipliers()}")
+    print(f"{'':<10} {'ops/s':>12}")
+    print(f"{'count':<10} {rate(by_count, min(args.quotes, 200)):12.0f}  quotes")
+    print(f"{'engine':<10} {rate(by_engine, args.quotes):12.0f}  quotes")
+    print(f"{'per-slot':<10} {rate(per_slot, 1) * len(slots):12.0f}  slots priced")
+    print(f"{'bulk':<10} {rate(bulk, 1) * len(slots):12.0f}  slots priced")
+    print(f"{'quotes':<10} {rate(quotes, args.quotes):12.0f}  quote+redeem")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Per-row calculate_slot_score loop vs. batched score_slots + top-k.
+
+Run from the repo root:  python benchmarks/bench_scoring.py --slots 50000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_logic import (  # noqa: E402
+    ZONE_SCORES, _to_epoch, calculate_slot_score, score_slot_columns, score_slots,
+)
+
+
+def top_k_indices(scores: np.ndarray, k: int, mask: np.ndarray = None) -> np.ndarray:
+    """Indices of the k best scores, highest first, ties kept in input order."""
+    candidates = np.arange(len(scores)) if mask is None else np.flatnonzero(mask)
+    if k <= 0 or not len(candidates):
+        return candidates[:0]
+
+    # Unique key per candidate: higher score first, then lower position.
+    keys = -np.asarray(scores, dtype=np.int64)[candidates] * (len(scores) + 1) + candidates
+    if k < len(candidates):
+        part = np.argpartition(keys, k - 1)[:k]
+        candidates, keys = candidates[part], keys[part]
+    return candidates[np.argsort(keys)]
+
+
+def make_slots(n, seed=42):
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    zones = list(ZONE_SCORES) + ["D", "E"]
+    slots = []
+    for i in range(n):
+        occupied = rng.random() < 0.6
+        slots.append(SimpleNamespace(
+            id=i + 1,
+            zone=rng.choice(zones),
+            is_occupied=occupied,
+            last_occupied_time=now - timedelta(minutes=rng.uniform(0, 120)) if occupied else None,
+        ))
+    return slots
+
+
+def loop_top3(slots):
+    scored = [(s, calculate_slot_score(s)) for s in slots]
+    available = [p for p in scored if not p[0].is_occupied]
+    return [s.id for s, _ in sorted(available, key=lambda p: p[1], reverse=True)[:3]]
+
+
+def batched_top3(slots):
+    scores = score_slots(slots, now=datetime.utcnow())
+    mask = np.fromiter((not s.is_occupied for s in slots), dtype=bool, count=len(slots))
+    return [slots[i].id for i in top_k_indices(scores, 3, mask=mask)]
+
+
+def to_columns(slots):
+    return {
+        "ids": np.array([s.id for s in slots]),
+        "zones": np.array([s.zone for s in slots]),
+        "is_occupied": np.array([s.is_occupied for s in slots], dtype=bool),
+        "last_occupied_time": _to_epoch([s.last_occupied_time for s in slots]),
+    }
+
+
+def columnar_top3(cols):
+    scores = score_slot_columns(
+        cols["zones"], cols["is_occupied"], cols["last_occupied_time"], now=datetime.utcnow()
+    )
+    return cols["ids"][top_k_indices(scores, 3, mask=~cols["is_occupied"])].tolist()
+
+
+def best_of(fn, arg, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(arg)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--slots", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    slots = make_slots(args.slots)
+    loop_t, loop_res = best_of(loop_top3, slots, args.repeat)
+    batch_t, batch_res = best_of(batched_top3, slots, args.repeat)
+    cols_t, cols_res = best_of(columnar_top3, to_columns(slots), args.repeat)
+    assert loop_res == batch_res == cols_res, (loop_res, batch_res, cols_res)
+
+    print(f"slots:    {args.slots}")
+    print(f"loop:     {loop_t * 1000:8.2f} ms")
+    print(f"batched:  {batch_t * 1000:8.2f} ms")
+    print(f"columnar: {cols_t * 1000:8.2f} ms  (pre-extracted columns)")
+    print(f"speedup:  {loop_t / batch_t:8.1f}x batched, {loop_t / cols_t:.1f}x columnar")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Sustained sensor ingestion through POST /api/sensors/events on SQLite.
+
+  per-event  one UPDATE + COMMIT per reading (what writing each sensor change
+             as it arrives would cost), timed on a sample
+  json       gateways post JSON arrays of readings
+  binary     gateways post packed 13-byte records
+
+Each gateway posts --batch readings for random slots in a loop for --seconds,
+backing off on 429. Throughput counts readings accepted until the queue has
+drained, so it is what the database kept up with, not just what was buffered.
+
+Run from the repo root:  python benchmarks/bench_sensors.py --slots 10000 --seconds 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("PARKWISE_DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+
+import numpy as np  # noqa: E402
+from sqlalchemy import delete, insert, update  # noqa: E402
+
+import main  # noqa: E402
+import sensor_ingest  # noqa: E402
+from database import SessionLocal, engine  # noqa: E402
+from migrations import apply_migrations  # noqa: E402
+from models import ParkingSlot  # noqa: E402
+from sensor_ingest import EVENT_DTYPE, SENSOR_EVENTS, sensor_ingestor  # noqa: E402
+
+
+def populate(n):
+    apply_migrations(engine)
+    with engine.begin() as conn:
+        conn.execute(delete(ParkingSlot))
+        conn.execute(insert(ParkingSlot), [
+            {"id": i + 1, "slot_number": f"S{i:06d}", "zone": "ABC"[i % 3], "is_occupied": False}
+            for i in range(n)
+        ])
+
+
+def per_event(slots, sample):
+    rng = random.Random(1)
+    start = time.perf_counter()
+    with SessionLocal() as db:
+        for _ in range(sample):
+            db.execute(
+                update(ParkingSlot).where(ParkingSlot.id == rng.randint(1, slots))
+                .values(is_occupied=rng.random() < 0.5)
+            )
+            db.commit()
+    return sample / (time.perf_counter() - start)
+
+
+def make_body(fmt, rng, slots, batch):
+    events = np.empty(batch, dtype=EVENT_DTYPE)
+    events["slot_id"] = rng.integers(1, slots + 1, batch)
+    events["occupied"] = rng.integers(0, 2, batch)
+    events["ts"] = time.time()
+    if fmt == "binary":
+        return events.tobytes(), "application/octet-stream"
+    return json.dumps([[int(s), int(o), float(t)] for s, o, t in events.tolist()]), "application/json"
+
+
+def counter(outcome):
+    return SENSOR_EVENTS._values.get((outcome,), 0)
+
+
+async def ingest(fmt, args):
+    import httpx
+
+    outcomes = ("accepted", "rejected", "coalesced", "applied")
+    before = {outcome: counter(outcome) for outcome in outcomes}
+    flushes = sensor_ingestor.flushes
+    throttled = 0
+    # Bodies are built up front so the run measures the server, not the client
+    rng = np.random.default_rng(2)
+    bodies = [make_body(fmt, rng, args.slots, args.batch) for _ in range(64)]
+
+    async with main.app.router.lifespan_context(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            deadline = time.perf_counter() + args.seconds
+
+            async def gateway(i):
+                nonlocal throttled
+                n = i
+                while time.perf_counter() < deadline:
+                    body, content_type = bodies[n % len(bodies)]
+                    n += 1
+                    response = await client.post("/api/sensors/events", content=body, headers={
+                        "X-Sensor-Token": main.SENSOR_TOKEN, "Content-Type": content_type,
+                    })
+                    if response.status_code == 429:
+                        throttled += 1
+                        await asyncio.sleep(0.01)
+                    else:
+                        assert response.status_code == 202, response.text
+
+            start = time.perf_counter()
+            await asyncio.gather(*(gateway(i) for i in range(args.gateways)))
+            while sensor_ingestor.pending:
+                await asyncio.sleep(0.005)
+            elapsed = time.perf_counter() - start
+    delta = {outcome: counter(outcome) - before[outcome] for outcome in outcomes}
+    return elapsed, delta, sensor_ingestor.flushes - flushes, throttled
+
+
+def main_():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--slots", type=int, default=10000)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--batch", type=int, default=1000, help="readings per request")
+    parser.add_argument("--gateways", type=int, default=8, help="concurrent posting clients")
+    parser.add_argument("--sample", type=int, default=1000, help="readings written one by one")
+    args = parser.parse_args()
+
+    main.SENSOR_TOKEN = "bench"
+    populate(args.slots)
+    print(f"{args.slots} slots, {args.gateways} gateways x {args.batch} readings per request, "
+          f"flush every {sensor_ingest.FLUSH_INTERVAL * 1000:.0f} ms")
+    print(f"{'':<10} {'readings/s':>11} {'flushes':>8} {'coalesced':>10} {'rows written':>13} {'429s':>6}")
+    print(f"{'per-event':<10} {per_event(args.slots, args.sample):11.0f}")
+    for fmt in ("json", "binary"):
+        elapsed, delta, flushes, throttled = asyncio.run(ingest(fmt, args))
+        print(f"{fmt:<10} {delta['accepted'] / elapsed:11.0f} {flushes:8d} "
+              f"{delta['coalesced'] / max(1, delta['accepted']):10.0%} {delta['applied']:13d} {throttled:6d}")
+
+
+if __name__ == "__main__":
+    main_()
@@ -0,0 +1,164 @@
+"""JSON payloads for 10k slots / bookings: CPU and allocations per request.
+
+  before   the previous path: RowMapping dicts (or per-slot view dicts), then
+           FastAPI's jsonable_encoder and json.dumps
+  after    Core row tuples zipped into dicts and serialization.dumps (orjson
+           when installed, else pydantic-core), returned without jsonable_encoder
+
+Cases:
+  inventory        GET /api/slots, full inventory (after: encoded once, then
+                   served as bytes until occupancy or prices change)
+  inventory, cold  the same right after an occupancy change (caches reloaded)
+  slots page       GET /api/slots?limit=1000
+  bookings page    GET /api/bookings?limit=1000
+  bookings ndjson  GET /api/bookings?format=ndjson, whole table
+
+CPU is process time per request through the ASGI app (best of --repeat);
+allocations are the tracemalloc peak of one request.
+
+Run from the repo root:  python benchmarks/bench_serialization.py --slots 10000
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("PARKWISE_DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+os.environ.setdefault("PARKWISE_AUTO_EXPIRE", "0")
+# /api/bookings returns every user's bookings only to the admin
+os.environ.setdefault("PARKWISE_ADMIN_TOKEN", "bench")
+
+from fastapi import Depends  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse, StreamingResponse  # noqa: E402
+from sqlalchemy import delete, insert  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession  # noqa: E402
+
+import async_crud  # noqa: E402
+import main  # noqa: E402
+import serialization  # noqa: E402
+from cache import SLOT_INVENTORY_BODY_KEY, SLOT_OCCUPANCY_KEY, slot_cache  # noqa: E402
+from database import async_engine, engine, get_async_db  # noqa: E402
+from migrations import apply_migrations  # noqa: E402
+from models import Booking, ParkingSlot  # noqa: E402
+
+INVENTORY_KEYS = ("id", "slot_number", "zone", "is_occupied", "price_per_hour", "current_price")
+
+
+# The handlers as they were, mounted next to the current ones for comparison
+@main.app.get("/before/api/slots")
+async def before_api_slots(limit: int = 0, db: AsyncSession = Depends(get_async_db)):
+    if not limit:
+        views = await async_crud.get_slot_views(db)
+        return JSONResponse(jsonable_encoder([{key: s[key] for key in INVENTORY_KEYS} for s in views]))
+    query = async_crud.slot_rows_query(0, limit)
+    return JSONResponse(jsonable_encoder([dict(row) for row in (await db.execute(query)).mappings()]))
+
+
+@main.app.get("/before/api/bookings")
+async def before_api_bookings(limit: int = 0, format: str = "json", db: AsyncSession = Depends(get_async_db)):
+    if format == "ndjson":
+        async def stream():
+            async with async_engine.connect() as conn:
+                result = await conn.stream(async_crud.booking_rows_query().execution_options(yield_per=1000))
+                async for chunk in result.mappings().partitions(1000):
+                    yield "".join(
+                        json.dumps(dict(row), default=lambda v: v.isoformat()) + "\n" for row in chunk
+                    )
+        return StreamingResponse(stream(), media_type="application/x-ndjson")
+    query = async_crud.booking_rows_query(None, limit)
+    return JSONResponse(jsonable_encoder([dict(row) for row in (await db.execute(query)).mappings()]))
+
+
+def populate(slots, bookings):
+    apply_migrations(engine)
+    start = datetime(2030, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(delete(Booking))
+        conn.execute(delete(ParkingSlot))
+        conn.execute(insert(ParkingSlot), [
+            {"id": i + 1, "slot_number": f"S{i:06d}", "zone": "ABC"[i % 3], "price_per_hour": 20.0,
+             "vehicle_types": "Car,Bike,SUV", "is_occupied": i % 4 == 0}
+            for i in range(slots)
+        ])
+        conn.execute(insert(Booking), [
+            {"slot_id": i % slots + 1, "user_email": f"user{i % 500}@parkwise", "user_name": "Bench",
+             "phone_number": "555", "vehicle_type": "Car", "vehicle_number": f"KA{i:05d}",
+             "start_time": start + timedelta(minutes=7 * i), "end_time": start + timedelta(minutes=7 * i + 90),
+             "total_cost": 30.0, "price_per_hour": 20.0, "status": "completed"}
+            for i in range(bookings)
+        ])
+
+
+def occupancy_changed():
+    # What a booking or sensor write does to the caches
+    slot_cache.invalidate(SLOT_OCCUPANCY_KEY, SLOT_INVENTORY_BODY_KEY)
+
+
+async def measure(client, path, repeat, before=None):
+    async def once():
+        if before:
+            before()
+        response = await client.get(path)
+        assert response.status_code == 200, (path, response.status_code)
+        return len(response.content)
+
+    size = await once()  # warm-up
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.process_time()
+        await once()
+        best = min(best, time.process_time() - start)
+    tracemalloc.start()
+    await once()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak, size
+
+
+async def run(args):
+    import httpx
+
+    cases = [
+        ("inventory", "/before/api/slots", "/api/slots", None),
+        ("inventory, cold", "/before/api/slots", "/api/slots", occupancy_changed),
+        ("slots page", "/before/api/slots?limit=1000", "/api/slots?limit=1000", None),
+        ("bookings page", "/before/api/bookings?limit=1000", "/api/bookings?limit=1000", None),
+        ("bookings ndjson", "/before/api/bookings?format=ndjson", "/api/bookings?format=ndjson", None),
+    ]
+    async with main.app.router.lifespan_context(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver",
+                                     headers={"X-Admin-Token": main.ADMIN_TOKEN}) as client:
+            print(f"{'':<16} {'before ms':>10} {'after ms':>9} {'speedup':>8} "
+                  f"{'before peak KB':>15} {'after peak KB':>14} {'bytes':>9}")
+            for name, old, new, before in cases:
+                old_cpu, old_peak, old_size = await measure(client, old, args.repeat, before)
+                new_cpu, new_peak, new_size = await measure(client, new, args.repeat, before)
+                print(f"{name:<16} {old_cpu * 1000:10.2f} {new_cpu * 1000:9.2f} "
+                      f"{old_cpu / max(new_cpu, 1e-6):7.1f}x {old_peak / 1024:15.0f} {new_peak / 1024:14.0f} "
+                      f"{new_size:9d}")
+
+
+def main_():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--slots", type=int, default=10000)
+    parser.add_argument("--bookings", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    populate(args.slots, args.bookings)
+    encoder = "orjson" if serialization.orjson is not None else "pydantic-core"
+    print(f"{args.slots} slots, {args.bookings} bookings, encoder: {encoder}")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main_()
@@ -0,0 +1,64 @@
+"""Session store throughput and memory under many logins.
+
+Creates --sessions sessions (bounded by --max-sessions), looks random ones up,
+then sweeps after simulated expiry. Compares the in-process store with the
+shared SQLite one.
+
+Run from the repo root:  python benchmarks/bench_sessions.py --sessions 200000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from session_store import MemorySessionStore, SQLiteSessionStore  # noqa: E402
+
+
+def run(name, store, sessions, lookups):
+    tracemalloc.start()
+    start = time.perf_counter()
+    ids = []
+    for i in range(sessions):
+        email = f"user{i}@parkwise"
+        store.create_user(f"User {i}", email)
+        ids.append(store.create_session(email))
+    create = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    sample = random.choices(ids, k=lookups)
+    start = time.perf_counter()
+    found = sum(store.get_session_user(session_id) is not None for session_id in sample)
+    lookup = time.perf_counter() - start
+
+    start = time.perf_counter()
+    removed = store.sweep(now=time.time() + store.ttl + 1)
+    sweep = time.perf_counter() - start
+
+    print(
+        f"{name:<8} create {sessions / create:10.0f}/s  lookup {lookups / lookup:10.0f}/s "
+        f"(hit {found / lookups:.0%})  sweep {removed} in {sweep * 1000:.1f} ms  "
+        f"peak {peak / 2**20:.1f} MiB"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=200000)
+    parser.add_argument("--lookups", type=int, default=100000)
+    parser.add_argument("--max-sessions", type=int, default=100000)
+    args = parser.parse_args()
+
+    bound = dict(max_sessions=args.max_sessions)
+    run("memory", MemorySessionStore(max_users=args.max_sessions, **bound), args.sessions, args.lookups)
+    path = os.path.join(tempfile.mkdtemp(), "sessions.db")
+    run("sqlite", SQLiteSessionStore(path, **bound), args.sessions, args.lookups)
+
+
+if __name__ == "__main__":
+    main()
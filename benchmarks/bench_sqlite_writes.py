@@ -0,0 +1,83 @@
+"""Write-heavy booking throughput: default SQLite vs. the production pragma
+profile, with and without the group-commit writer. Transactions begin with BEGIN
+IMMEDIATE, as on database.write_engine.
+
+Run from the repo root:  python benchmarks/bench_sqlite_writes.py --bookings 2000 --threads 16
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+import crud  # noqa: E402
+from database import SQLITE_PRODUCTION_PRAGMAS, Base, begin_immediate, configure_sqlite  # noqa: E402
+from group_commit import GroupCommitWriter  # noqa: E402
+from models import Booking, ParkingSlot  # noqa: E402
+from schemas import BookingCreate  # noqa: E402
+
+
+def run(tmp, profile, grouped, bookings, threads):
+    engine = create_engine(
+        f"sqlite:///{tmp}/{profile}-{grouped}.db",
+        connect_args={"check_same_thread": False, "timeout": 30},
+        pool_size=threads,
+    )
+    begin_immediate(engine)
+    if profile == "production":
+        configure_sqlite(engine, SQLITE_PRODUCTION_PRAGMAS)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with Session() as db:
+        db.add_all(ParkingSlot(slot_number=f"W{i:06d}", zone="B", is_occupied=False) for i in range(bookings))
+        db.commit()
+        slot_ids = [i for (i,) in db.query(ParkingSlot.id).all()]
+
+    writer = None
+    if grouped:
+        writer = GroupCommitWriter(sessionmaker(autoflush=False, expire_on_commit=False, bind=engine))
+        writer.start()
+
+    def book(slot_id):
+        data = BookingCreate(slot_id=slot_id, user_name="bench", start_time=datetime.utcnow())
+        if writer:
+            return writer.submit(lambda db: crud.create_booking(db, data, commit=False)).result()
+        with Session() as db:
+            return crud.create_booking(db, data)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(book, slot_ids))
+    elapsed = time.perf_counter() - start
+
+    if writer:
+        writer.stop()
+    with Session() as db:
+        assert db.query(Booking).count() == len(slot_ids) == sum(r is not None for r in results)
+    engine.dispose()
+    return len(slot_ids) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--bookings", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=16)
+    args = parser.parse_args()
+
+    print(f"{'profile':<11} {'group commit':<13} {'bookings/s':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for profile in ("default", "production"):
+            for grouped in (False, True):
+                rate = run(tmp, profile, grouped, args.bookings, args.threads)
+                print(f"{profile:<11} {'on' if grouped else 'off':<13} {rate:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Startup time: import cost and time to first request, 1 vs N uvicorn workers.
+
+  import     `import main` in a fresh interpreter (database already prepared)
+  direct     `uvicorn main:app --workers N`: every worker migrates and seeds in
+             its own lifespan, racing the others on a fresh database
+  launcher   `python launcher.py --workers N`: migrate, seed, build assets and
+             templates once, then start workers that only warm up
+
+Each server run starts from a fresh database, asset build and template cache.
+Times are from process start: first answered request (GET /api/slots), and
+every worker reporting ready on /readyz. "first" and "warm" are the latency of
+the first /api/slots answer and of the same request once settled. "slots" is
+how many demo slots ended up seeded (20 when seeding ran once).
+
+Run from the repo root:  python benchmarks/bench_startup.py --workers 4
+"""
+import argparse
+import json
+import os
+import signal
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def fresh_env(tmp):
+    env = dict(os.environ)
+    env.pop("PARKWISE_PREPARED", None)
+    env.update({
+        "PARKWISE_DATABASE_URL": f"sqlite:///{tmp}/bench.db",
+        "PARKWISE_STATIC_BUILD_DIR": f"{tmp}/static_build",
+        "PARKWISE_TEMPLATE_CACHE_DIR": f"{tmp}/template_cache",
+        "PARKWISE_SESSION_STORE": f"sqlite:///{tmp}/sessions.db",
+    })
+    return env
+
+
+def import_time(trials):
+    best = float("inf")
+    with tempfile.TemporaryDirectory() as tmp:
+        env = fresh_env(tmp)
+        subprocess.run([sys.executable, "launcher.py", "--prepare-only"], cwd=ROOT, env=env, check=True,
+                       capture_output=True)
+        env["PARKWISE_PREPARED"] = "1"
+        code = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+        for _ in range(trials):
+            out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, check=True,
+                                 capture_output=True, text=True)
+            best = min(best, float(out.stdout.strip().splitlines()[-1]))
+    return best
+
+
+def get(url, timeout=5.0):
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as exc:
+        return exc.code, b""
+    except OSError:
+        return None, b""
+
+
+def run_server(mode, workers, port, timeout):
+    with tempfile.TemporaryDirectory() as tmp:
+        env = fresh_env(tmp)
+        if mode == "direct":
+            command = [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--workers", str(workers)]
+        else:
+            command = [sys.executable, "launcher.py", "--port", str(port), "--workers", str(workers)]
+        base = f"http://127.0.0.1:{port}"
+        started = time.perf_counter()
+        proc = subprocess.Popen(command, cwd=ROOT, env=env, start_new_session=True,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        first_request = first_latency = all_ready = None
+        pids = set()
+        try:
+            deadline = started + timeout
+            while time.perf_counter() < deadline and (first_request is None or all_ready is None):
+                if first_request is None:
+                    sent = time.perf_counter()
+                    status, _ = get(base + "/api/slots?limit=50")
+                    if status == 200:
+                        first_request = time.perf_counter() - started
+                        first_latency = time.perf_counter() - sent
+                status, body = get(base + "/readyz")
+                if status == 200:
+                    pids.add(json.loads(body)["pid"])
+                    if len(pids) == workers and all_ready is None:
+                        all_ready = time.perf_counter() - started
+                elif proc.poll() is not None:
+                    break
+                else:
+                    time.sleep(0.01)
+            warm = float("inf")
+            for _ in range(20):
+                sent = time.perf_counter()
+                if get(base + "/api/slots?limit=50")[0] == 200:
+                    warm = min(warm, time.perf_counter() - sent)
+        finally:
+            if proc.poll() is None:
+                # Only the parent: uvicorn stops its own workers
+                os.kill(proc.pid, signal.SIGINT)
+            try:
+                _, errors = proc.communicate(timeout=30)
+            except subprocess.TimeoutExpired:
+                os.killpg(proc.pid, signal.SIGKILL)
+                _, errors = proc.communicate()
+        try:
+            with sqlite3.connect(f"{tmp}/bench.db") as conn:
+                slots = conn.execute("SELECT COUNT(*) FROM parking_slots").fetchone()[0]
+        except sqlite3.Error:
+            slots = None
+        failures = errors.count("Traceback")
+    return first_request, all_ready, first_latency, warm, slots, failures, len(pids)
+
+
+def fmt(seconds, scale=1.0, width=9, digits=2):
+    return f"{'-':>{width}}" if seconds is None or seconds == float("inf") else f"{seconds * scale:{width}.{digits}f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=4, help="N for the multi-worker runs")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--trials", type=int, default=3, help="fresh interpreters for the import timing")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    print(f"import main: {import_time(args.trials) * 1000:.0f} ms (best of {args.trials})\n")
+    print(f"{'mode':<9} {'workers':>7} {'first s':>9} {'all ready s':>11} {'first ms':>9} {'warm ms':>8} "
+          f"{'slots':>6} {'tracebacks':>10}")
+    for workers in sorted({1, args.workers}):
+        for mode in ("direct", "launcher"):
+            first, ready, first_latency, warm, slots, failures, seen = run_server(
+                mode, workers, args.port, args.timeout,
+            )
+            ready_text = fmt(ready, width=11) if ready is not None else f"{f'{seen}/{workers}':>11}"
+            print(f"{mode:<9} {workers:7d} {fmt(first)} {ready_text} {fmt(first_latency, 1000, digits=1)} "
+                  f"{fmt(warm, 1000, 8, 1)} {slots if slots is not None else '-':>6} {failures:10d}")
+
+
+if __name__ == "__main__":
+    main()
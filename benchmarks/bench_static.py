@@ -0,0 +1,108 @@
+"""Static assets and template loading on a cold worker.
+
+Static (style.css + script.js, the assets every page links), per page load:
+  plain          StaticFiles, uncompressed, revalidated on every visit
+  gzip on fly    StaticFiles behind GZipMiddleware, compressing each response
+  precompressed  PrecompressedStaticFiles from an AssetBundle, best variant the
+                 client accepts, immutable (a repeat visit sends no request)
+
+Templates, time until every template is loaded in a fresh environment:
+  compile        no bytecode cache (what each new worker paid before)
+  bytecode       FileSystemBytecodeCache already written by an earlier worker
+  in memory      already loaded (a warm worker)
+
+Run from the repo root:  python benchmarks/bench_static.py --requests 2000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.staticfiles import StaticFiles  # noqa: E402
+from fastapi.templating import Jinja2Templates  # noqa: E402
+from starlette.middleware.gzip import GZipMiddleware  # noqa: E402
+
+import static_assets  # noqa: E402
+from static_assets import AssetBundle, PrecompressedStaticFiles  # noqa: E402
+
+ASSETS = ("css/style.css", "js/script.js")
+ACCEPT = "gzip, deflate, br"
+
+
+def apps():
+    plain = FastAPI()
+    plain.mount("/static", StaticFiles(directory="static"))
+    on_the_fly = FastAPI()
+    on_the_fly.add_middleware(GZipMiddleware, minimum_size=500)
+    on_the_fly.mount("/static", StaticFiles(directory="static"))
+    bundle = AssetBundle.load(prefix="/static/")
+    precompressed = FastAPI()
+    precompressed.mount("/static", PrecompressedStaticFiles(directory="static", bundle=bundle))
+    return [
+        ("plain", plain, ["/static/" + path for path in ASSETS]),
+        ("gzip on fly", on_the_fly, ["/static/" + path for path in ASSETS]),
+        ("precompressed", precompressed, [bundle.url(path) for path in ASSETS]),
+    ]
+
+
+async def serve(app, urls, requests):
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+        wire = 0
+        for url in urls:
+            response = await client.get(url, headers={"Accept-Encoding": ACCEPT})
+            assert response.status_code == 200
+            wire += int(response.headers["content-length"])
+            cache_control = response.headers.get("cache-control", "")
+        start = time.perf_counter()
+        for i in range(requests):
+            await client.get(urls[i % len(urls)], headers={"Accept-Encoding": ACCEPT})
+        elapsed = time.perf_counter() - start
+    return wire, requests / elapsed, "immutable" in cache_control
+
+
+def load_all(env):
+    start = time.perf_counter()
+    count = static_assets.precompile_templates(env)
+    return (time.perf_counter() - start) * 1000, count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--trials", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'static':<14} {'bytes/page':>11} {'requests/s':>11} {'repeat visit':>13}")
+    for name, app, urls in apps():
+        wire, rate, immutable = asyncio.run(serve(app, urls, args.requests))
+        print(f"{name:<14} {wire:11d} {rate:11.0f} {'cached' if immutable else 'revalidate':>13}")
+
+    print(f"\n{'templates':<14} {'ms to load all':>15}")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        results = {"compile": [], "bytecode": [], "in memory": []}
+        for trial in range(args.trials + 1):
+            cold = Jinja2Templates(directory="templates").env
+            results["compile"].append(load_all(cold)[0])
+            writer = Jinja2Templates(directory="templates").env
+            static_assets.enable_bytecode_cache(writer, cache_dir)
+            load_all(writer)
+            fresh = Jinja2Templates(directory="templates").env
+            static_assets.enable_bytecode_cache(fresh, cache_dir)
+            results["bytecode"].append(load_all(fresh)[0])
+            elapsed, count = load_all(fresh)
+            results["in memory"].append(elapsed)
+        for name, times in results.items():
+            # The first trial also pays for imports; report the best of the rest
+            print(f"{name:<14} {min(times[1:]):15.2f}  ({count} templates)")
+
+
+if __name__ == "__main__":
+    main()
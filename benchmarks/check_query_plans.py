@@ -0,0 +1,96 @@
+"""Assert that the hot crud queries are served by indexes, not full table scans.
+
+Captures the SQL each crud call emits and runs EXPLAIN QUERY PLAN on it against
+a freshly migrated SQLite database. Exits non-zero if any plan scans a table
+without an index.
+
+Run from the repo root:  python benchmarks/check_query_plans.py
+"""
+import os
+import re
+import sys
+import tempfile
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event, select  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+import analytics  # noqa: E402
+import async_crud  # noqa: E402
+import crud  # noqa: E402
+from migrations import apply_migrations  # noqa: E402
+from models import Booking  # noqa: E402
+
+FULL_SCAN = re.compile(r"\bSCAN (TABLE )?\w+$")
+
+
+def capture(engine, fn):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return statements
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/plans.db")
+        apply_migrations(engine)
+        db = sessionmaker(bind=engine)()
+        crud.seed_parking_slots(db)
+
+        hot = {
+            "available slots": lambda: crud.get_available_slots(db),
+            "slots in zone": lambda: crud.get_all_slots(db, zone="A"),
+            "zone list": lambda: crud.get_zones(db),
+            "user booking history": lambda: crud.get_user_booking_history(db, "a@b.c"),
+            "user booking history page 2": lambda: crud.get_user_booking_history(
+                db, "a@b.c", before=(datetime(2030, 1, 1), 100)
+            ),
+            "user bookings API page": lambda: db.execute(
+                async_crud.booking_rows_query((datetime(2030, 1, 1), 100), 50, "a@b.c")
+            ).all(),
+            "bookings for slot": lambda: db.query(Booking).filter(Booking.slot_id == 1).all(),
+            "active bookings by start": lambda: (
+                db.query(Booking).filter(Booking.status == "active").order_by(Booking.start_time).all()
+            ),
+            "booking overlap check": lambda: db.execute(
+                select(crud.overlapping_bookings(1, datetime(2030, 1, 1, 18), datetime(2030, 1, 1, 21)))
+            ).scalar(),
+            "listings available": lambda: crud.get_listings_available(db, datetime(2030, 1, 1, 18)),
+            "lifecycle deadlines": lambda: crud.get_lifecycle_deadlines(
+                db, datetime(2030, 1, 1, 18), datetime(2030, 1, 1, 19)
+            ),
+            "due bookings and reservations": lambda: crud.apply_due_lifecycle(db, datetime(2030, 1, 1, 18)),
+            "rollup report": lambda: analytics.rollup_report(db, datetime(2030, 1, 1), datetime(2030, 1, 8), {}),
+            "rollup report for zone": lambda: analytics.rollup_report(
+                db, datetime(2030, 1, 1), datetime(2030, 1, 8), {}, zone="A", by="day"
+            ),
+        }
+
+        failures = 0
+        with engine.connect() as conn:
+            for name, fn in hot.items():
+                for statement, params in capture(engine, fn):
+                    plan = [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", params)]
+                    bad = [step for step in plan if FULL_SCAN.search(step)]
+                    status = "FULL SCAN" if bad else "ok"
+                    failures += bool(bad)
+                    print(f"{status:<9} {name}: {' | '.join(plan)}")
+        db.close()
+        engine.dispose()
+
+    if failures:
+        sys.exit(f"{failures} hot queries fall back to full table scans")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Fire concurrent bookings at a handful of slots and report the throughput.
+
+The one-winner-per-slot guarantee is tested in tests/test_booking_contention.py.
+
+Run from the repo root:  python benchmarks/load_booking_contention.py --requests 500
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+import crud  # noqa: E402
+from database import Base  # noqa: E402
+from models import Booking, ParkingSlot  # noqa: E402
+from schemas import BookingCreate  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--slots", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=64)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(
+            f"sqlite:///{tmp}/contention.db",
+            connect_args={"check_same_thread": False, "timeout": 30},
+            pool_size=args.workers,
+        )
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        with Session() as db:
+            db.add_all(
+                ParkingSlot(slot_number=f"L{i:04d}", zone="A", is_occupied=False)
+                for i in range(args.slots)
+            )
+            db.commit()
+            slot_ids = [s.id for s in db.query(ParkingSlot).all()]
+
+        rng = random.Random(7)
+        targets = [rng.choice(slot_ids) for _ in range(args.requests)]
+
+        def book(slot_id):
+            with Session() as db:
+                booking = crud.create_booking(db, BookingCreate(
+                    slot_id=slot_id, user_name="load", start_time=datetime.utcnow(),
+                ))
+                return slot_id if booking else None
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            results = list(pool.map(book, targets))
+        elapsed = time.perf_counter() - start
+
+        winners = Counter(r for r in results if r is not None)
+        with Session() as db:
+            stored = Counter(slot_id for (slot_id,) in db.query(Booking.slot_id).all())
+        engine.dispose()
+
+    print(f"requests:   {args.requests} over {len(set(targets))} slots, {args.workers} workers")
+    print(f"winners:    {sum(winners.values())} ({sum(stored.values())} stored)")
+    print(f"rejected:   {results.count(None)}")
+    print(f"throughput: {args.requests / elapsed:8.1f} booking attempts/s")
+
+
+if __name__ == "__main__":
+    main()
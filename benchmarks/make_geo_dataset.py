@@ -0,0 +1,96 @@
+"""Synthetic city of garage slots and peer listings with coordinates.
+
+Garages (blocks of slots at one address) and listings are scattered around a
+few Gaussian hotspots, roughly how parking demand clusters in a real city.
+Writes into the database named by PARKWISE_DATABASE_URL.
+
+Run from the repo root:
+  PARKWISE_DATABASE_URL=sqlite:///geo.db python benchmarks/make_geo_dataset.py --slots 200000 --listings 100000
+"""
+import argparse
+import os
+import random
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CENTER = (12.9716, 77.5946)
+HOTSPOTS = 12
+SPREAD_KM = 15.0
+SLOTS_PER_GARAGE = 40
+
+
+def _hotspots(rng):
+    return [
+        (CENTER[0] + rng.gauss(0, SPREAD_KM / 111.32 / 2), CENTER[1] + rng.gauss(0, SPREAD_KM / 111.32 / 2), rng.uniform(0.5, 3.0))
+        for _ in range(HOTSPOTS)
+    ]
+
+
+def _point(rng, hotspots):
+    lat, lon, sigma_km = rng.choice(hotspots)
+    return lat + rng.gauss(0, sigma_km / 111.32), lon + rng.gauss(0, sigma_km / 111.32)
+
+
+def generate(slots: int, listings: int, seed: int = 42):
+    """Return (slot_rows, listing_rows) as lists of dicts ready for bulk insert."""
+    rng = random.Random(seed)
+    hotspots = _hotspots(rng)
+    slot_rows = []
+    while len(slot_rows) < slots:
+        lat, lon = _point(rng, hotspots)
+        garage = len(slot_rows) // SLOTS_PER_GARAGE
+        zone = rng.choice("ABC")
+        for i in range(min(SLOTS_PER_GARAGE, slots - len(slot_rows))):
+            slot_rows.append({
+                "slot_number": f"G{garage:05d}-{zone}{i:02d}",
+                "zone": zone,
+                "price_per_hour": {"A": 25.0, "B": 15.0, "C": 10.0}[zone],
+                "vehicle_types": rng.choice(("Car,Bike,SUV", "Car,Bike", "Bike")),
+                "is_occupied": rng.random() < 0.6,
+                "latitude": lat + rng.uniform(-0.0002, 0.0002),
+                "longitude": lon + rng.uniform(-0.0002, 0.0002),
+            })
+    now = datetime.utcnow()
+    listing_rows = []
+    for i in range(listings):
+        lat, lon = _point(rng, hotspots)
+        listing_rows.append({
+            "user_email": f"host{i % 5000}@parkwise",
+            "title": f"Driveway #{i}",
+            "location": "synthetic",
+            "price_per_hour": round(rng.uniform(3, 20), 1),
+            "available_from": now,
+            "is_available": rng.random() < 0.8,
+            "latitude": lat,
+            "longitude": lon,
+        })
+    return slot_rows, listing_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--slots", type=int, default=200000)
+    parser.add_argument("--listings", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    from sqlalchemy import insert
+
+    from database import engine
+    from migrations import apply_migrations
+    from models import ParkingSlot, UserListing
+
+    apply_migrations(engine)
+    slot_rows, listing_rows = generate(args.slots, args.listings, args.seed)
+    with engine.begin() as conn:
+        for i in range(0, len(slot_rows), 50000):
+            conn.execute(insert(ParkingSlot), slot_rows[i:i + 50000])
+        for i in range(0, len(listing_rows), 50000):
+            conn.execute(insert(UserListing), listing_rows[i:i + 50000])
+    print(f"wrote {len(slot_rows)} slots and {len(listing_rows)} listings to {engine.url}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,404 @@
+"""Reproducible benchmark suite: scoring micro-benchmarks, crud reads/writes at
+a synthetic scale, and an end-to-end user scenario load test. Results are
+written as JSON so runs on different commits can be compared.
+
+  micro      calculate_slot_score, recommend_best_slot, batched score_slots
+  crud       slot/booking/history/listing reads and booking writes on a
+             temporary SQLite database holding --scale slots and bookings
+  scenario   concurrent virtual users: login -> vehicle-type -> find-parking
+             -> book -> end-booking, in-process against main.app (or --url);
+             `run` exits 1 if any request fails with a server error (HTTP 5xx,
+             or an exception raised in-process)
+
+Scales (slots / bookings): small 1k / 10k, medium 10k / 100k,
+large 100k / 1M, xl 1M / 1M.
+
+Run from the repo root:
+  python benchmarks/suite.py run --scale small
+  python benchmarks/suite.py run --scale medium --only crud scenario --out before.json
+  python benchmarks/suite.py compare before.json after.json --threshold 0.15
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SCALES = {
+    "small": (1_000, 10_000),
+    "medium": (10_000, 100_000),
+    "large": (100_000, 1_000_000),
+    "xl": (1_000_000, 1_000_000),
+}
+SECTIONS = ("micro", "crud", "scenario")
+USERS = 1000  # distinct booking owners in the synthetic history
+BASE = datetime(2024, 1, 1)
+
+
+# ─────────────────────────────────────────
+#  Measurement
+# ─────────────────────────────────────────
+
+def summarize(samples: list, unit_ops: int = 1) -> dict:
+    """Latency percentiles in ms for per-operation samples given in seconds."""
+    ordered = sorted(samples)
+
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p))] * 1000
+
+    mean = statistics.fmean(ordered)
+    return {
+        "n": len(ordered), "mean_ms": mean * 1000, "p50_ms": pct(0.50), "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99), "max_ms": ordered[-1] * 1000, "ops_per_s": unit_ops / mean if mean else None,
+    }
+
+
+def sample(fn, repeat: int, number: int = 1, setup=None) -> list:
+    """repeat samples of the mean time of number calls, after one warm-up call."""
+    if setup:
+        setup()
+    fn()
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+    return samples
+
+
+def report(results: dict, name: str, samples: list, **extra):
+    results[name] = {**summarize(samples), **extra}
+    r = results[name]
+    print(f"  {name:<44} p50 {r['p50_ms']:10.3f} ms   p95 {r['p95_ms']:10.3f} ms   n={r['n']}")
+
+
+# ─────────────────────────────────────────
+#  Micro-benchmarks (no database)
+# ─────────────────────────────────────────
+
+def run_micro(slots: int, results: dict):
+    from ai_logic import calculate_slot_score, recommend_best_slot, score_slots
+    from bench_scoring import make_slots
+
+    print(f"micro ({slots} synthetic slots)")
+    rows = make_slots(slots)
+    one = rows[: min(len(rows), 1000)]
+    report(results, "micro.calculate_slot_score", sample(lambda: [calculate_slot_score(s) for s in one], 20),
+           per="1000 slots")
+    repeat = max(3, min(30, 200_000 // slots))
+    report(results, "micro.recommend_best_slot", sample(lambda: recommend_best_slot(rows), repeat), slots=slots)
+    report(results, "micro.score_slots", sample(lambda: score_slots(rows), repeat), slots=slots)
+
+
+# ─────────────────────────────────────────
+#  Synthetic database
+# ─────────────────────────────────────────
+
+def populate(slots: int, bookings: int):
+    """Slots in zones A-C around the demo garage, and completed bookings
+    spread over USERS users with their summaries."""
+    from sqlalchemy import func, insert, select
+
+    from database import engine
+    from migrations import apply_migrations
+    from models import Booking, ParkingSlot, UserBookingSummary, UserListing
+
+    apply_migrations(engine)
+    rng = random.Random(18)
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        for lo in range(0, slots, 50_000):
+            conn.execute(insert(ParkingSlot), [
+                {
+                    "slot_number": f"{'ABC'[i % 3]}{i:07d}", "zone": "ABC"[i % 3], "is_occupied": False,
+                    "price_per_hour": (25.0, 15.0, 10.0)[i % 3], "vehicle_types": "Car,Bike,SUV",
+                    "latitude": 12.9716 + rng.uniform(-0.05, 0.05), "longitude": 77.5946 + rng.uniform(-0.05, 0.05),
+                    "created_at": BASE,
+                }
+                for i in range(lo, min(slots, lo + 50_000))
+            ])
+        for lo in range(0, bookings, 50_000):
+            rows = []
+            for i in range(lo, min(bookings, lo + 50_000)):
+                start = BASE + timedelta(minutes=5 * i + rng.randint(0, 4))
+                minutes = rng.randint(15, 240)
+                rows.append({
+                    "slot_id": 1 + rng.randrange(slots), "user_email": f"user{i % USERS}@bench",
+                    "user_name": f"User {i % USERS}", "vehicle_type": rng.choice(("Car", "Bike", "SUV")),
+                    "start_time": start, "end_time": start + timedelta(minutes=minutes),
+                    "total_cost": round(minutes / 60 * 15, 2), "status": "completed",
+                })
+            conn.execute(insert(Booking), rows)
+        conn.execute(insert(UserBookingSummary).from_select(
+            ["user_email", "booking_count", "active_count", "total_spend", "updated_at"],
+            select(Booking.user_email, func.count(), 0, func.sum(Booking.total_cost), func.max(Booking.start_time))
+            .group_by(Booking.user_email),
+        ))
+        conn.execute(insert(UserListing), [
+            {
+                "user_email": f"user{i}@bench", "title": f"Driveway {i}", "location": "Bengaluru",
+                "price_per_hour": 20.0, "available_from": BASE, "is_available": True, "created_at": BASE,
+            }
+            for i in range(min(USERS, slots))
+        ])
+    print(f"populated {slots} slots, {bookings} bookings in {time.perf_counter() - started:.1f}s")
+
+
+def run_crud(slots: int, bookings: int, results: dict):
+    import crud
+    from database import SessionLocal
+    from schemas import BookingCreate
+
+    print(f"crud ({slots} slots, {bookings} bookings)")
+    rng = random.Random(5)
+    full_repeat = max(3, min(20, 200_000 // slots))
+    with SessionLocal() as db:
+        def fresh():
+            db.expire_all()
+
+        report(results, "crud.get_all_slots", sample(lambda: crud.get_all_slots(db), full_repeat, setup=fresh))
+        report(results, "crud.get_available_slots", sample(lambda: crud.get_available_slots(db), full_repeat, setup=fresh))
+        report(results, "crud.get_slot_by_id",
+               sample(lambda: crud.get_slot_by_id(db, rng.randint(1, slots)), 200, setup=fresh))
+        report(results, "crud.get_user_booking_history",
+               sample(lambda: crud.get_user_booking_history(db, f"user{rng.randrange(USERS)}@bench"), 200, setup=fresh))
+        report(results, "crud.get_booking_summary",
+               sample(lambda: crud.get_booking_summary(db, f"user{rng.randrange(USERS)}@bench"), 200, setup=fresh))
+        report(results, "crud.get_listings_available",
+               sample(lambda: crud.get_listings_available(db, datetime.utcnow()), 50, setup=fresh))
+
+        start = time.perf_counter()
+        index = crud.get_recommendation_index(db)
+        results["crud.recommendation_index_load"] = {**summarize([time.perf_counter() - start])}
+        report(results, "crud.recommendation_top3", sample(lambda: index.top_k(3, vehicle_type="Car"), 200))
+
+        created, ended = [], []
+        for i in range(200):
+            booking = BookingCreate(
+                slot_id=rng.randint(1, slots), user_email=f"user{i % USERS}@bench", user_name="Bench",
+                vehicle_type="Car", start_time=datetime.utcnow(),
+            )
+            start = time.perf_counter()
+            row = crud.create_booking(db, booking)
+            created.append(time.perf_counter() - start)
+            if row is None:
+                continue
+            start = time.perf_counter()
+            crud.end_booking(db, row.id)
+            ended.append(time.perf_counter() - start)
+        report(results, "crud.create_booking", created)
+        report(results, "crud.end_booking", ended)
+
+
+# ─────────────────────────────────────────
+#  End-to-end scenario
+# ─────────────────────────────────────────
+
+STEPS = ("login", "vehicle_type", "find_parking", "book", "end_booking")
+
+
+async def user_session(client, user_id: int, slots: int, rng: random.Random, timings: dict, errors: dict):
+    def error(key):
+        errors[key] = errors.get(key, 0) + 1
+
+    async def step(name, coro):
+        start = time.perf_counter()
+        try:
+            response = await coro
+        except Exception as exc:
+            error(f"{name}: {type(exc).__name__}")
+            return None
+        timings[name].append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            error(f"{name}: HTTP {response.status_code}")
+        return response
+
+    email = f"load{user_id}@bench"
+    r = await step("login", client.post("/login", data={"email": email, "name": f"Load {user_id}"}))
+    if r is None or "session_id" not in r.cookies:
+        return
+    cookies = {"session_id": r.cookies["session_id"]}
+    await step("vehicle_type", client.post("/vehicle-type", data={"vehicle_type": "Car"}, cookies=cookies))
+    await step("find_parking", client.get("/find-parking", cookies=cookies))
+    start = datetime.utcnow().strftime("%Y-%m-%dT%H:%M")
+    r = await step("book", client.post(
+        f"/booking/{rng.randint(1, slots)}", cookies=cookies,
+        data={"user_name": f"Load {user_id}", "vehicle_type": "Car", "start_time": start},
+    ))
+    location = r.headers.get("location", "") if r is not None else ""
+    if "/booking/confirm/" in location:
+        booking_id = location.rsplit("/", 1)[1]
+        await step("end_booking", client.post(f"/end-booking/{booking_id}", cookies=cookies))
+    elif r is not None:
+        error("book: slot taken")
+
+
+async def run_scenario(slots: int, users: int, concurrency: int, url: str, results: dict):
+    import httpx
+
+    print(f"scenario ({users} users, concurrency {concurrency}, {url or 'in-process'})")
+    timings = {name: [] for name in STEPS}
+    errors = {}
+    rng = random.Random(9)
+
+    async def drive(client):
+        queue = iter(range(users))
+
+        async def worker():
+            for user_id in queue:
+                await user_session(client, user_id, slots, rng, timings, errors)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return time.perf_counter() - started
+
+    if url:
+        async with httpx.AsyncClient(base_url=url, timeout=60) as client:
+            elapsed = await drive(client)
+    else:
+        import main
+        async with main.app.router.lifespan_context(main.app):
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://testserver", timeout=60) as client:
+                elapsed = await drive(client)
+
+    for name in STEPS:
+        if timings[name]:
+            report(results, f"scenario.{name}", timings[name])
+    completed = len(timings["end_booking"])
+    server_errors = sum(count for key, count in errors.items() if is_server_error(key))
+    results["scenario.total"] = {
+        "users": users, "concurrency": concurrency, "seconds": elapsed,
+        "scenarios_per_s": users / elapsed, "requests_per_s": sum(map(len, timings.values())) / elapsed,
+        "completed_bookings": completed, "errors": errors, "server_errors": server_errors,
+    }
+    print(f"  {users / elapsed:.1f} scenarios/s, {results['scenario.total']['requests_per_s']:.0f} requests/s, "
+          f"errors {errors or 'none'}")
+    if server_errors:
+        print(f"  FAILED: {server_errors} server errors")
+    return server_errors
+
+
+def is_server_error(key: str) -> bool:
+    # "step: HTTP 503" or "step: OperationalError"; not "step: HTTP 4xx" or "book: slot taken"
+    outcome = key.split(": ", 1)[1]
+    return outcome.startswith("HTTP 5") or not (outcome.startswith("HTTP ") or outcome == "slot taken")
+
+
+# ─────────────────────────────────────────
+#  Run / compare
+# ─────────────────────────────────────────
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"], cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(args):
+    slots, bookings = SCALES[args.scale]
+    slots, bookings = args.slots or slots, args.bookings if args.bookings is not None else bookings
+    if not args.url:
+        tmp = tempfile.mkdtemp()
+        os.environ["PARKWISE_DATABASE_URL"] = f"sqlite:///{tmp}/suite.db"
+        # Keep the run self-contained: no trained model or session file from the checkout
+        os.environ.setdefault("PARKWISE_FREE_TIME_MODEL", os.path.join(tmp, "free_time_model.npz"))
+        os.environ.setdefault("PARKWISE_SESSION_STORE", "memory")
+
+    results = {}
+    if "micro" in args.only:
+        run_micro(slots, results)
+    if not args.url and ({"crud", "scenario"} & set(args.only)):
+        populate(slots, bookings)
+    if "crud" in args.only:
+        if args.url:
+            print("crud skipped: it runs against the local database, not --url")
+        else:
+            run_crud(slots, bookings, results)
+    server_errors = 0
+    if "scenario" in args.only:
+        server_errors = asyncio.run(run_scenario(slots, args.users, args.concurrency, args.url, results))
+
+    document = {
+        "meta": {
+            "revision": git_revision(), "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "python": platform.python_version(), "platform": platform.platform(),
+            "scale": args.scale, "slots": slots, "bookings": bookings, "sections": list(args.only),
+        },
+        "results": results,
+    }
+    out = args.out or os.path.join(ROOT, "benchmarks", "results", f"{document['meta']['revision']}-{args.scale}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(document, f, indent=2)
+    print(f"results -> {out}")
+    return 1 if server_errors else 0
+
+
+def compare(args):
+    with open(args.baseline) as f:
+        old = json.load(f)
+    with open(args.candidate) as f:
+        new = json.load(f)
+    print(f"{old['meta']['revision']} ({old['meta']['scale']}) -> {new['meta']['revision']} ({new['meta']['scale']})")
+    print(f"{'benchmark':<40} {'before ms':>11} {'after ms':>11} {'change':>8}")
+    regressions = 0
+    for name, before in old["results"].items():
+        after = new["results"].get(name)
+        if after is None or args.metric not in before or args.metric not in after:
+            continue
+        change = (after[args.metric] - before[args.metric]) / before[args.metric] if before[args.metric] else 0.0
+        flag = ""
+        if change > args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        elif change < -args.threshold:
+            flag = "  faster"
+        print(f"{name:<40} {before[args.metric]:11.3f} {after[args.metric]:11.3f} {change:8.1%}{flag}")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_p = sub.add_parser("run", help="run the suite and write a JSON result file")
+    run_p.add_argument("--scale", choices=sorted(SCALES), default="small")
+    run_p.add_argument("--slots", type=int, help="override the scale's slot count")
+    run_p.add_argument("--bookings", type=int, help="override the scale's booking count")
+    run_p.add_argument("--only", nargs="+", choices=SECTIONS, default=list(SECTIONS))
+    run_p.add_argument("--users", type=int, default=300, help="scenario: virtual users")
+    run_p.add_argument("--concurrency", type=int, default=20, help="scenario: users in flight at once")
+    run_p.add_argument("--url", help="scenario against a running server instead of in-process")
+    run_p.add_argument("--out", help="default: benchmarks/results/<revision>-<scale>.json")
+
+    cmp_p = sub.add_parser("compare", help="compare two result files; exit 1 on regressions")
+    cmp_p.add_argument("baseline")
+    cmp_p.add_argument("candidate")
+    cmp_p.add_argument("--metric", default="p50_ms", choices=("p50_ms", "p95_ms", "p99_ms", "mean_ms"))
+    cmp_p.add_argument("--threshold", type=float, default=0.10, help="relative slowdown that counts as a regression")
+
+    args = parser.parse_args()
+    if args.command == "compare":
+        sys.exit(compare(args))
+    sys.exit(run(args))
+
+
+if __name__ == "__main__":
+    main()
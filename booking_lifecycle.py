@@ -0,0 +1,137 @@
+import asyncio
+import heapq
+import logging
+import os
+from datetime import datetime, timedelta
+
+from database import WriteBusy, is_database_locked
+
+# PARKWISE_AUTO_EXPIRE=0 leaves bookings active until /end-booking is called.
+AUTO_EXPIRE = os.getenv("PARKWISE_AUTO_EXPIRE", "1") == "1"
+# Only deadlines this close are held in memory; later ones are read back from
+# the database when the horizon is reached, so memory does not grow with the
+# number of future bookings.
+SCHEDULE_HORIZON = timedelta(minutes=int(os.getenv("PARKWISE_SCHEDULE_HORIZON_MINUTES", "60")))
+RETRY_SECONDS = 5.0
+# After run_write gave up on a locked database: contention, so come back soon
+LOCKED_RETRY_SECONDS = 0.5
+
+log = logging.getLogger("parkwise.lifecycle")
+
+
+class BookingScheduler:
+    """Wakes up when a booking ends or a reservation starts, with no polling.
+
+    Deadlines (naive UTC datetimes) live in a min-heap on the event loop, and
+    the task sleeps until the earliest one. The heap only decides *when* to
+    work: apply_due(db, now) selects what is actually due from the database
+    and applies it in bulk, so a deadline for a booking that was already ended
+    costs one empty query, and many bookings due together cost one batch.
+
+    On start, and each time the horizon passes, load_deadlines(db, now, until)
+    rebuilds the heap from the database, and a first pass catches up on
+    anything that fell due while the app was down. schedule() may be called
+    from any thread (crud's write hooks). Both database calls run in a worker
+    thread through write(fn, *args), i.e. run_write.
+    """
+
+    def __init__(self, horizon: timedelta = SCHEDULE_HORIZON):
+        self.horizon = horizon
+        self._heap = []
+        self._horizon_end = None
+        self._loop = None
+        self._wakeup = None
+        self._task = None
+        self.expired = 0
+        self.started = 0
+
+    def start(self, write, apply_due, load_deadlines):
+        self._write = write
+        self._apply_due = apply_due
+        self._load_deadlines = load_deadlines
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._loop = None
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._heap)
+
+    def schedule(self, when: datetime):
+        loop = self._loop
+        if when is None or loop is None or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(self._push, when)
+
+    def _push(self, when):
+        # Past the horizon: the next reload reads it from the database
+        if self._horizon_end is None or when > self._horizon_end:
+            return
+        heapq.heappush(self._heap, when)
+        if self._heap[0] is when:
+            self._wakeup.set()  # earlier than what the task is sleeping towards
+
+    async def _run(self):
+        while True:
+            try:
+                now = datetime.utcnow()
+                due = self._horizon_end is None or now >= self._horizon_end
+                if due:
+                    await self._reload(now)
+                while self._heap and self._heap[0] <= now:
+                    heapq.heappop(self._heap)
+                    due = True
+                if due:
+                    await self.run_due(now)
+                await self._sleep()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                # The retry reloads: a failed pass may have lost popped deadlines
+                self._horizon_end = None
+                if is_database_locked(exc) or isinstance(exc, WriteBusy):
+                    log.warning("booking lifecycle pass hit a busy database; retrying in %.1f s",
+                                LOCKED_RETRY_SECONDS)
+                    await asyncio.sleep(LOCKED_RETRY_SECONDS)
+                    continue
+                log.exception("booking lifecycle pass failed; retrying in %.0f s", RETRY_SECONDS)
+                await asyncio.sleep(RETRY_SECONDS)
+
+    async def _reload(self, now):
+        # Bookings made while loading are pushed into the (new) heap meanwhile
+        self._heap = []
+        self._horizon_end = now + self.horizon
+        deadlines = await asyncio.to_thread(self._write, self._load_deadlines, now, self._horizon_end)
+        self._heap.extend(deadlines)
+        heapq.heapify(self._heap)
+
+    async def _sleep(self):
+        until = min(self._heap[0], self._horizon_end) if self._heap else self._horizon_end
+        timeout = max(0.0, (until - datetime.utcnow()).total_seconds())
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def run_due(self, now: datetime = None):
+        """Apply everything due at now; returns (bookings expired, reservations started)."""
+        expired, started = await asyncio.to_thread(self._write, self._apply_due, now or datetime.utcnow())
+        self.expired += expired
+        self.started += started
+        if expired or started:
+            log.info("auto-completed %d bookings, started %d reservations", expired, started)
+        return expired, started
+
+
+booking_scheduler = BookingScheduler()
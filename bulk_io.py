@@ -0,0 +1,361 @@
+import argparse
+import csv
+import io
+import json
+import math
+import sys
+import time
+from datetime import datetime
+
+from sqlalchemy import insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from models import ParkingSlot, Booking, UserListing
+import change_log
+import crud
+
+# Rows per executemany batch (and per commit on import). Memory use is bounded
+# by this, not by the size of the file.
+BATCH_SIZE = 5000
+MAX_REPORTED_ERRORS = 100
+
+VEHICLE_TYPES = ("Car", "Bike", "SUV")
+FORMATS = ("csv", "jsonl")
+
+
+class ImportResult:
+    __slots__ = ("read", "inserted", "skipped", "errors", "seconds")
+
+    def __init__(self):
+        self.read = 0
+        self.inserted = 0
+        self.skipped = 0  # valid rows that already existed (duplicate slot_number)
+        self.errors = []  # (line number, message), first MAX_REPORTED_ERRORS only
+        self.seconds = 0.0
+
+    @property
+    def invalid(self) -> int:
+        return self.read - self.inserted - self.skipped
+
+    def as_dict(self) -> dict:
+        return {
+            "read": self.read, "inserted": self.inserted, "skipped": self.skipped,
+            "invalid": self.invalid, "errors": [{"line": n, "error": e} for n, e in self.errors],
+            "seconds": round(self.seconds, 3),
+        }
+
+
+# ─────────────────────────────────────────
+#  Parsing and validation
+# ─────────────────────────────────────────
+
+def iter_records(stream, fmt: str):
+    """Yield (line number, raw dict) from a text stream, one row at a time.
+
+    A JSONL line that does not parse is yielded as the ValueError instead.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+    elif fmt == "jsonl":
+        for line_num, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                yield line_num, json.loads(line)
+            except ValueError as exc:
+                yield line_num, exc
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+
+
+def _blank(value) -> bool:
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def _text(record, field, required=True):
+    value = record.get(field)
+    if _blank(value):
+        if required:
+            raise ValueError(f"{field} is required")
+        return None
+    return str(value).strip()
+
+
+def _float(record, field, default=None, low=None, high=None):
+    value = record.get(field)
+    if _blank(value):
+        return default
+    number = float(value)
+    if not math.isfinite(number):
+        raise ValueError(f"{field} must be finite: {value}")
+    if (low is not None and number < low) or (high is not None and number > high):
+        raise ValueError(f"{field} out of range: {value}")
+    return number
+
+
+def _bool(record, field, default):
+    value = record.get(field)
+    if _blank(value):
+        return default
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in ("1", "true", "yes", "y"):
+        return True
+    if text in ("0", "false", "no", "n"):
+        return False
+    raise ValueError(f"{field} is not a boolean: {value}")
+
+
+def _datetime(record, field, required=True):
+    value = _text(record, field, required)
+    return None if value is None else datetime.fromisoformat(value)
+
+
+def _coordinates(record):
+    lat = _float(record, "latitude", low=-90, high=90)
+    lon = _float(record, "longitude", low=-180, high=180)
+    if (lat is None) != (lon is None):
+        raise ValueError("latitude and longitude go together")
+    return lat, lon
+
+
+def validate_slot(record: dict) -> dict:
+    vehicle_types = _text(record, "vehicle_types", required=False) or ",".join(VEHICLE_TYPES)
+    unknown = {vt.strip() for vt in vehicle_types.split(",")} - set(VEHICLE_TYPES)
+    if unknown:
+        raise ValueError(f"unknown vehicle types: {', '.join(sorted(unknown))}")
+    lat, lon = _coordinates(record)
+    return {
+        "slot_number": _text(record, "slot_number"),
+        "zone": _text(record, "zone"),
+        "price_per_hour": _float(record, "price_per_hour", default=50.0, low=0),
+        "vehicle_types": vehicle_types,
+        "is_occupied": _bool(record, "is_occupied", False),
+        "latitude": lat,
+        "longitude": lon,
+        "created_at": datetime.utcnow(),
+    }
+
+
+def validate_listing(record: dict) -> dict:
+    available_from = _datetime(record, "available_from", required=False) or datetime.utcnow()
+    available_to = _datetime(record, "available_to", required=False)
+    if available_to is not None and available_to <= available_from:
+        raise ValueError("available_to must be after available_from")
+    lat, lon = _coordinates(record)
+    return {
+        "user_email": _text(record, "user_email"),
+        "title": _text(record, "title"),
+        "location": _text(record, "location"),
+        "price_per_hour": _float(record, "price_per_hour", low=0),
+        "available_from": available_from,
+        "available_to": available_to,
+        "description": _text(record, "description", required=False),
+        "image_url": _text(record, "image_url", required=False),
+        "is_available": _bool(record, "is_available", True),
+        "latitude": lat,
+        "longitude": lon,
+        "created_at": datetime.utcnow(),
+    }
+
+
+IMPORTERS = {
+    "slots": (ParkingSlot.__table__, validate_slot),
+    "listings": (UserListing.__table__, validate_listing),
+}
+
+
+# ─────────────────────────────────────────
+#  Import (executemany batches, no ORM objects)
+# ─────────────────────────────────────────
+
+def _insert_statement(db: Session, table):
+    # Slots are unique by slot_number; re-importing a file skips existing ones
+    dialect = db.get_bind().dialect.name
+    if table is ParkingSlot.__table__ and dialect in ("sqlite", "postgresql"):
+        module = sqlite if dialect == "sqlite" else postgresql
+        return module.insert(table).on_conflict_do_nothing(index_elements=["slot_number"])
+    return insert(table)
+
+
+def insert_batch(db: Session, kind: str, rows: list) -> int:
+    table, _ = IMPORTERS[kind]
+    if not rows:
+        return 0
+    result = db.execute(_insert_statement(db, table), rows)
+    change_log.record(db, change_log.CATALOG)
+    db.commit()
+    return result.rowcount if result.rowcount is not None and result.rowcount >= 0 else len(rows)
+
+
+def import_records(db: Session, kind: str, records, batch_size: int = BATCH_SIZE, strict: bool = False) -> ImportResult:
+    """Validate and insert (line number, dict) records in batches.
+
+    Invalid rows are skipped and reported; with strict, the first one aborts the
+    import (batches already committed stay committed).
+    """
+    _, validate = IMPORTERS[kind]
+    result = ImportResult()
+    started = time.perf_counter()
+    batch = []
+    for line_num, record in records:
+        result.read += 1
+        try:
+            if isinstance(record, Exception):
+                raise record
+            if not isinstance(record, dict):
+                raise ValueError("row is not an object")
+            batch.append(validate(record))
+        except (ValueError, TypeError) as exc:
+            if strict:
+                raise ValueError(f"line {line_num}: {exc}") from exc
+            if len(result.errors) < MAX_REPORTED_ERRORS:
+                result.errors.append((line_num, str(exc)))
+            continue
+        if len(batch) >= batch_size:
+            inserted = insert_batch(db, kind, batch)
+            result.inserted += inserted
+            result.skipped += len(batch) - inserted
+            batch = []
+    inserted = insert_batch(db, kind, batch)
+    result.inserted += inserted
+    result.skipped += len(batch) - inserted
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def import_file(db: Session, kind: str, stream, fmt: str, batch_size: int = BATCH_SIZE, strict: bool = False) -> ImportResult:
+    try:
+        return import_records(db, kind, iter_records(stream, fmt), batch_size, strict)
+    finally:
+        # Also after a strict abort: earlier batches are committed
+        crud.notify_inventory_changed()
+
+
+# ─────────────────────────────────────────
+#  Export (server-side cursor, chunked)
+# ─────────────────────────────────────────
+
+BOOKING_EXPORT_COLUMNS = (
+    Booking.id, Booking.slot_id, Booking.user_name, Booking.phone_number,
+    Booking.vehicle_type, Booking.vehicle_number, Booking.start_time,
+    Booking.end_time, Booking.total_cost, Booking.status,
+)
+
+
+def bookings_export_query(since: datetime = None, until: datetime = None):
+    """Bookings by start_time range, in id order so an export is stable."""
+    query = select(*BOOKING_EXPORT_COLUMNS).order_by(Booking.id)
+    if since is not None:
+        query = query.where(Booking.start_time >= since)
+    if until is not None:
+        query = query.where(Booking.start_time < until)
+    return query
+
+
+def _cell(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def encode_chunk(rows, columns, fmt: str, header: bool = False) -> str:
+    """Serialize a chunk of row tuples as CSV or JSON lines."""
+    if fmt == "jsonl":
+        return "".join(
+            json.dumps(dict(zip(columns, map(_cell, row)))) + "\n" for row in rows
+        )
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if header:
+        writer.writerow(columns)
+    writer.writerows([[_cell(v) for v in row] for row in rows])
+    return buffer.getvalue()
+
+
+def export_chunks(db: Session, query, fmt: str, chunk_size: int = BATCH_SIZE):
+    """Yield (text, row count) for chunks of chunk_size rows read through a
+    streaming cursor; CSV starts with a header chunk of zero rows."""
+    columns = [column.name for column in query.selected_columns]
+    result = db.execute(query.execution_options(stream_results=True, yield_per=chunk_size))
+    if fmt == "csv":
+        yield encode_chunk([], columns, fmt, header=True), 0
+    for chunk in result.partitions(chunk_size):
+        yield encode_chunk(chunk, columns, fmt), len(chunk)
+
+
+def export_bookings(db: Session, out, fmt: str, since: datetime = None, until: datetime = None,
+                    chunk_size: int = BATCH_SIZE) -> int:
+    rows = 0
+    for text, count in export_chunks(db, bookings_export_query(since, until), fmt, chunk_size):
+        out.write(text)
+        rows += count
+    return rows
+
+
+# ─────────────────────────────────────────
+#  Command line
+# ─────────────────────────────────────────
+
+def _open(path: str, mode: str):
+    if path == "-":
+        return sys.stdin if "r" in mode else sys.stdout
+    return open(path, mode, newline="", encoding="utf-8")
+
+
+def _format(path: str, fmt: str) -> str:
+    if fmt:
+        return fmt
+    return "jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Bulk import slots/listings and export bookings. Uses PARKWISE_DATABASE_URL. "
+                    "A running server with the in-memory cache only sees imported slots after its "
+                    "caches expire; use POST /admin/import/... to import into a live server.",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    imp = sub.add_parser("import", help="import slots or listings from CSV/JSONL ('-' = stdin)")
+    imp.add_argument("kind", choices=sorted(IMPORTERS))
+    imp.add_argument("path")
+    imp.add_argument("--format", choices=FORMATS)
+    imp.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    imp.add_argument("--strict", action="store_true", help="stop at the first invalid row")
+
+    exp = sub.add_parser("export", help="export bookings to CSV/JSONL ('-' = stdout)")
+    exp.add_argument("kind", choices=["bookings"])
+    exp.add_argument("path")
+    exp.add_argument("--format", choices=FORMATS)
+    exp.add_argument("--since", type=datetime.fromisoformat, help="start_time >= SINCE")
+    exp.add_argument("--until", type=datetime.fromisoformat, help="start_time < UNTIL")
+    exp.add_argument("--chunk-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    from database import SessionLocal, engine
+    from migrations import apply_migrations
+
+    apply_migrations(engine)
+    fmt = _format(args.path, args.format)
+    with SessionLocal() as db:
+        if args.command == "import":
+            with _open(args.path, "r") as stream:
+                result = import_file(db, args.kind, stream, fmt, args.batch_size, args.strict)
+            print(json.dumps(result.as_dict(), indent=2), file=sys.stderr)
+            return 1 if result.invalid else 0
+        started = time.perf_counter()
+        out = _open(args.path, "w")
+        try:
+            rows = export_bookings(db, out, fmt, args.since, args.until, args.chunk_size)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        print(f"exported {rows} bookings in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+import os
+import pickle
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+# "memory" (default) or a redis:// URL for a Redis-compatible server shared by
+# all workers (redis, valkey, keydb, a local stand-in, ...).
+CACHE_URL = os.getenv("PARKWISE_CACHE_URL", "memory")
+CACHE_TTL = float(os.getenv("PARKWISE_CACHE_TTL", "30"))
+CACHE_MAX_ENTRIES = int(os.getenv("PARKWISE_CACHE_MAX_ENTRIES", "1024"))
+
+_MISSING = object()
+
+
+class CacheBackend(ABC):
+    """Minimal key/value interface the read-through cache needs."""
+
+    @abstractmethod
+    def get(self, key: str):
+        raise NotImplementedError
+
+    @abstractmethod
+    def set(self, key: str, value, ttl: float):
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete(self, *keys: str):
+        raise NotImplementedError
+
+    @abstractmethod
+    def clear(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def incr(self, key: str) -> int:
+        """Atomically increment a counter that never expires or gets evicted."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def counter(self, key: str) -> int:
+        raise NotImplementedError
+
+
+class MemoryBackend(CacheBackend):
+    """Per-process LRU with per-entry expiry."""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._counters = {}
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return _MISSING
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return _MISSING
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def counter(self, key):
+        return self._counters.get(key, 0)
+
+
+class RedisBackend(CacheBackend):
+    """Backend for any client speaking the redis-py API (get/set/delete)."""
+
+    def __init__(self, client, prefix: str = "parkwise:"):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str):
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError("PARKWISE_CACHE_URL points at Redis but the 'redis' package is not installed") from exc
+        return cls(redis.Redis.from_url(url))
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return _MISSING if raw is None else pickle.loads(raw)
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), px=int(ttl * 1000))
+
+    def delete(self, *keys):
+        if keys:
+            self.client.delete(*(self.prefix + key for key in keys))
+
+    def clear(self):
+        for key in self.client.scan_iter(match=self.prefix + "*"):
+            self.client.delete(key)
+
+    def incr(self, key):
+        return int(self.client.incr(self.prefix + "counter:" + key))
+
+    def counter(self, key):
+        return int(self.client.get(self.prefix + "counter:" + key) or 0)
+
+
+def make_backend(url: str = CACHE_URL) -> CacheBackend:
+    if url == "memory":
+        return MemoryBackend()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend.from_url(url)
+    raise ValueError(f"Unsupported cache URL: {url}")
+
+
+class ReadThroughCache:
+    """Loads values on miss, counts hits/misses per key, and drops keys on writes.
+
+    Each key has a local generation number bumped by invalidate(); a load that
+    started before an invalidation is returned to its caller but not stored,
+    so a slow reader cannot put pre-write data back into the cache.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float = CACHE_TTL):
+        self.backend = backend
+        self.ttl = ttl
+        self._generations = {}
+        self._stats = {}
+
+    def _count(self, key, field):
+        stats = self._stats.setdefault(key, {"hits": 0, "misses": 0, "invalidations": 0})
+        stats[field] += 1
+
+    def get(self, key, stats_key: str = None):
+        value = self.backend.get(key)
+        self._count(stats_key or key, "misses" if value is _MISSING else "hits")
+        return value
+
+    def put(self, key, value, generation):
+        if self._generations.get(key, 0) == generation:
+            self.backend.set(key, value, self.ttl)
+
+    async def get_or_load(self, key: str, load, stats_key: str = None):
+        value = self.get(key, stats_key)
+        if value is not _MISSING:
+            return value
+        generation = self._generations.get(key, 0)
+        value = await load()
+        self.put(key, value, generation)
+        return value
+
+    def get_or_load_sync(self, key: str, load, stats_key: str = None):
+        value = self.get(key, stats_key)
+        if value is not _MISSING:
+            return value
+        generation = self._generations.get(key, 0)
+        value = load()
+        self.put(key, value, generation)
+        return value
+
+    def invalidate(self, *keys: str):
+        for key in keys:
+            self._generations[key] = self._generations.get(key, 0) + 1
+            self._count(key, "invalidations")
+        self.backend.delete(*keys)
+
+    def stats(self) -> dict:
+        return {key: dict(counts) for key, counts in self._stats.items()}
+
+
+# Slot catalog (static metadata) and occupancy are cached separately so a
+# booking only throws away the cheap part.
+SLOT_CATALOG_KEY = "slots:catalog"
+SLOT_OCCUPANCY_KEY = "slots:occupancy"
+SLOT_COUNT_KEY = "slots:count"
+# The encoded full /api/slots body: derived from both, dropped with occupancy
+SLOT_INVENTORY_BODY_KEY = "slots:inventory-body"
+
+slot_cache = ReadThroughCache(make_backend())
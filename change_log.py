@@ -0,0 +1,196 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+
+from sqlalchemy import delete, func, insert, select
+
+from database import run_write
+from models import ChangeLogEntry
+
+# Set by launcher.py when it starts several workers (set it yourself for
+# `uvicorn --workers N`): writes are logged to change_log and every worker
+# replays the others' entries. Off, nothing is logged or polled.
+SHARED_STATE = os.getenv("PARKWISE_SHARED_STATE", "0") == "1"
+# Idle workers catch up this often, so live events from other workers arrive
+POLL_INTERVAL = float(os.getenv("PARKWISE_CHANGE_POLL_MS", "500")) / 1000
+# Newest entries kept for workers that fell behind; older ones are pruned
+RETAIN_ENTRIES = 100_000
+PRUNE_INTERVAL = 60.0
+
+SLOT, BOOKING, NEW_BOOKING, LISTING, CATALOG = "slot", "booking", "new_booking", "listing", "catalog"
+# Entries that change slot pages and /api/slots (and so their ETags)
+INVENTORY_KINDS = (SLOT, CATALOG)
+
+# Tells this process's own entries apart from other workers'
+WRITER_ID = uuid.uuid4().hex
+
+log = logging.getLogger("parkwise.change_feed")
+
+_table = ChangeLogEntry.__table__
+
+
+def record(db, kind: str, ref_ids=(None,)):
+    """Log a write in the caller's (uncommitted) transaction."""
+    if SHARED_STATE and ref_ids:
+        db.execute(insert(_table), [{"kind": kind, "ref_id": ref_id, "writer": WRITER_ID} for ref_id in ref_ids])
+
+
+def prune(db, keep: int = RETAIN_ENTRIES) -> int:
+    newest = db.execute(select(func.max(_table.c.seq))).scalar()
+    if newest is None or newest <= keep:
+        return 0
+    deleted = db.execute(delete(_table).where(_table.c.seq <= newest - keep)).rowcount
+    db.commit()
+    return deleted
+
+
+class ChangeFeed:
+    """Keeps this worker's in-process state in step with the other workers.
+
+    Caches, indexes, pricing and the live-event channel live in each worker
+    and are only told about that worker's own writes. Every write
+    transaction therefore also appends (kind, ref_id) entries to change_log;
+    on SQLite's single writer the log order is the commit order. Before each
+    request (CatchUpMiddleware) and every POLL_INTERVAL, catch_up() checks the
+    newest seq on a connection of its own, in a worker thread. Only when it
+    moved are the new entries read and the other workers' ones handed to
+    apply(db, entries), which runs the same hooks a local write does, from the
+    rows as they are now. Requests arriving together share one check (and
+    read), so a burst costs two thread hops, not one per request. If entries
+    this worker never read were pruned, reset() drops every derived view
+    instead, to be reloaded on next use.
+
+    inventory_position is the last applied entry that changed slots: the
+    inventory version in ETags and fragment keys, the same in every worker
+    that has caught up.
+    """
+
+    def __init__(self, enabled: bool = SHARED_STATE, interval: float = POLL_INTERVAL):
+        self.enabled = enabled
+        self.interval = interval
+        self.position = 0
+        self.inventory_position = 0
+        self.applied = 0
+        self.resets = 0
+        self._polls = 0
+        self._lock = None
+        self._probe = None
+        self._task = None
+
+    def start(self, session_factory, apply, reset):
+        """Take the current position; call before loading any state to keep in step."""
+        self._session_factory = session_factory
+        self._apply = apply
+        self._reset = reset
+        self._lock = asyncio.Lock()
+        with session_factory() as db:
+            # A plain DBAPI cursor: the check itself costs microseconds
+            self._probe = db.get_bind().raw_connection()
+            self.position = db.execute(select(func.max(_table.c.seq))).scalar() or 0
+            self.inventory_position = db.execute(
+                select(func.max(_table.c.seq)).where(_table.c.kind.in_(INVENTORY_KINDS))
+            ).scalar() or 0
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._lock = None
+        self._probe.close()
+
+    def newest(self) -> int:
+        cursor = self._probe.cursor()
+        try:
+            cursor.execute(f"SELECT max(seq) FROM {_table.name}")
+            return cursor.fetchone()[0] or 0
+        finally:
+            cursor.close()
+
+    async def catch_up(self):
+        """Apply everything other workers committed before this call."""
+        if self._lock is None:
+            return
+        ticket = self._polls
+        async with self._lock:
+            if self._polls > ticket:
+                return  # a check that started after this call has just finished
+            self._polls += 1
+            await asyncio.to_thread(self._check)
+
+    def _check(self):
+        # Under the lock: one thread at a time uses the probe connection
+        if self.newest() > self.position:
+            self.poll()
+
+    def poll(self) -> int:
+        with self._session_factory() as db:
+            rows = db.execute(
+                select(_table.c.seq, _table.c.kind, _table.c.ref_id, _table.c.writer)
+                .where(_table.c.seq > self.position)
+                .order_by(_table.c.seq)
+            ).all()
+            if not rows:
+                return 0
+            # A hole is a rolled-back write unless the rows before it are gone
+            pruned = (
+                rows[0].seq > self.position + 1
+                and db.execute(select(func.min(_table.c.seq))).scalar() > self.position + 1
+            )
+            entries = [(kind, ref_id) for _, kind, ref_id, writer in rows if writer != WRITER_ID]
+            if pruned:
+                self._reset_state()
+            elif entries:
+                try:
+                    self._apply(db, entries)
+                    self.applied += len(entries)
+                except Exception:
+                    log.exception("applying %d change log entries failed; resetting", len(entries))
+                    self._reset_state()
+        self.position = rows[-1].seq
+        inventory = [row.seq for row in rows if row.kind in INVENTORY_KINDS]
+        if pruned:
+            self.inventory_position = self.position
+        elif inventory:
+            self.inventory_position = inventory[-1]
+        return len(entries)
+
+    def _reset_state(self):
+        self._reset()
+        self.resets += 1
+
+    async def _run(self):
+        pruned_at = time.monotonic()
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.catch_up()
+                if time.monotonic() - pruned_at >= PRUNE_INTERVAL:
+                    pruned_at = time.monotonic()
+                    await asyncio.to_thread(run_write, prune)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                log.exception("change feed poll failed")
+
+
+class CatchUpMiddleware:
+    """Runs change_feed.catch_up() before every request but static files."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and not scope["path"].startswith("/static/"):
+            await change_feed.catch_up()
+        await self.app(scope, receive, send)
+
+
+change_feed = ChangeFeed()
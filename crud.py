@@ -1,10 +1,29 @@
-from sqlalchemy.orm import Session
-from models import ParkingSlot, Booking
+from sqlalchemy import bindparam, exists, func, or_, select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, joinedload
+from models import ParkingSlot, Booking, UserListing, UserBookingSummary
 from schemas import BookingCreate
-from datetime import datetime
+from datetime import datetime, timedelta
+from recommendation_index import recommendation_index
+from availability import availability_index
+from geo_index import geo_index, GeoEntry
+from pricing import pricing_engine
+from booking_lifecycle import booking_scheduler
+import analytics
+from free_time_model import free_time_model
+from live_updates import broadcaster, slot_event
+from cache import slot_cache, SLOT_CATALOG_KEY, SLOT_OCCUPANCY_KEY, SLOT_COUNT_KEY, SLOT_INVENTORY_BODY_KEY
+from http_cache import inventory_version
+import change_log
 
-def get_all_slots(db: Session):
-    return db.query(ParkingSlot).all()
+def get_all_slots(db: Session, zone: str = None):
+    query = db.query(ParkingSlot)
+    if zone:
+        query = query.filter(ParkingSlot.zone == zone)
+    return query.all()
+
+def get_zones(db: Session):
+    return [z for (z,) in db.query(ParkingSlot.zone).distinct().order_by(ParkingSlot.zone)]
 
 def get_available_slots(db: Session):
     return db.query(ParkingSlot).filter(ParkingSlot.is_occupied == False).all()
@@ -12,21 +31,67 @@ def get_available_slots(db: Session):
 def get_slot_by_id(db: Session, slot_id: int):
     return db.query(ParkingSlot).filter(ParkingSlot.id == slot_id).first()
 
-def create_booking(db: Session, booking: BookingCreate):
+# Bookings starting later than this are reservations: they hold the time range
+# but leave the slot's current occupancy alone.
+RESERVATION_GRACE = timedelta(minutes=15)
+
+def overlapping_bookings(slot_id, start_time: datetime, end_time: datetime = None):
+    """Active bookings on the slot intersecting [start_time, end_time); None = open-ended."""
+    conditions = [
+        Booking.slot_id == slot_id,
+        Booking.status == "active",
+        or_(Booking.end_time.is_(None), Booking.end_time > start_time),
+    ]
+    if end_time is not None:
+        conditions.append(Booking.start_time < end_time)
+    return exists().where(*conditions)
+
+def claim_slot(db: Session, slot_id: int, start_time: datetime, end_time: datetime = None,
+               occupy: bool = True, vehicle_type: str = None) -> bool:
+    """Atomically claim [start_time, end_time) on a slot; False if it is missing,
+    occupied (when occupy is set) or overlaps another active booking.
+
+    The overlap test is part of the UPDATE so the check and the claim cannot be
+    split by a concurrent booking; without occupy the row is only touched.
+    """
+    conditions = [ParkingSlot.id == slot_id, ~overlapping_bookings(slot_id, start_time, end_time)]
+    if occupy:
+        conditions.append(or_(ParkingSlot.is_occupied == False, ParkingSlot.is_occupied.is_(None)))
+        values = {"is_occupied": True, "last_occupied_time": start_time, "occupied_vehicle_type": vehicle_type}
+    else:
+        values = {"slot_number": ParkingSlot.slot_number}
+    result = db.execute(
+        update(ParkingSlot)
+        .where(*conditions)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+def create_booking(db: Session, booking: BookingCreate, commit: bool = True):
+    if booking.end_time is not None and booking.end_time <= booking.start_time:
+        return None
+    occupy = booking.start_time <= datetime.utcnow() + RESERVATION_GRACE
+    if not claim_slot(db, booking.slot_id, booking.start_time, booking.end_time, occupy, booking.vehicle_type):
+        if commit:
+            db.rollback()
+        return None
     slot = get_slot_by_id(db, booking.slot_id)
     
+    # Charge the quoted rate if there is one, else the zone's current surge price
+    rate = booking.price_per_hour
+    if rate is None:
+        rate = get_pricing_engine(db).price(slot.zone, slot.price_per_hour)
+    
     # Calculate cost
     total_cost = None
-    if booking.end_time and slot:
+    if booking.end_time:
         duration_hours = (booking.end_time - booking.start_time).total_seconds() / 3600
-        total_cost = round(duration_hours * slot.price_per_hour, 2)
-    
-    if slot:
-        slot.is_occupied = True
-        slot.last_occupied_time = booking.start_time
+        total_cost = round(duration_hours * rate, 2)
     
     db_booking = Booking(
         slot_id=booking.slot_id,
+        user_email=booking.user_email,
         user_name=booking.user_name,
         phone_number=booking.phone_number,
         vehicle_type=booking.vehicle_type,
@@ -34,33 +99,458 @@ def create_booking(db: Session, booking: BookingCreate):
         start_time=booking.start_time,
         end_time=booking.end_time,
         total_cost=total_cost,
+        price_per_hour=rate,
         status="active"
     )
     db.add(db_booking)
+    update_booking_summary(db, booking.user_email, bookings=1, active=1)
+    analytics.record_booking_created(db, slot.zone, booking.start_time)
+    db.flush()
+    change_log.record(db, change_log.NEW_BOOKING, [db_booking.id])
+    if occupy:
+        change_log.record(db, change_log.SLOT, [slot.id])
+    if not commit:
+        # Caller owns the transaction (see group_commit.GroupCommitWriter)
+        return db_booking
     db.commit()
     db.refresh(db_booking)
+    notify_slot_changed(slot)
+    notify_booking_changed(db_booking)
+    notify_booking_created(db_booking)
     return db_booking
 
-def end_booking(db: Session, booking_id: int):
+def end_booking(db: Session, booking_id: int, commit: bool = True):
     booking = db.query(Booking).filter(Booking.id == booking_id).first()
-    if booking:
-        end_time = datetime.utcnow()
+    if booking is None or booking.status != "active":
+        # Already ended (by hand or by auto-expiry): keep its settled cost and leave the slot alone
+        return booking
+    end_time = datetime.utcnow()
+    slot = get_slot_by_id(db, booking.slot_id)
+    if booking.start_time > end_time:
+        # Ended before it starts: a cancelled reservation. Nothing is charged
+        # and the booked window stays on record as it was.
+        booking.status = "cancelled"
+        booking.total_cost = 0.0
+        # Booked within the grace, the claim already occupied the slot
+        freed = (
+            slot is not None and slot.is_occupied and slot.last_occupied_time == booking.start_time
+            and booking.start_time <= end_time + RESERVATION_GRACE
+        )
+        if freed:
+            slot.is_occupied = False
+            slot.occupied_vehicle_type = None
+        update_booking_summary(db, booking.user_email, active=-1)
+        if slot:
+            analytics.record_booking_cancelled(db, slot.zone, booking.start_time)
+    else:
+        freed = slot is not None
         booking.end_time = end_time
         booking.status = "completed"
-        slot = get_slot_by_id(db, booking.slot_id)
         if slot:
             slot.is_occupied = False
+            slot.occupied_vehicle_type = None
             # Recalculate cost based on actual time
             duration_hours = (end_time - booking.start_time).total_seconds() / 3600
-            booking.total_cost = round(duration_hours * slot.price_per_hour, 2)
-        db.commit()
+            rate = booking.price_per_hour if booking.price_per_hour is not None else slot.price_per_hour
+            booking.total_cost = round(duration_hours * rate, 2)
+            analytics.record_booking_completed(db, slot.zone, booking.start_time, end_time, booking.total_cost)
+        update_booking_summary(db, booking.user_email, active=-1, spend=booking.total_cost or 0.0)
+    change_log.record(db, change_log.BOOKING, [booking.id])
+    if freed:
+        change_log.record(db, change_log.SLOT, [slot.id])
+    if not commit:
+        db.flush()
+        return booking
+    db.commit()
+    if freed:
+        notify_slot_changed(slot)
+    notify_booking_changed(booking)
     return booking
 
+def notify_slot_changed(slot: ParkingSlot):
+    """Propagate a committed occupancy change to caches and live subscribers."""
+    notify_slots_changed([slot])
+
+def notify_slots_changed(slots):
+    if not slots:
+        return
+    slot_cache.invalidate(SLOT_OCCUPANCY_KEY, SLOT_INVENTORY_BODY_KEY)
+    inventory_version.bump()
+    for slot in slots:
+        recommendation_index.update_slot(slot)
+        geo_index.update_occupancy(slot.id, slot.is_occupied, slot.last_occupied_time)
+        pricing_engine.update_slot(slot.id, slot.zone, slot.is_occupied)
+        broadcaster.publish(slot_event(slot))
+
+def notify_inventory_changed():
+    """Slots or listings were added in bulk: drop every derived view of them."""
+    slot_cache.invalidate(SLOT_CATALOG_KEY, SLOT_OCCUPANCY_KEY, SLOT_COUNT_KEY, SLOT_INVENTORY_BODY_KEY)
+    inventory_version.bump()
+    recommendation_index.clear()
+    availability_index.clear()
+    geo_index.clear()
+    pricing_engine.clear()
+
+def notify_booking_changed(booking: Booking):
+    availability_index.update_booking(booking)
+    if booking.status == "completed" and booking.slot is not None:
+        # Actual stay length feeds the free-time model
+        free_time_model.observe(booking.slot.zone, booking.vehicle_type, booking.start_time, booking.end_time)
+
+def notify_booking_created(booking: Booking):
+    # New demand in the slot's zone, for surge pricing
+    pricing_engine.record_arrival(booking.slot_id)
+    booking_scheduler.schedule(booking.end_time)
+    if booking.start_time > datetime.utcnow() + RESERVATION_GRACE:
+        booking_scheduler.schedule(booking.start_time - RESERVATION_GRACE)
+
+def notify_bookings_expired(rows):
+    """rows: (booking_id, slot_id) completed by expire_due_bookings.
+
+    The free-time model is not fed here: these stays ended at their booked
+    time, not at an observed departure.
+    """
+    availability_index.remove_bookings(rows)
+
+def notify_listing_changed(listing: UserListing):
+    if listing.is_available:
+        geo_index.upsert(GeoEntry.from_listing(listing))
+    else:
+        geo_index.remove("listing", listing.id)
+
+def apply_logged_changes(db: Session, entries: list):
+    """Writes another worker committed, as (kind, ref_id) change log entries:
+    run the hooks that worker ran, from the rows as they are now."""
+    ids = {}
+    for kind, ref_id in entries:
+        ids.setdefault(kind, set()).add(ref_id)
+    if change_log.CATALOG in ids:
+        # Everything derived is reloaded on next use anyway
+        notify_inventory_changed()
+        return
+    if change_log.SLOT in ids:
+        notify_slots_changed(get_slot_rows(db, ids[change_log.SLOT]))
+    created = ids.get(change_log.NEW_BOOKING, set())
+    booking_ids = created | ids.get(change_log.BOOKING, set())
+    if booking_ids:
+        rows = db.execute(
+            select(Booking.id, Booking.slot_id, Booking.start_time, Booking.end_time, Booking.status)
+            .where(Booking.id.in_(booking_ids))
+        )
+        for row in rows:
+            availability_index.update_booking(row)
+            if row.id in created:
+                pricing_engine.record_arrival(row.slot_id)
+    if change_log.LISTING in ids:
+        for listing in db.query(UserListing).filter(UserListing.id.in_(ids[change_log.LISTING])):
+            notify_listing_changed(listing)
+
+def get_recommendation_index(db: Session):
+    """Return the shared recommendation index, building it on first use."""
+    if not recommendation_index.loaded:
+        recommendation_index.load(get_all_slots(db))
+    return recommendation_index
+
+def get_pricing_engine(db: Session):
+    """Return the shared pricing engine, loading per-zone occupancy on first use."""
+    if not pricing_engine.loaded:
+        pricing_engine.load(db.execute(select(ParkingSlot.id, ParkingSlot.zone, ParkingSlot.is_occupied)))
+    return pricing_engine
+
+def get_availability_index(db: Session):
+    """Return the shared availability index, loading active bookings on first use."""
+    if not availability_index.loaded:
+        availability_index.load(
+            db.query(Booking.id, Booking.slot_id, Booking.start_time, Booking.end_time)
+            .filter(Booking.status == "active")
+            .yield_per(10000)
+        )
+    return availability_index
+
+def get_geo_index(db: Session):
+    """Return the shared map of slots and open listings, loading it on first use."""
+    if not geo_index.loaded:
+        slots = db.query(ParkingSlot).filter(ParkingSlot.latitude.isnot(None)).yield_per(10000)
+        listings = (
+            db.query(UserListing)
+            .filter(UserListing.is_available == True, UserListing.latitude.isnot(None))
+            .yield_per(10000)
+        )
+        geo_index.load(
+            [GeoEntry.from_slot(slot) for slot in slots]
+            + [GeoEntry.from_listing(listing) for listing in listings]
+        )
+    return geo_index
+
+def listings_available_query(start_time: datetime, end_time: datetime = None):
+    """Listings whose availability window covers [start_time, end_time)."""
+    query = select(UserListing).where(
+        UserListing.is_available == True,
+        UserListing.available_from <= start_time,
+    )
+    if end_time is None:
+        query = query.where(UserListing.available_to.is_(None))
+    else:
+        query = query.where(or_(UserListing.available_to.is_(None), UserListing.available_to >= end_time))
+    return query.order_by(UserListing.available_from)
+
+def get_listings_available(db: Session, start_time: datetime, end_time: datetime = None):
+    return db.execute(listings_available_query(start_time, end_time)).scalars().all()
+
 def get_booking_by_id(db: Session, booking_id: int):
-    return db.query(Booking).filter(Booking.id == booking_id).first()
+    # The confirmation page shows the slot: load it in the same query
+    return db.query(Booking).options(joinedload(Booking.slot)).filter(Booking.id == booking_id).first()
+
+# ─────────────────────────────────────────
+#  Per-user history and summary
+# ─────────────────────────────────────────
+
+HISTORY_PAGE_SIZE = 20
+
+def get_user_booking_history(db: Session, user_email: str, before: tuple = None, limit: int = HISTORY_PAGE_SIZE):
+    """One page of a user's bookings, newest first, slots joined in.
+
+    before is the (start_time, id) of the last booking already shown, so every
+    page costs one indexed query however long the history is.
+    """
+    query = (
+        db.query(Booking)
+        .options(joinedload(Booking.slot))
+        .filter(Booking.user_email == user_email)
+        .order_by(Booking.start_time.desc(), Booking.id.desc())
+    )
+    if before:
+        query = query.filter(tuple_(Booking.start_time, Booking.id) < before)
+    return query.limit(limit).all()
+
+def encode_booking_cursor(start_time: datetime, booking_id: int) -> str:
+    return f"{start_time.isoformat()}_{booking_id}"
+
+def decode_booking_cursor(cursor: str) -> tuple:
+    start_time, booking_id = cursor.rsplit("_", 1)
+    return datetime.fromisoformat(start_time), int(booking_id)
+
+def get_booking_summary(db: Session, user_email: str):
+    return db.get(UserBookingSummary, user_email)
+
+def update_booking_summary(db: Session, user_email: str, bookings: int = 0, active: int = 0, spend: float = 0.0):
+    """Apply deltas to a user's summary row inside the caller's transaction."""
+    update_booking_summaries(db, {user_email: (bookings, active, spend)})
+
+def update_booking_summaries(db: Session, deltas: dict):
+    """deltas: {user_email: (bookings, active, spend)}; one executemany upsert
+    for all users on SQLite and PostgreSQL."""
+    now = datetime.utcnow()
+    params = [
+        {"s_email": user_email, "s_bookings": bookings, "s_active": active, "s_spend": spend, "s_now": now}
+        for user_email, (bookings, active, spend) in deltas.items() if user_email
+    ]
+    if not params:
+        return
+    table = UserBookingSummary.__table__
+    changes = {
+        "booking_count": table.c.booking_count + bindparam("s_bookings"),
+        "active_count": table.c.active_count + bindparam("s_active"),
+        "total_spend": table.c.total_spend + bindparam("s_spend"),
+        "updated_at": bindparam("s_now"),
+    }
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        module = sqlite if dialect == "sqlite" else postgresql
+        db.execute(
+            module.insert(table)
+            .values(user_email=bindparam("s_email"), booking_count=bindparam("s_bookings"),
+                    active_count=bindparam("s_active"), total_spend=bindparam("s_spend"),
+                    updated_at=bindparam("s_now"))
+            .on_conflict_do_update(index_elements=["user_email"], set_=changes),
+            params,
+        )
+        return
+    for row in params:
+        result = db.execute(update(table).where(table.c.user_email == bindparam("s_email")).values(**changes), row)
+        if result.rowcount == 0:
+            db.add(UserBookingSummary(user_email=row["s_email"], booking_count=row["s_bookings"],
+                                      active_count=row["s_active"], total_spend=row["s_spend"], updated_at=now))
+
+# ─────────────────────────────────────────
+#  Booking lifecycle (driven by booking_lifecycle.BookingScheduler)
+# ─────────────────────────────────────────
+
+EXPIRY_BATCH_SIZE = 5000
+
+def get_lifecycle_deadlines(db: Session, now: datetime, until: datetime) -> list:
+    """Times up to until at which an active booking ends or a reservation
+    reaches its start (less RESERVATION_GRACE); anything earlier is already due."""
+    ends = db.execute(
+        select(Booking.end_time).distinct()
+        .where(Booking.status == "active", Booking.end_time > now, Booking.end_time <= until)
+    ).scalars()
+    starts = db.execute(
+        select(Booking.start_time).distinct()
+        .where(Booking.status == "active", Booking.start_time > now + RESERVATION_GRACE,
+               Booking.start_time <= until + RESERVATION_GRACE)
+    ).scalars()
+    return list(ends) + [start - RESERVATION_GRACE for start in starts]
+
+def apply_due_lifecycle(db: Session, now: datetime, batch_size: int = EXPIRY_BATCH_SIZE) -> tuple:
+    """Expire every booking past its end_time, then occupy slots whose
+    reservations have started. Returns (expired, started)."""
+    expired = 0
+    while True:
+        selected, completed = _expire_due_batch(db, now, batch_size)
+        expired += completed
+        if selected < batch_size:
+            break
+    return expired, start_due_reservations(db, now)
+
+def expire_due_bookings(db: Session, now: datetime = None, limit: int = EXPIRY_BATCH_SIZE) -> int:
+    """Complete up to limit active bookings whose end_time has passed.
+
+    One transaction per batch: the bookings are completed and their cost
+    settled at the booked end time with one executemany UPDATE, user summaries
+    and zone rollups with one executemany upsert each, and the slots are freed
+    with one UPDATE, except slots another active booking has already started on.
+    """
+    return _expire_due_batch(db, now or datetime.utcnow(), limit)[1]
+
+def _expire_due_batch(db: Session, now: datetime, limit: int) -> tuple:
+    """(bookings selected as due, bookings this pass completed)."""
+    rows = db.execute(
+        select(Booking.id, Booking.slot_id, Booking.user_email, Booking.start_time, Booking.end_time,
+               func.coalesce(Booking.price_per_hour, ParkingSlot.price_per_hour), ParkingSlot.zone)
+        .outerjoin(ParkingSlot, ParkingSlot.id == Booking.slot_id)
+        .where(Booking.status == "active", Booking.end_time <= now)
+        .order_by(Booking.end_time)
+        .limit(limit)
+    ).all()
+    if not rows:
+        return 0, 0
+    settled = [
+        {"b_id": booking_id, "b_cost": round((end_time - start_time).total_seconds() / 3600 * (rate or 0.0), 2)}
+        for booking_id, _, _, start_time, end_time, rate, _ in rows
+    ]
+    table = Booking.__table__
+    settle = (
+        update(table)
+        .where(table.c.id == bindparam("b_id"), table.c.status == "active")
+        .values(status="completed", total_cost=bindparam("b_cost"), auto_expired=True)
+    )
+    moved = list(zip(rows, settled))
+    if db.execute(settle, settled).rowcount != len(settled):
+        # Some were ended by hand since the select: settle row by row and
+        # account only for the bookings this pass actually completed
+        db.rollback()
+        moved = [(row, params) for row, params in moved if db.execute(settle, params).rowcount == 1]
+    summaries = {}
+    rollups = analytics.RollupDeltas()
+    for (_, _, user_email, start_time, end_time, _, zone), params in moved:
+        _, active, spend = summaries.get(user_email, (0, 0, 0.0))
+        summaries[user_email] = (0, active - 1, spend + params["b_cost"])
+        rollups.booking_completed(zone, start_time, end_time, params["b_cost"])
+    update_booking_summaries(db, summaries)
+    rollups.apply(db)
+    slot_ids = {row[1] for row, _ in moved if row[1] is not None}
+    in_use = exists().where(
+        Booking.slot_id == ParkingSlot.id,
+        Booking.status == "active",
+        Booking.start_time <= now + RESERVATION_GRACE,
+    )
+    db.execute(
+        update(ParkingSlot)
+        .where(ParkingSlot.id.in_(slot_ids), ParkingSlot.is_occupied == True, ~in_use)
+        .values(is_occupied=False, occupied_vehicle_type=None)
+        .execution_options(synchronize_session=False)
+    )
+    change_log.record(db, change_log.BOOKING, [row[0] for row, _ in moved])
+    change_log.record(db, change_log.SLOT, slot_ids)
+    db.commit()
+    notify_slots_changed(get_slot_rows(db, slot_ids))
+    notify_bookings_expired([(row[0], row[1]) for row, _ in moved])
+    return len(rows), len(moved)
+
+def get_slot_rows(db: Session, slot_ids) -> list:
+    """Plain column rows for the slots: all the notify hooks read, without ORM state."""
+    return db.execute(select(*ParkingSlot.__table__.columns).where(ParkingSlot.id.in_(list(slot_ids)))).all()
+
+def start_due_reservations(db: Session, now: datetime = None) -> int:
+    """Occupy free slots whose active reservation is within RESERVATION_GRACE
+    of starting, the way create_booking does for bookings made that late."""
+    now = now or datetime.utcnow()
+    rows = db.execute(
+        select(Booking.slot_id, Booking.start_time, Booking.vehicle_type)
+        .join(ParkingSlot, ParkingSlot.id == Booking.slot_id)
+        .where(
+            Booking.status == "active",
+            Booking.start_time <= now + RESERVATION_GRACE,
+            or_(Booking.end_time.is_(None), Booking.end_time > now),
+            or_(ParkingSlot.is_occupied == False, ParkingSlot.is_occupied.is_(None)),
+        )
+        .order_by(Booking.start_time)
+    ).all()
+    claims = {}
+    for slot_id, start_time, vehicle_type in rows:
+        claims.setdefault(slot_id, {"s_id": slot_id, "s_start": start_time, "s_type": vehicle_type})
+    if not claims:
+        return 0
+    table = ParkingSlot.__table__
+    db.execute(
+        update(table)
+        .where(table.c.id == bindparam("s_id"),
+               or_(table.c.is_occupied == False, table.c.is_occupied.is_(None)))
+        .values(is_occupied=True, last_occupied_time=bindparam("s_start"), occupied_vehicle_type=bindparam("s_type")),
+        list(claims.values()),
+    )
+    change_log.record(db, change_log.SLOT, list(claims))
+    db.commit()
+    notify_slots_changed(get_slot_rows(db, claims))
+    return len(claims)
+
+# ─────────────────────────────────────────
+#  Sensor readings (written by sensor_ingest.SensorIngestor)
+# ─────────────────────────────────────────
+
+SENSOR_LOOKUP_CHUNK = 5000
+
+def apply_sensor_readings(db: Session, slot_ids: list, occupied: list, timestamps: list) -> int:
+    """Set occupancy from bay sensors, at most one reading per slot; returns
+    how many slots changed.
+
+    Current state is read in chunks and only slots whose occupancy actually
+    flips are written, with one executemany UPDATE. A slot turning occupied
+    takes the reading's time as last_occupied_time; the vehicle type is
+    unknown to a sensor either way. Unknown slot ids are ignored.
+    """
+    current = {}
+    for lo in range(0, len(slot_ids), SENSOR_LOOKUP_CHUNK):
+        chunk = slot_ids[lo:lo + SENSOR_LOOKUP_CHUNK]
+        current.update(
+            (slot_id, (bool(is_occupied), last_occupied_time))
+            for slot_id, is_occupied, last_occupied_time in db.execute(
+                select(ParkingSlot.id, ParkingSlot.is_occupied, ParkingSlot.last_occupied_time)
+                .where(ParkingSlot.id.in_(chunk))
+            )
+        )
+    changes = []
+    for slot_id, is_occupied, at in zip(slot_ids, occupied, timestamps):
+        state = current.get(slot_id)
+        if state is None or state[0] == is_occupied:
+            continue
+        changes.append({"s_id": slot_id, "s_occupied": is_occupied, "s_time": at if is_occupied else state[1]})
+    if not changes:
+        return 0
+    table = ParkingSlot.__table__
+    db.execute(
+        update(table)
+        .where(table.c.id == bindparam("s_id"))
+        .values(is_occupied=bindparam("s_occupied"), last_occupied_time=bindparam("s_time"), occupied_vehicle_type=None),
+        changes,
+    )
+    change_log.record(db, change_log.SLOT, [change["s_id"] for change in changes])
+    db.commit()
+    notify_slots_changed(get_slot_rows(db, [change["s_id"] for change in changes]))
+    return len(changes)
 
-def get_booking_history(db: Session, limit: int = 50):
-    return db.query(Booking).order_by(Booking.start_time.desc()).limit(limit).all()
+DEMO_GARAGE_LOCATION = (12.9716, 77.5946)
 
 def seed_parking_slots(db: Session):
     """Seed demo parking data if DB is empty."""
@@ -73,6 +563,8 @@ def seed_parking_slots(db: Session):
         "B": {"price": 15.0, "count": 8, "label": "Standard"},
         "C": {"price": 10.0, "count": 6, "label": "Economy"},
     }
+    # One demo garage; zones are rows ~20 m apart, slots ~3 m apart
+    lat0, lon0 = DEMO_GARAGE_LOCATION
     
     count = 0
     for zone, config in zones.items():
@@ -83,9 +575,13 @@ def seed_parking_slots(db: Session):
                 price_per_hour=config["price"],
                 vehicle_types="Car,Bike,SUV",
                 is_occupied=(i % 3 == 0),  # some occupied for demo
+                latitude=lat0 + 0.00018 * "ABC".index(zone),
+                longitude=lon0 + 0.00003 * i,
             )
             db.add(slot)
             count += 1
     
+    change_log.record(db, change_log.CATALOG)
     db.commit()
+    notify_inventory_changed()
     return count
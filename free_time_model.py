@@ -0,0 +1,290 @@
+import argparse
+import math
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+# Trained offline from the bookings table with:  python free_time_model.py
+MODEL_PATH = os.getenv("PARKWISE_FREE_TIME_MODEL", "free_time_model.npz")
+PRIOR_DURATION_MINUTES = 60
+PRIOR_WEIGHT = 20.0  # pseudo-observations taken from the parent distribution
+REFRESH_SECONDS = 10.0  # how often observed durations are folded into predictions
+
+BIN_MINUTES = 5
+HORIZON_MINUTES = 12 * 60
+N_BINS = HORIZON_MINUTES // BIN_MINUTES  # plus one overflow bin for longer stays
+HOURS_PER_WEEK = 168
+
+ZONES = ("A", "B", "C")
+VEHICLES = ("Car", "Bike", "SUV")
+_ZONE_INDEX = {zone: i for i, zone in enumerate(ZONES)}
+_VEHICLE_INDEX = {vt: i for i, vt in enumerate(VEHICLES)}
+OTHER_ZONE = len(ZONES)
+OTHER_VEHICLE = len(VEHICLES)
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _ts(value: datetime) -> float:
+    return (value - _EPOCH).total_seconds()
+
+
+def hour_of_week(ts):
+    """Monday 00:00 UTC = 0. The epoch was a Thursday, 72 hours into its week."""
+    return (np.floor_divide(ts, 3600).astype(np.int64) + 72) % HOURS_PER_WEEK
+
+
+def _zone_codes(zones) -> np.ndarray:
+    zones = np.asarray(zones, dtype=object)
+    codes = np.full(len(zones), OTHER_ZONE, dtype=np.intp)
+    for label, i in _ZONE_INDEX.items():
+        codes[zones == label] = i
+    return codes
+
+
+def _vehicle_codes(vehicle_types, n: int) -> np.ndarray:
+    """Columns of the derived tables: 0 = any vehicle, then VEHICLES, then other."""
+    codes = np.zeros(n, dtype=np.intp)
+    if vehicle_types is None:
+        return codes
+    vehicle_types = np.asarray(vehicle_types, dtype=object)
+    known = np.zeros(n, dtype=bool)
+    for label, i in _VEHICLE_INDEX.items():
+        match = vehicle_types == label
+        codes[match] = i + 1
+        known |= match
+    other = ~known & (vehicle_types != None) & (vehicle_types != "")  # noqa: E711
+    codes[other] = OTHER_VEHICLE + 1
+    return codes
+
+
+class FreeTimeModel:
+    """Parking durations learned from completed bookings.
+
+    Stays are counted into 5-minute histograms per (zone, vehicle type,
+    hour-of-week of arrival). For a car parked for e minutes the predicted
+    total stay is the median of that distribution given "still parked after e
+    minutes", so long stays are not written off as about to leave just because
+    they passed the average. Sparse cells borrow from their (zone, vehicle)
+    distribution over all hours, and that from the global one; with no
+    history the model is a fixed PRIOR_DURATION_MINUTES stay, the old rule.
+
+    Predictions are precomputed into finish[zone, vehicle, hour, elapsed_bin]
+    so batch inference is a single gather.
+    """
+
+    def __init__(self, counts: np.ndarray = None, prior_minutes: float = PRIOR_DURATION_MINUTES):
+        shape = (len(ZONES) + 1, len(VEHICLES) + 1, HOURS_PER_WEEK, N_BINS + 1)
+        self.counts = np.zeros(shape, dtype=np.uint32) if counts is None else counts.astype(np.uint32)
+        self.prior_minutes = prior_minutes
+        self.finish = np.empty((shape[0], shape[1] + 1, HOURS_PER_WEEK, N_BINS), dtype=np.float32)
+        self.observed = 0
+        self._saved = self.counts.copy()  # what the model file already holds
+        self._lock = threading.Lock()
+        self._dirty = set()
+        self._refreshed = 0.0
+        self._derive(range(shape[0]))
+
+    # ── training / persistence ────────────
+
+    @classmethod
+    def fit(cls, rows, prior_minutes: float = PRIOR_DURATION_MINUTES) -> "FreeTimeModel":
+        """rows: (zone, vehicle_type, start_time, end_time) of completed bookings."""
+        model = cls(prior_minutes=prior_minutes)
+        zones, vehicles, starts, minutes = [], [], [], []
+        for zone, vehicle_type, start_time, end_time in rows:
+            if start_time is None or end_time is None or end_time < start_time:
+                continue
+            zones.append(zone)
+            vehicles.append(vehicle_type)
+            starts.append(_ts(start_time))
+            minutes.append((end_time - start_time).total_seconds() / 60)
+        if zones:
+            # Histogram columns have no "any vehicle" entry; missing types count as other
+            vehicle = _vehicle_codes(vehicles, len(vehicles)) - 1
+            vehicle[vehicle < 0] = OTHER_VEHICLE
+            np.add.at(model.counts, (
+                _zone_codes(zones),
+                vehicle,
+                hour_of_week(np.array(starts)),
+                np.minimum(np.array(minutes) // BIN_MINUTES, N_BINS).astype(np.intp),
+            ), 1)
+        model._derive(range(model.counts.shape[0]))
+        return model
+
+    @classmethod
+    def load(cls, path: str) -> "FreeTimeModel":
+        with np.load(path) as data:
+            return cls(data["counts"], prior_minutes=float(data["prior_minutes"]))
+
+    def save(self, path: str):
+        with self._lock:
+            counts = self.counts.copy()
+        self._write(path, counts)
+
+    def save_observed(self, path: str):
+        """Add the stays observed since load (or the last call) to the file.
+
+        Every worker process learns from its own bookings only, so each adds
+        its share under a file lock instead of overwriting the others'.
+        """
+        import fcntl
+
+        with self._lock:
+            counts = self.counts.copy()
+        with open(f"{path}.lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            if os.path.exists(path):
+                with np.load(path) as data:
+                    merged = data["counts"].astype(np.uint32)
+            else:
+                merged = np.zeros_like(counts)
+            merged += counts - self._saved
+            self._write(path, merged)
+        self._saved = counts
+
+    def _write(self, path: str, counts: np.ndarray):
+        tmp = f"{path}.tmp.{os.getpid()}"
+        with open(tmp, "wb") as f:
+            np.savez_compressed(f, counts=counts, prior_minutes=self.prior_minutes)
+        os.replace(tmp, path)
+
+    # ── incremental updates ───────────────
+
+    def observe(self, zone: str, vehicle_type: str, start_time: datetime, end_time: datetime):
+        """Count one completed stay; predictions pick it up within REFRESH_SECONDS."""
+        if start_time is None or end_time is None or end_time < start_time:
+            return
+        z = _ZONE_INDEX.get(zone, OTHER_ZONE)
+        v = _VEHICLE_INDEX.get(vehicle_type, OTHER_VEHICLE)
+        b = min(int((end_time - start_time).total_seconds() // 60 // BIN_MINUTES), N_BINS)
+        with self._lock:
+            self.counts[z, v, int(hour_of_week(_ts(start_time))), b] += 1
+            self._dirty.add(z)
+            self.observed += 1
+
+    def _refresh(self):
+        if self._dirty and time.monotonic() - self._refreshed >= REFRESH_SECONDS:
+            with self._lock:
+                zones, self._dirty = self._dirty, set()
+                self._derive(zones)
+
+    def _derive(self, zones):
+        counts = self.counts.astype(np.float64)
+        prior = np.zeros(N_BINS + 1)
+        prior[min(int(self.prior_minutes // BIN_MINUTES), N_BINS)] = 1.0
+        base = counts.sum(axis=(0, 1, 2)) + PRIOR_WEIGHT * prior
+        base /= base.sum()
+        for z in zones:
+            cells = np.concatenate([counts[z].sum(axis=0, keepdims=True), counts[z]])  # any vehicle first
+            parent = cells.sum(axis=1, keepdims=True) + PRIOR_WEIGHT * base
+            parent /= parent.sum(axis=-1, keepdims=True)
+            smoothed = cells + PRIOR_WEIGHT * parent
+            cdf = np.cumsum(smoothed / smoothed.sum(axis=-1, keepdims=True), axis=-1)
+            # P(stay >= b bins) for every elapsed bin b, and the cdf level of the
+            # conditional median: halfway between here and certainty.
+            survival = 1.0 - np.concatenate([np.zeros(cdf.shape[:-1] + (1,)), cdf[..., :N_BINS - 1]], axis=-1)
+            target = 1.0 - survival / 2 - 1e-9
+            median_bin = (cdf[..., None, :] >= target[..., :, None]).argmax(axis=-1)
+            finish = (median_bin + 0.5) * BIN_MINUTES
+            # Median beyond the horizon: the horizon is the best lower bound we have
+            self.finish[z] = np.minimum(finish, HORIZON_MINUTES)
+        self._refreshed = time.monotonic()
+
+    # ── inference ─────────────────────────
+
+    def predict_remaining(self, zones, vehicle_types, start_ts, now_ts) -> np.ndarray:
+        """Minutes until each car leaves. Times are epoch seconds (NaN start =
+        unknown); now_ts is a scalar or one value per row."""
+        self._refresh()
+        start_ts = np.asarray(start_ts, dtype=np.float64)
+        known = ~np.isnan(start_ts)
+        elapsed = np.where(known, (now_ts - start_ts) / 60, 0.0)
+        elapsed_bin = np.clip(np.floor_divide(elapsed, BIN_MINUTES), 0, N_BINS).astype(np.intp)
+        finish = self.finish[
+            _zone_codes(zones),
+            _vehicle_codes(vehicle_types, len(start_ts)),
+            hour_of_week(np.where(known, start_ts, 0.0)),
+            np.minimum(elapsed_bin, N_BINS - 1),
+        ]
+        # Unknown start, or parked past the horizon: could leave any moment
+        return np.where(known & (elapsed_bin < N_BINS), np.maximum(0.0, finish - elapsed), 0.0)
+
+    def remaining_minutes(self, zone: str, vehicle_type: str, start_time: datetime, now: datetime = None) -> float:
+        if start_time is None:
+            return 0.0
+        now = now or datetime.utcnow()
+        return float(self.predict_remaining([zone], [vehicle_type], [_ts(start_time)], _ts(now))[0])
+
+    def band_state(self, zone: str, vehicle_type: str, start_time: datetime, band: float, now: datetime = None):
+        """(remaining < band now?, next datetime at which that answer flips or None)."""
+        if start_time is None:
+            return True, None
+        self._refresh()
+        now = now or datetime.utcnow()
+        elapsed = (now - start_time).total_seconds() / 60
+        row = self.finish[
+            _ZONE_INDEX.get(zone, OTHER_ZONE),
+            int(_vehicle_codes([vehicle_type], 1)[0]),
+            int(hour_of_week(_ts(start_time))),
+        ]
+        first = max(0, math.floor(elapsed / BIN_MINUTES))
+        if first >= N_BINS:
+            return True, None
+        # Within a bin the predicted finish is fixed, so the car enters the
+        # band once elapsed passes finish - band; at bin edges it can leave.
+        state = bool(elapsed > row[first] - band)
+        for b in range(first, N_BINS):
+            lo, hi = max(elapsed, b * BIN_MINUTES), (b + 1) * BIN_MINUTES
+            cut = float(row[b]) - band
+            if (lo > cut) != state:
+                return state, start_time + timedelta(minutes=lo)
+            if not state and cut < hi:
+                return state, start_time + timedelta(minutes=cut)
+        return state, None if state else start_time + timedelta(minutes=HORIZON_MINUTES)
+
+
+def load_model(path: str = MODEL_PATH) -> FreeTimeModel:
+    """The trained model if the file exists, otherwise the prior-only model."""
+    if path and os.path.exists(path):
+        return FreeTimeModel.load(path)
+    return FreeTimeModel()
+
+
+def completed_stays(db):
+    """(zone, vehicle_type, start_time, end_time) rows FreeTimeModel.fit learns from.
+
+    Like observe() at runtime, bookings completed by auto-expiry are left out:
+    they ended at the booked time, not at an observed departure.
+    """
+    from models import Booking, ParkingSlot
+
+    return (
+        db.query(ParkingSlot.zone, Booking.vehicle_type, Booking.start_time, Booking.end_time)
+        .join(ParkingSlot, ParkingSlot.id == Booking.slot_id)
+        .filter(Booking.status == "completed", Booking.auto_expired.isnot(True))
+        .yield_per(10000)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the free-time model from completed bookings.")
+    parser.add_argument("--out", default=MODEL_PATH)
+    args = parser.parse_args()
+
+    from database import SessionLocal
+
+    with SessionLocal() as db:
+        start = time.perf_counter()
+        model = FreeTimeModel.fit(completed_stays(db))
+    model.save(args.out)
+    print(f"trained on {int(model.counts.sum())} stays in {time.perf_counter() - start:.1f}s -> {args.out}")
+
+
+free_time_model = load_model()
+
+if __name__ == "__main__":
+    main()
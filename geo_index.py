@@ -0,0 +1,221 @@
+import heapq
+import math
+import threading
+
+from ai_logic import calculate_slot_score, DISTANCE_PENALTY_PER_KM, MAX_SLOT_SCORE
+from metrics import timed
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+
+SLOT = "slot"
+LISTING = "listing"
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class GeoEntry:
+    """A garage slot or peer listing on the map. Has the attributes
+    calculate_slot_score reads, so both kinds are scored the same way."""
+
+    __slots__ = (
+        "kind", "id", "label", "lat", "lon", "zone", "price_per_hour",
+        "vehicle_types", "is_occupied", "last_occupied_time", "cell",
+    )
+
+    def __init__(self, kind, id, label, lat, lon, zone=None, price_per_hour=None,
+                 vehicle_types=None, is_occupied=False, last_occupied_time=None):
+        self.kind = kind
+        self.id = id
+        self.label = label
+        self.lat = lat
+        self.lon = lon
+        self.zone = zone
+        self.price_per_hour = price_per_hour
+        self.vehicle_types = vehicle_types
+        self.is_occupied = is_occupied
+        self.last_occupied_time = last_occupied_time
+        self.cell = None
+
+    @classmethod
+    def from_slot(cls, slot):
+        return cls(
+            SLOT, slot.id, slot.slot_number, slot.latitude, slot.longitude,
+            zone=slot.zone, price_per_hour=slot.price_per_hour,
+            vehicle_types=frozenset(vt.strip() for vt in (slot.vehicle_types or "").split(",") if vt.strip()),
+            is_occupied=bool(slot.is_occupied), last_occupied_time=slot.last_occupied_time,
+        )
+
+    @classmethod
+    def from_listing(cls, listing):
+        # Peer listings take any vehicle and are free while listed
+        return cls(
+            LISTING, listing.id, listing.title, listing.latitude, listing.longitude,
+            price_per_hour=listing.price_per_hour, is_occupied=not listing.is_available,
+        )
+
+
+class GeoIndex:
+    """Uniform lat/lon grid of slots and listings for nearest-k queries.
+
+    Cells are cell_km on a side (at the equator); a query walks rings of
+    cells outwards from the query point and stops once no unvisited cell can
+    beat the current k-th best, so cost depends on local density rather than
+    on the total number of locations.
+    """
+
+    def __init__(self, cell_km: float = 0.25):
+        self.cell_deg = cell_km / KM_PER_DEGREE
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._cells = {}
+        self._entries = {}
+        self._bounds = None  # (min_x, min_y, max_x, max_y) of occupied cells, never shrinks
+        self.loaded = False
+
+    def _cell_of(self, lat, lon):
+        return math.floor(lon / self.cell_deg), math.floor(lat / self.cell_deg)
+
+    # ── building ──────────────────────────
+
+    def load(self, entries):
+        with self._lock:
+            self._reset()
+            for entry in entries:
+                self._insert(entry)
+            self.loaded = True
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+
+    def _insert(self, entry: GeoEntry):
+        key = (entry.kind, entry.id)
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._cells[old.cell].pop(key, None)
+        if entry.lat is None or entry.lon is None:
+            return
+        entry.cell = x, y = self._cell_of(entry.lat, entry.lon)
+        self._cells.setdefault(entry.cell, {})[key] = entry
+        self._entries[key] = entry
+        if self._bounds is None:
+            self._bounds = (x, y, x, y)
+        else:
+            min_x, min_y, max_x, max_y = self._bounds
+            self._bounds = (min(min_x, x), min(min_y, y), max(max_x, x), max(max_y, y))
+
+    # ── write hooks (called from crud) ────
+
+    def upsert(self, entry: GeoEntry):
+        if not self.loaded:
+            return
+        with self._lock:
+            self._insert(entry)
+
+    def remove(self, kind: str, id: int):
+        if not self.loaded:
+            return
+        with self._lock:
+            old = self._entries.pop((kind, id), None)
+            if old is not None:
+                self._cells[old.cell].pop((kind, id), None)
+
+    def update_occupancy(self, slot_id: int, is_occupied: bool, last_occupied_time):
+        entry = self._entries.get((SLOT, slot_id))
+        if entry is not None:
+            entry.is_occupied = bool(is_occupied)
+            entry.last_occupied_time = last_occupied_time
+
+    # ── reads ─────────────────────────────
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _ring(self, cx, cy, r):
+        min_x, min_y, max_x, max_y = self._bounds
+        for y in range(max(cy - r, min_y), min(cy + r, max_y) + 1):
+            if abs(y - cy) == r:
+                xs = range(max(cx - r, min_x), min(cx + r, max_x) + 1)
+            else:
+                xs = [x for x in (cx - r, cx + r) if min_x <= x <= max_x]
+            for x in xs:
+                cell = self._cells.get((x, y))
+                if cell:
+                    yield from cell.values()
+
+    def nearest(self, lat: float, lon: float, k: int, cost=None, min_cost=None, accept=None, max_km: float = None):
+        """The k entries with the lowest cost(entry, distance_km), as
+        (cost, distance_km, entry) sorted best first.
+
+        cost defaults to the distance itself. min_cost(d) must be a lower bound
+        on the cost of anything at least d km away; it is what lets the search
+        stop early.
+        """
+        cost = cost or (lambda entry, km: km)
+        min_cost = min_cost or (lambda km: km)
+        with self._lock:
+            if not self._entries or k <= 0:
+                return []
+            cx, cy = self._cell_of(lat, lon)
+            min_x, min_y, max_x, max_y = self._bounds
+            first = max(0, min_x - cx, cx - max_x, min_y - cy, cy - max_y)
+            last = max(cx - min_x, max_x - cx, cy - min_y, max_y - cy)
+
+            best = []  # max-heap on cost via negation: (-cost, tiebreak, km, entry)
+            tiebreak = 0
+            for r in range(first, last + 1):
+                # Anything in ring r is at least r - 1 whole cells away. Longitude
+                # cells narrow away from the equator, so use the narrowest width
+                # the ring can reach.
+                reach_lat = min(89.0, abs(lat) + (r + 1) * self.cell_deg)
+                cell_km = self.cell_deg * KM_PER_DEGREE * math.cos(math.radians(reach_lat))
+                reachable_km = max(0, r - 1) * cell_km
+                if max_km is not None and reachable_km > max_km:
+                    break
+                if len(best) == k and -best[0][0] <= min_cost(reachable_km):
+                    break
+                for entry in self._ring(cx, cy, r):
+                    if accept is not None and not accept(entry):
+                        continue
+                    km = haversine_km(lat, lon, entry.lat, entry.lon)
+                    if max_km is not None and km > max_km:
+                        continue
+                    value = cost(entry, km)
+                    tiebreak += 1
+                    if len(best) < k:
+                        heapq.heappush(best, (-value, -tiebreak, km, entry))
+                    elif value < -best[0][0]:
+                        heapq.heapreplace(best, (-value, -tiebreak, km, entry))
+        return [(-neg, km, entry) for neg, _, km, entry in sorted(best, key=lambda item: (-item[0], -item[1]))]
+
+
+@timed("nearby")
+def nearby_parking(index: GeoIndex, lat: float, lon: float, k: int = 10,
+                   vehicle_type: str = None, available_only: bool = True, max_km: float = None) -> list:
+    """Slots and listings ranked by slot score minus a per-km distance penalty.
+
+    Returns (rank, distance_km, score, entry), best first.
+    """
+    def accept(entry):
+        if available_only and entry.is_occupied:
+            return False
+        return entry.vehicle_types is None or not vehicle_type or vehicle_type in entry.vehicle_types
+
+    def cost(entry, km):
+        return DISTANCE_PENALTY_PER_KM * km - calculate_slot_score(entry)
+
+    results = index.nearest(
+        lat, lon, k, cost=cost, accept=accept, max_km=max_km,
+        min_cost=lambda km: DISTANCE_PENALTY_PER_KM * km - MAX_SLOT_SCORE,
+    )
+    return [(-value, km, km * DISTANCE_PENALTY_PER_KM - value, entry) for value, km, entry in results]
+
+
+geo_index = GeoIndex()
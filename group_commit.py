@@ -0,0 +1,144 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from sqlalchemy.exc import OperationalError
+
+from database import (
+    WRITE_ATTEMPTS, WRITE_QUEUE_LIMIT, WRITE_RETRY_DELAY, WriteBusy, WriteSessionLocal, is_database_locked,
+)
+import crud
+
+_STOP = object()
+
+log = logging.getLogger("parkwise.group_commit")
+
+
+class GroupCommitWriter:
+    """Single writer thread that coalesces bursts of writes into one transaction.
+
+    Each submitted job runs inside its own SAVEPOINT, so a failing job only
+    rolls back itself; the batch as a whole pays for a single COMMIT (one
+    journal/WAL sync) instead of one per booking. When SQLite reports the
+    database locked (another process writing), the whole batch is retried.
+    """
+
+    def __init__(self, session_factory, max_batch: int = 64, max_delay: float = 0.002,
+                 limit: int = WRITE_QUEUE_LIMIT):
+        self._session_factory = session_factory
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue = queue.Queue(maxsize=limit)
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="group-commit", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+
+    def submit(self, job, on_commit=None) -> Future:
+        """Queue job(session) -> result; on_commit(result) runs once it is durable.
+
+        Raises WriteBusy when the queue is full.
+        """
+        future = Future()
+        try:
+            self._queue.put_nowait((job, on_commit, future))
+        except queue.Full:
+            raise WriteBusy(f"{self._queue.maxsize} writes already queued") from None
+        return future
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.max_delay
+            stopping = False
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._flush(batch)
+            if stopping:
+                return
+
+    def _flush(self, batch):
+        for attempt in range(WRITE_ATTEMPTS):
+            try:
+                self._commit_batch(batch)
+                return
+            except Exception as exc:
+                if not is_database_locked(exc) or attempt == WRITE_ATTEMPTS - 1:
+                    for _, _, future in batch:
+                        future.set_exception(exc)
+                    return
+            time.sleep(WRITE_RETRY_DELAY * 2 ** attempt)
+
+    def _commit_batch(self, batch):
+        outcomes = []
+        with self._session_factory() as db:
+            # Take the write lock before any job runs: a lock error is then
+            # the batch's to retry, never one job's to report
+            db.connection()
+            for job, _, _ in batch:
+                try:
+                    with db.begin_nested():
+                        outcomes.append((job(db), None))
+                except OperationalError as exc:
+                    if is_database_locked(exc):
+                        raise
+                    outcomes.append((None, exc))
+                except Exception as exc:
+                    outcomes.append((None, exc))
+            db.commit()
+            # Durable from here on, so nothing below may fail the batch; the
+            # hooks run before the session closes so they can still lazy-load
+            for (_, on_commit, future), (result, error) in zip(batch, outcomes):
+                if error is not None:
+                    future.set_exception(error)
+                    continue
+                if on_commit and result is not None:
+                    try:
+                        on_commit(result)
+                    except Exception:
+                        log.exception("group-commit hook failed after commit")
+                future.set_result(result)
+
+
+# The write engine's sessions keep objects loaded after the batch commits, so
+# on_commit hooks and the routes that receive them never reload per row.
+booking_writer = GroupCommitWriter(WriteSessionLocal)
+
+
+def _notify(booking):
+    if booking.slot is not None:
+        crud.notify_slot_changed(booking.slot)
+    crud.notify_booking_changed(booking)
+
+
+def _notify_created(booking):
+    _notify(booking)
+    crud.notify_booking_created(booking)
+
+
+def submit_create_booking(booking) -> Future:
+    return booking_writer.submit(lambda db: crud.create_booking(db, booking, commit=False), on_commit=_notify_created)
+
+
+def submit_end_booking(booking_id: int) -> Future:
+    return booking_writer.submit(lambda db: crud.end_booking(db, booking_id, commit=False), on_commit=_notify)
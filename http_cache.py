@@ -0,0 +1,56 @@
+import hashlib
+import time
+import uuid
+
+from fastapi import Request
+
+from cache import MemoryBackend, slot_cache
+from change_log import change_feed
+
+INVENTORY_VERSION_KEY = "inventory:version"
+# Slot scores drift with time (the "frees up soon" band), so rendered pages
+# that show scores are also keyed by this time bucket.
+SCORE_BUCKET_SECONDS = 60
+
+# A per-process counter restarts at zero, so tag it with this process's id to
+# keep an old ETag from matching a later state; a shared backend needs no tag.
+_SCOPE = uuid.uuid4().hex[:8] if isinstance(slot_cache.backend, MemoryBackend) else "shared"
+
+
+class InventoryVersion:
+    """Monotonic version of slot inventory state, bumped on every occupancy write.
+
+    With several workers it is the change log position instead, which every
+    worker reaches once it has applied the same writes.
+    """
+
+    def current(self) -> str:
+        if change_feed.enabled:
+            return f"log.{change_feed.inventory_position}"
+        return f"{_SCOPE}.{slot_cache.backend.counter(INVENTORY_VERSION_KEY)}"
+
+    def bump(self):
+        slot_cache.backend.incr(INVENTORY_VERSION_KEY)
+
+
+inventory_version = InventoryVersion()
+
+
+def score_bucket(now: float = None) -> int:
+    return int((now or time.time()) // SCORE_BUCKET_SECONDS)
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.sha1("|".join(str(p) for p in parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Weak comparison: W/ prefixes are ignored on both sides
+    wanted = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == wanted for tag in header.split(","))
@@ -0,0 +1,106 @@
+import argparse
+import json
+import logging
+import os
+import secrets
+import sys
+import time
+
+# Set by the launcher for the workers it starts: the one-time preparation
+# below has already run, so workers go straight to warming up.
+PREPARED = os.getenv("PARKWISE_PREPARED") == "1"
+# Logins live in the session store; with several workers it has to be one
+# they all share.
+SHARED_SESSION_STORE = "sqlite:///./sessions.db"
+
+log = logging.getLogger("parkwise.launcher")
+
+
+def prepare_database() -> dict:
+    """Create or migrate the schema and seed the demo slots if there are none."""
+    import crud
+    from database import WriteSessionLocal, engine
+    from migrations import apply_migrations
+
+    timings = {}
+    started = time.perf_counter()
+    apply_migrations(engine)
+    timings["migrate"] = time.perf_counter() - started
+    started = time.perf_counter()
+    with WriteSessionLocal() as db:
+        crud.seed_parking_slots(db)
+    timings["seed"] = time.perf_counter() - started
+    return timings
+
+
+def prepare_assets() -> dict:
+    """Build the hashed static assets and write the template bytecode cache."""
+    from fastapi.templating import Jinja2Templates
+
+    import static_assets
+
+    timings = {}
+    started = time.perf_counter()
+    try:
+        static_assets.build()
+    except OSError as exc:
+        # Read-only tree: workers compress the assets in memory instead
+        log.warning("static asset build skipped: %s", exc)
+    timings["static"] = time.perf_counter() - started
+    started = time.perf_counter()
+    env = Jinja2Templates(directory="templates").env
+    static_assets.enable_bytecode_cache(env)
+    static_assets.precompile_templates(env)
+    timings["templates"] = time.perf_counter() - started
+    return timings
+
+
+def prepare() -> dict:
+    """Everything that must happen once per deployment, not once per worker."""
+    timings = prepare_database()
+    timings.update(prepare_assets())
+    return {name: round(seconds, 3) for name, seconds in timings.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Prepare the database and build artifacts once, then start the uvicorn workers.",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--prepare-only", action="store_true",
+                        help="run the one-time preparation and exit (e.g. as a release step)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s:     %(message)s")
+    if not PREPARED:
+        timings = prepare()
+        log.info("prepared in %.2f s %s", sum(timings.values()), json.dumps(timings))
+    if args.prepare_only:
+        return 0
+
+    from database import engine, write_engine
+
+    # Workers are spawned, not forked, but drop the launcher's connections anyway
+    engine.dispose()
+    write_engine.dispose()
+    os.environ["PARKWISE_PREPARED"] = "1"
+    if args.workers > 1 and os.getenv("PARKWISE_SESSION_STORE", "memory") == "memory":
+        log.info("%d workers: sharing sessions through %s", args.workers, SHARED_SESSION_STORE)
+        os.environ["PARKWISE_SESSION_STORE"] = SHARED_SESSION_STORE
+    if args.workers > 1:
+        # Caches, indexes, ETag versions and live events are per worker: keep
+        # them in step through the database's change log (see change_log.py)
+        os.environ["PARKWISE_SHARED_STATE"] = "1"
+        # A quote shown by one worker is redeemed by whichever gets the POST
+        os.environ.setdefault("PARKWISE_QUOTE_SECRET", secrets.token_hex(32))
+
+    import uvicorn
+
+    uvicorn.run("main:app", host=args.host, port=args.port, workers=args.workers)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+import asyncio
+import json
+from collections import deque
+from itertools import islice
+
+KEEPALIVE_SECONDS = 15
+KEEPALIVE_FRAME = b": keep-alive\n\n"
+
+
+def slot_event(slot) -> dict:
+    return {
+        "slot_id": slot.id,
+        "slot_number": slot.slot_number,
+        "zone": slot.zone,
+        "is_occupied": bool(slot.is_occupied),
+        "last_occupied_time": slot.last_occupied_time.isoformat() if slot.last_occupied_time else None,
+    }
+
+
+class Subscription:
+    __slots__ = ("zone", "cursor", "dropped")
+
+    def __init__(self, zone, cursor):
+        self.zone = zone
+        self.cursor = cursor
+        self.dropped = 0
+
+
+class OccupancyBroadcaster:
+    """Fans slot state deltas out to Server-Sent Events subscribers.
+
+    Events go into one shared, bounded log of pre-encoded frames and every
+    subscriber keeps its own cursor into it. A publish costs one append and one
+    future resolution no matter how many clients are idle on the channel;
+    subscribers that fall more than `history` events behind skip ahead rather
+    than holding memory. publish() may be called from any thread (crud runs in
+    the threadpool, run_sync greenlets and the group-commit writer); delivery
+    happens on the event loop bound at startup.
+    """
+
+    def __init__(self, history: int = 1024, keepalive: float = KEEPALIVE_SECONDS):
+        self.keepalive = keepalive
+        self._log = deque(maxlen=history)
+        self._seq = 0
+        self._loop = None
+        self._wakeup = None
+        self._ticker = None
+        self._subs = set()
+
+    def bind(self, loop):
+        self._loop = loop
+        self._wakeup = loop.create_future()
+        self._ticker = loop.call_later(self.keepalive, self._tick)
+
+    def close(self):
+        if self._ticker is not None:
+            self._ticker.cancel()
+        self._loop = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subs)
+
+    def subscribe(self, zone: str = None) -> Subscription:
+        sub = Subscription(zone, self._seq)
+        self._subs.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        self._subs.discard(sub)
+
+    def publish(self, event: dict):
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        frame = f"event: slot\ndata: {json.dumps(event)}\n\n".encode()
+        loop.call_soon_threadsafe(self._append, event.get("zone"), frame)
+
+    def _append(self, zone, frame: bytes):
+        self._seq += 1
+        self._log.append((self._seq, zone, frame))
+        waiter, self._wakeup = self._wakeup, self._loop.create_future()
+        waiter.set_result(None)
+
+    def _tick(self):
+        # Keeps idle connections (and proxies) alive; zone None reaches everyone.
+        self._append(None, KEEPALIVE_FRAME)
+        self._ticker = self._loop.call_later(self.keepalive, self._tick)
+
+    async def stream(self, sub: Subscription):
+        """Yield SSE frames for one subscriber until the response is cancelled."""
+        try:
+            yield b"retry: 3000\n\n"
+            while True:
+                if sub.cursor == self._seq:
+                    # Shielded: a disconnecting client must not cancel the shared future.
+                    await asyncio.shield(self._wakeup)
+                    continue
+                first = self._log[0][0]
+                if sub.cursor + 1 < first:
+                    sub.dropped += first - sub.cursor - 1
+                    sub.cursor = first - 1
+                frames = [
+                    frame for _, zone, frame in islice(self._log, sub.cursor + 1 - first, None)
+                    if sub.zone is None or zone is None or zone == sub.zone
+                ]
+                sub.cursor = self._seq
+                if frames:
+                    yield b"".join(frames)
+        finally:
+            self.unsubscribe(sub)
+
+
+broadcaster = OccupancyBroadcaster()
@@ -1,37 +1,161 @@
-from fastapi import FastAPI, Depends, Form, Request, Cookie
-from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi import FastAPI, Depends, Form, Request, Cookie, Query, Response, HTTPException, Header
+from fastapi.responses import HTMLResponse, PlainTextResponse, RedirectResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from datetime import datetime
+import asyncio
+import io
+import os
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
 from typing import Optional
 
-from database import engine, Base, get_db
+from database import (
+    engine, async_engine, write_engine, SessionLocal, AsyncSessionLocal, WriteSessionLocal,
+    get_db, get_async_db, get_write_db, run_write, GROUP_COMMIT, WriteBusy, warm_pool, warm_async_pool,
+)
 import models
 import crud
-from ai_logic import recommend_best_slot, calculate_slot_score
+import async_crud
+import group_commit
+import bulk_io
+import analytics
+import launcher
+import metrics
+from live_updates import broadcaster
+import change_log
+from change_log import change_feed
+from availability import as_naive_utc
+from geo_index import nearby_parking
+from pricing import quote_book
+from booking_lifecycle import booking_scheduler, AUTO_EXPIRE
+import sensor_ingest
+from sensor_ingest import sensor_ingestor
+from cache import slot_cache
+from http_cache import inventory_version, score_bucket, make_etag, is_not_modified
+from serialization import FastJSONResponse
+from static_assets import AssetBundle, PrecompressedStaticFiles, enable_bytecode_cache, precompile_templates
+from ai_logic import score_slot_columns
 from schemas import BookingCreate
 from mock_auth import (
     create_mock_user, authenticate_user, get_user_by_email,
-    update_user_vehicle, create_session, get_session_user
+    update_user_vehicle, create_session, get_session_user, end_session
 )
+from session_store import session_store, run_sweeper, SESSION_TTL
+from free_time_model import free_time_model, MODEL_PATH as FREE_TIME_MODEL_PATH
+
+metrics.instrument_engine(engine)
+metrics.instrument_engine(async_engine)
+if write_engine is not engine:
+    metrics.instrument_engine(write_engine)
+
+# Filled in by the lifespan; /readyz answers 503 until ready is set
+startup_state = {"ready": False, "warm_up_seconds": None}
+
+def _warm_caches():
+    with SessionLocal() as db:
+        crud.get_recommendation_index(db)
+        crud.get_pricing_engine(db)
+        crud.get_availability_index(db)
+        crud.get_geo_index(db)
+    precompile_templates(templates.env)
+
+async def warm_up():
+    """Connection pools, in-process indexes, slot caches and templates, loaded
+    before the worker takes traffic so its first request costs what later ones do."""
+    await asyncio.to_thread(warm_pool, engine)
+    if write_engine is not engine:
+        await asyncio.to_thread(warm_pool, write_engine, 1)
+    await warm_async_pool(async_engine)
+    await asyncio.to_thread(_warm_caches)
+    async with AsyncSessionLocal() as db:
+        await async_crud.get_slot_views(db)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    started = time.perf_counter()
+    if not launcher.PREPARED:
+        # Started directly (e.g. `uvicorn main:app`) rather than by launcher.py
+        await asyncio.to_thread(launcher.prepare_database)
+    broadcaster.bind(asyncio.get_running_loop())
+    if GROUP_COMMIT:
+        group_commit.booking_writer.start()
+    # Expired sessions are dropped in the background, never on the request path
+    sweeper = asyncio.create_task(run_sweeper(session_store))
+    if AUTO_EXPIRE:
+        # Ends bookings at their end_time; catches up on ones that ended while down
+        booking_scheduler.start(run_write, crud.apply_due_lifecycle, crud.get_lifecycle_deadlines)
+    sensor_ingestor.start(run_write, crud.apply_sensor_readings)
+    if change_feed.enabled:
+        # Before warm-up: writes from other workers after this point are replayed
+        change_feed.start(SessionLocal, crud.apply_logged_changes, crud.notify_inventory_changed)
+    await warm_up()
+    startup_state.update(ready=True, warm_up_seconds=round(time.perf_counter() - started, 3))
+    yield
+    # Fail readiness first so load balancers stop routing here while draining
+    startup_state["ready"] = False
+    await sensor_ingestor.stop()
+    await booking_scheduler.stop()
+    await change_feed.stop()
+    sweeper.cancel()
+    if GROUP_COMMIT:
+        group_commit.booking_writer.stop()
+    broadcaster.close()
+    if free_time_model.observed:
+        # Keep the stays learned while running for the next start, added to
+        # what the other workers learned
+        await asyncio.to_thread(free_time_model.save_observed, FREE_TIME_MODEL_PATH)
+    # Close pooled async connections (aiosqlite keeps a thread per connection)
+    await async_engine.dispose()
 
-models.Base.metadata.create_all(bind=engine)
+app = FastAPI(title="ParkWise", lifespan=lifespan, default_response_class=FastJSONResponse)
+if change_feed.enabled:
+    # Other workers' writes reach this worker's caches before the request reads them
+    app.add_middleware(change_log.CatchUpMiddleware)
+if metrics.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
 
-app = FastAPI(title="ParkWise")
+@app.exception_handler(WriteBusy)
+async def write_busy(request: Request, exc: WriteBusy):
+    # Too many writes waiting on the single write connection: shed, don't stall
+    return PlainTextResponse("Server busy, try again", status_code=503, headers={"Retry-After": "1"})
 
-app.mount("/static", StaticFiles(directory="static"), name="static")
+# Hashed, precompressed assets; templates link them with static_url('css/style.css')
+asset_bundle = AssetBundle.load(prefix="/static/")
+app.mount("/static", PrecompressedStaticFiles(directory="static", bundle=asset_bundle), name="static")
 templates = Jinja2Templates(directory="templates")
+templates.env.globals["static_url"] = asset_bundle.url
+metrics.instrument_templates(templates.env)
+# Templates are compiled during warm-up, from the on-disk bytecode cache when warm
+enable_bytecode_cache(templates.env)
 
 # ─────────────────────────────────────────
 #  Login / Auth Helpers
 # ─────────────────────────────────────────
 
+def _revalidate_headers(etag: str) -> dict:
+    # Pages carry the user's name, so only the browser may keep them
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
 def get_current_user(session_id: Optional[str] = Cookie(None)):
     if session_id:
         return get_session_user(session_id)
     return None
 
+# Admin endpoints are disabled unless PARKWISE_ADMIN_TOKEN is set; send it as X-Admin-Token.
+ADMIN_TOKEN = os.getenv("PARKWISE_ADMIN_TOKEN")
+
+def is_admin(x_admin_token: Optional[str]) -> bool:
+    return bool(ADMIN_TOKEN) and x_admin_token == ADMIN_TOKEN
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
 # ─────────────────────────────────────────
 #  Login Page
 # ─────────────────────────────────────────
@@ -50,7 +174,7 @@ def login(request: Request, email: str = Form(...), name: str = Form(...)):
     
     session_id = create_session(email)
     response = RedirectResponse(url="/vehicle-type", status_code=303)
-    response.set_cookie("session_id", session_id, max_age=86400)
+    response.set_cookie("session_id", session_id, max_age=SESSION_TTL, httponly=True, samesite="lax")
     return response
 
 # ─────────────────────────────────────────
@@ -113,13 +237,15 @@ def list_parking_form(request: Request, session_id: Optional[str] = Cookie(None)
 def create_parking_listing(
     request: Request,
     session_id: Optional[str] = Cookie(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_write_db),
     title: str = Form(...),
     location: str = Form(...),
     price_per_hour: float = Form(...),
     available_from: str = Form(...),
     available_to: str = Form(""),
     description: str = Form(""),
+    latitude: str = Form(""),
+    longitude: str = Form(""),
 ):
     user = get_session_user(session_id)
     if not user:
@@ -137,6 +263,13 @@ def create_parking_listing(
         except Exception:
             available_to_dt = None
     
+    try:
+        lat, lon = float(latitude), float(longitude)
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            raise ValueError
+    except ValueError:
+        lat = lon = None
+    
     # Create listing
     new_listing = models.UserListing(
         user_email=user.email,
@@ -146,10 +279,15 @@ def create_parking_listing(
         available_from=available_from_dt,
         available_to=available_to_dt,
         description=description,
+        latitude=lat,
+        longitude=lon,
     )
     db.add(new_listing)
+    db.flush()
+    change_log.record(db, change_log.LISTING, [new_listing.id])
     db.commit()
     db.refresh(new_listing)
+    crud.notify_listing_changed(new_listing)
     
     return RedirectResponse(url="/listing-success", status_code=303)
 
@@ -168,64 +306,78 @@ def listing_success(request: Request, session_id: Optional[str] = Cookie(None)):
 #  Slots Listing
 # ─────────────────────────────────────────
 @app.get("/find-parking", response_class=HTMLResponse)
-def find_parking(request: Request, session_id: Optional[str] = Cookie(None), db: Session = Depends(get_db)):
+async def find_parking(request: Request, session_id: Optional[str] = Cookie(None), db: AsyncSession = Depends(get_async_db)):
     user = get_session_user(session_id)
     if not user:
         return RedirectResponse(url="/", status_code=303)
     
-    # Auto-seed on first run
-    if db.query(models.ParkingSlot).count() == 0:
-        crud.seed_parking_slots(db)
-    
-    slots = crud.get_all_slots(db)
-    
-    # Calculate scores for all slots
-    slots_with_scores = []
-    for s in slots:
-        entry = {c.name: getattr(s, c.name) for c in s.__table__.columns}
-        entry["score"] = calculate_slot_score(s)
-        slots_with_scores.append(entry)
+    # Surge prices are on the page, so they are part of its version
+    pricing = await async_crud.get_pricing_engine(db)
+    version = inventory_version.current()
+    etag = make_etag(
+        "find-parking", version, score_bucket(), pricing.signature(), user.email, user.name, user.vehicle_type,
+    )
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
     
-    # Get top 3 recommendations (only available slots)
-    available_slots = [s for s in slots_with_scores if not s["is_occupied"]]
-    top_3 = sorted(available_slots, key=lambda x: x["score"], reverse=True)[:3]
+    # Top 3 recommendations (only available slots) from the incremental index
+    index = await async_crud.get_recommendation_index(db)
+    top_3 = index.top_k(3, vehicle_type=user.vehicle_type)
+    multipliers = pricing.multipliers()
+    top_prices = {s.id: pricing.price(s.zone, s.price_per_hour, multipliers) for s in top_3}
     
     # Get all available slots grouped by zone
-    all_available = available_slots
+    all_available = [s for s in await async_crud.get_slot_views(db) if not s["is_occupied"]]
     zones = sorted(set(s["zone"] for s in all_available))
     
     return templates.TemplateResponse("find-parking.html", {
         "request": request,
         "user": user,
         "top_recommendations": top_3,
+        "top_prices": top_prices,
         "all_available": all_available,
         "zones": zones,
-    })
+    }, headers=_revalidate_headers(etag))
 
 @app.get("/slots", response_class=HTMLResponse)
-def show_all_slots(request: Request, session_id: Optional[str] = Cookie(None), zone: Optional[str] = None, db: Session = Depends(get_db)):
+async def show_all_slots(request: Request, session_id: Optional[str] = Cookie(None), zone: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
     user = get_session_user(session_id)
     if not user:
         return RedirectResponse(url="/", status_code=303)
     
-    slots = crud.get_all_slots(db)
-    zones = sorted(set(s.zone for s in slots))
+    # The page body depends only on (zone, inventory version, score bucket);
+    # the user only appears in the navbar, so they are part of the ETag but
+    # not of the cached fragment.
+    pricing = (await async_crud.get_pricing_engine(db)).signature()
+    version, bucket = inventory_version.current(), score_bucket()
+    etag = make_etag("slots", version, bucket, pricing, zone, user.email, user.name)
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
 
-    slots_with_scores = []
-    for s in slots:
-        if zone and s.zone != zone:
-            continue
-        entry = {c.name: getattr(s, c.name) for c in s.__table__.columns}
-        entry["score"] = calculate_slot_score(s)
-        slots_with_scores.append(entry)
+    async def render_grid():
+        zones = await async_crud.get_cached_zones(db)
+        slots_with_scores = await async_crud.get_slot_views(db, zone=zone)
+        scores = score_slot_columns(
+            [s["zone"] for s in slots_with_scores],
+            [s["is_occupied"] for s in slots_with_scores],
+            [s["last_occupied_time"] for s in slots_with_scores],
+            now=datetime.utcnow(),
+            vehicle_types=[s["occupied_vehicle_type"] for s in slots_with_scores],
+        )
+        for entry, score in zip(slots_with_scores, scores.tolist()):
+            entry["score"] = score
+        return templates.get_template("slots-grid.html").render(
+            slots=slots_with_scores, zones=zones, active_zone=zone,
+        )
 
+    slots_grid = await slot_cache.get_or_load(
+        f"fragment:slots:{zone}:{version}:{bucket}:{pricing}", render_grid, stats_key="fragment:slots",
+    )
     return templates.TemplateResponse("slots.html", {
         "request": request,
         "user": user,
-        "slots": slots_with_scores,
-        "zones": zones,
-        "active_zone": zone,
-    })
+        "slots_grid": slots_grid,
+    }, headers=_revalidate_headers(etag))
 
 @app.get("/booking/{slot_id}", response_class=HTMLResponse)
 def booking_form(slot_id: int, request: Request, session_id: Optional[str] = Cookie(None), db: Session = Depends(get_db)):
@@ -234,26 +386,34 @@ def booking_form(slot_id: int, request: Request, session_id: Optional[str] = Coo
         return RedirectResponse(url="/", status_code=303)
     
     slot = crud.get_slot_by_id(db, slot_id)
+    quote = None
+    if slot:
+        # The rate shown here is held for the booking POST
+        price = crud.get_pricing_engine(db).price(slot.zone, slot.price_per_hour)
+        quote = quote_book.quote(slot.id, user.email, price)
     now_str = datetime.utcnow().strftime("%Y-%m-%dT%H:%M")
     return templates.TemplateResponse("booking.html", {
         "request": request,
         "user": user,
         "slot": slot,
+        "quote": quote,
+        "quote_minutes": quote_book.ttl // 60,
         "now_str": now_str,
     })
 
 @app.post("/booking/{slot_id}", response_class=HTMLResponse)
-def confirm_booking(
+async def confirm_booking(
     slot_id: int,
     request: Request,
     session_id: Optional[str] = Cookie(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_name: str = Form(...),
     phone_number: str = Form(""),
     vehicle_type: str = Form("Car"),
     vehicle_number: str = Form(""),
     start_time: str = Form(...),
     end_time: str = Form(""),
+    quote_id: str = Form(""),
 ):
     user = get_session_user(session_id)
     if not user:
@@ -274,14 +434,19 @@ def confirm_booking(
 
     booking_data = BookingCreate(
         slot_id=slot_id,
+        user_email=user.email,
         user_name=user_name,
         phone_number=phone_number or None,
         vehicle_type=vehicle_type or None,
         vehicle_number=vehicle_number or None,
         start_time=start_dt,
         end_time=end_dt,
+        price_per_hour=quote_book.redeem(quote_id, slot_id, user.email),
     )
-    booking = crud.create_booking(db, booking_data)
+    booking = await async_crud.create_booking(db, booking_data)
+    if not booking:
+        # Slot was taken (or never existed); the form page shows it as unavailable
+        return RedirectResponse(url=f"/booking/{slot_id}", status_code=303)
     return RedirectResponse(url=f"/booking/confirm/{booking.id}", status_code=303)
 
 @app.get("/booking/confirm/{booking_id}", response_class=HTMLResponse)
@@ -291,6 +456,8 @@ def booking_confirmation(booking_id: int, request: Request, session_id: Optional
         return RedirectResponse(url="/", status_code=303)
     
     booking = crud.get_booking_by_id(db, booking_id)
+    if booking and booking.user_email and booking.user_email != user.email:
+        booking = None  # someone else's booking: show it as not found
     return templates.TemplateResponse("confirmation.html", {
         "request": request,
         "user": user,
@@ -298,52 +465,378 @@ def booking_confirmation(booking_id: int, request: Request, session_id: Optional
     })
 
 @app.post("/end-booking/{booking_id}")
-def end_booking(booking_id: int, db: Session = Depends(get_db)):
-    booking = crud.end_booking(db, booking_id)
+async def end_booking(booking_id: int, db: AsyncSession = Depends(get_async_db)):
+    booking = await async_crud.end_booking(db, booking_id)
     if booking:
         return {"status": "success", "booking_id": booking.id, "total_cost": booking.total_cost}
     return {"status": "error", "message": "Booking not found"}
 
 @app.get("/history", response_class=HTMLResponse)
-def booking_history(request: Request, session_id: Optional[str] = Cookie(None), db: Session = Depends(get_db)):
+def booking_history(
+    request: Request,
+    before: Optional[str] = None,
+    session_id: Optional[str] = Cookie(None),
+    db: Session = Depends(get_db),
+):
     user = get_session_user(session_id)
     if not user:
         return RedirectResponse(url="/", status_code=303)
     
-    bookings = crud.get_booking_history(db)
+    try:
+        cursor = crud.decode_booking_cursor(before) if before else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    # Two queries whatever the history length: the summary row and one joined page
+    bookings = crud.get_user_booking_history(db, user.email, cursor)
+    next_cursor = None
+    if len(bookings) == crud.HISTORY_PAGE_SIZE:
+        next_cursor = crud.encode_booking_cursor(bookings[-1].start_time, bookings[-1].id)
     return templates.TemplateResponse("history.html", {
         "request": request,
         "user": user,
         "bookings": bookings,
+        "summary": crud.get_booking_summary(db, user.email),
+        "next_cursor": next_cursor,
+        "first_page": cursor is None,
     })
 
 @app.get("/logout", response_class=HTMLResponse)
-def logout():
+def logout(session_id: Optional[str] = Cookie(None)):
+    end_session(session_id)
     response = RedirectResponse(url="/", status_code=303)
     response.delete_cookie("session_id")
     return response
 
 # ─────────────────────────────────────────
-#  Seed Data (also auto-runs on /)
+#  Seed Data (also runs once at startup)
 # ─────────────────────────────────────────
 @app.get("/seed", response_class=HTMLResponse)
-def seed_data(request: Request, db: Session = Depends(get_db)):
+def seed_data(request: Request, db: Session = Depends(get_write_db)):
     count = crud.seed_parking_slots(db)
     return RedirectResponse(url=f"/?seeded={count}", status_code=303)
 
+# ─────────────────────────────────────────
+#  Health checks
+# ─────────────────────────────────────────
+@app.get("/healthz")
+async def healthz():
+    # Liveness: the process is up and its event loop is responsive
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz(db: AsyncSession = Depends(get_async_db)):
+    """Readiness: warm-up has finished and the database answers."""
+    if not startup_state["ready"]:
+        raise HTTPException(status_code=503, detail="Starting up")
+    try:
+        await db.execute(select(1))
+    except SQLAlchemyError:
+        raise HTTPException(status_code=503, detail="Database unavailable")
+    return {"status": "ready", "pid": os.getpid(), "warm_up_seconds": startup_state["warm_up_seconds"]}
+
 # ─────────────────────────────────────────
 #  JSON API
 # ─────────────────────────────────────────
+API_MAX_PAGE_SIZE = 1000
+
 @app.get("/api/slots")
-def api_slots(db: Session = Depends(get_db)):
-    slots = crud.get_all_slots(db)
-    return [
+async def api_slots(
+    request: Request,
+    after: int = 0,
+    limit: Optional[int] = Query(None, ge=1, le=API_MAX_PAGE_SIZE),
+    format: str = "json",
+    db: AsyncSession = Depends(get_async_db),
+):
+    # ?format=ndjson streams the whole inventory with flat memory use;
+    # otherwise ?limit= pages by id, with the next ?after= in X-Next-Cursor.
+    if format == "ndjson":
+        return StreamingResponse(
+            async_crud.stream_ndjson(async_crud.slot_rows_query(after)),
+            media_type="application/x-ndjson",
+        )
+    if not after and not limit:
+        # Full inventory: served from the slot cache, revalidated by inventory version and prices
+        pricing = await async_crud.get_pricing_engine(db)
+        etag = make_etag("api-slots", inventory_version.current(), pricing.signature())
+        if is_not_modified(request, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        body = await async_crud.get_slot_inventory_body(db)
+        return Response(body, media_type="application/json", headers=_revalidate_headers(etag))
+    rows = await async_crud.get_rows(db, async_crud.slot_rows_query(after, limit))
+    headers = {"X-Next-Cursor": str(rows[-1]["id"])} if limit and len(rows) == limit else None
+    return FastJSONResponse(rows, headers=headers)
+
+@app.post("/api/slots/{slot_id}/quote")
+async def api_quote(slot_id: int, session_id: Optional[str] = Cookie(None), db: AsyncSession = Depends(get_async_db)):
+    # Current surge price, held for QUOTE_TTL for the session user; pass quote_id when booking
+    user = get_session_user(session_id)
+    if not user:
+        raise HTTPException(status_code=401, detail="Login required")
+    catalog = await async_crud.get_slot_catalog(db)
+    slot = next((s for s in catalog["all"] if s["id"] == slot_id), None)
+    if slot is None:
+        raise HTTPException(status_code=404, detail="Slot not found")
+    pricing = await async_crud.get_pricing_engine(db)
+    return quote_book.quote(slot_id, user.email, pricing.price(slot["zone"], slot["price_per_hour"])).as_dict()
+
+@app.get("/api/pricing")
+async def api_pricing(db: AsyncSession = Depends(get_async_db)):
+    pricing = await async_crud.get_pricing_engine(db)
+    occupancy = pricing.occupancy()
+    multipliers = pricing.multipliers()
+    return {
+        zone: {"occupied": occupied, "total": total, "multiplier": multipliers.get(zone, 1.0)}
+        for zone, (occupied, total) in sorted(occupancy.items())
+    }
+
+@app.get("/api/slots/events")
+async def slot_events(zone: Optional[str] = None):
+    # Server-Sent Events: one "slot" event per occupancy change, optionally per zone
+    sub = broadcaster.subscribe(zone)
+    return StreamingResponse(
+        broadcaster.stream(sub),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics(request: Request, x_admin_token: Optional[str] = Header(None)):
+    if not metrics.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled (PARKWISE_METRICS=0)")
+    client = request.client.host if request.client else None
+    if client not in metrics.METRICS_ALLOW:
+        require_admin(x_admin_token)
+    return PlainTextResponse(metrics.render_metrics(), media_type="text/plain; version=0.0.4")
+
+@app.get("/api/cache/stats", dependencies=[Depends(require_admin)])
+def cache_stats():
+    stats = {"keys": slot_cache.stats()}
+    if hasattr(slot_cache.backend, "evictions"):
+        stats["evictions"] = slot_cache.backend.evictions
+    return stats
+
+@app.get("/api/availability")
+async def api_availability(
+    start: datetime,
+    end: Optional[datetime] = None,
+    zone: Optional[str] = None,
+    vehicle_type: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    # Slots and user listings free for the whole of [start, end); no end = open-ended
+    start, end = as_naive_utc(start), as_naive_utc(end)
+    if end is not None and end <= start:
+        raise HTTPException(status_code=400, detail="end must be after start")
+    slots = await async_crud.get_free_slots(db, start, end, zone, vehicle_type)
+    listings = await async_crud.get_listings_available(db, start, end)
+    return FastJSONResponse({
+        "start": start,
+        "end": end,
+        "slots": [
+            {key: s[key] for key in ("id", "slot_number", "zone", "price_per_hour", "vehicle_types")}
+            for s in slots
+        ],
+        "listings": [
+            {
+                "id": l.id, "title": l.title, "location": l.location, "price_per_hour": l.price_per_hour,
+                "available_from": l.available_from, "available_to": l.available_to,
+            }
+            for l in listings
+        ],
+    })
+
+@app.get("/api/slots/{slot_id}/free-windows")
+async def api_free_windows(
+    slot_id: int,
+    start: datetime,
+    end: datetime,
+    min_minutes: float = Query(0, ge=0),
+    db: AsyncSession = Depends(get_async_db),
+):
+    start, end = as_naive_utc(start), as_naive_utc(end)
+    if end <= start:
+        raise HTTPException(status_code=400, detail="end must be after start")
+    index = await async_crud.get_availability_index(db)
+    return FastJSONResponse([{"start": a, "end": b} for a, b in index.free_windows(slot_id, start, end, min_minutes)])
+
+@app.get("/api/nearby")
+async def api_nearby(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    k: int = Query(10, ge=1, le=100),
+    vehicle_type: Optional[str] = None,
+    max_km: Optional[float] = Query(None, gt=0),
+    include_occupied: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+):
+    # Garage slots and peer listings, best first by slot score minus distance penalty
+    index = await async_crud.get_geo_index(db)
+    results = nearby_parking(index, lat, lon, k, vehicle_type, not include_occupied, max_km)
+    return FastJSONResponse([
         {
-            "id": s.id,
-            "slot_number": s.slot_number,
-            "zone": s.zone,
-            "is_occupied": s.is_occupied,
-            "price_per_hour": s.price_per_hour,
+            "kind": e.kind, "id": e.id, "label": e.label, "zone": e.zone,
+            "price_per_hour": e.price_per_hour, "is_occupied": e.is_occupied,
+            "lat": e.lat, "lon": e.lon, "distance_km": round(km, 3), "score": round(score), "rank": round(rank, 2),
         }
-        for s in slots
-    ]
+        for rank, km, score, e in results
+    ])
+
+@app.get("/api/bookings")
+async def api_bookings(
+    before: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=API_MAX_PAGE_SIZE),
+    format: str = "json",
+    session_id: Optional[str] = Cookie(None),
+    x_admin_token: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    # The session user's own bookings; every user's with the admin token
+    user_email = None
+    if not is_admin(x_admin_token):
+        user = get_session_user(session_id)
+        if not user:
+            raise HTTPException(status_code=401, detail="Login required")
+        user_email = user.email
+    try:
+        cursor = async_crud.decode_booking_cursor(before) if before else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if format == "ndjson":
+        return StreamingResponse(
+            async_crud.stream_ndjson(async_crud.booking_rows_query(cursor, user_email=user_email)),
+            media_type="application/x-ndjson",
+        )
+    rows = await async_crud.get_rows(db, async_crud.booking_rows_query(cursor, limit, user_email))
+    headers = {"X-Next-Cursor": async_crud.encode_booking_cursor(rows[-1])} if len(rows) == limit else None
+    return FastJSONResponse(rows, headers=headers)
+
+# ─────────────────────────────────────────
+#  Admin: bulk import / export
+# ─────────────────────────────────────────
+UPLOAD_SPOOL_BYTES = 8 * 1024 * 1024
+
+def _run_import(kind: str, upload, fmt: str, strict: bool) -> bulk_io.ImportResult:
+    with WriteSessionLocal() as db:
+        stream = io.TextIOWrapper(upload, encoding="utf-8", newline="")
+        try:
+            return bulk_io.import_file(db, kind, stream, fmt, strict=strict)
+        finally:
+            stream.detach()
+
+@app.post("/admin/import/{kind}", dependencies=[Depends(require_admin)])
+async def admin_import(request: Request, kind: str, format: str = "csv", strict: bool = False):
+    # Raw CSV/JSONL request body, e.g. curl --data-binary @slots.csv
+    if kind not in bulk_io.IMPORTERS:
+        raise HTTPException(status_code=404, detail=f"Unknown import kind: {kind}")
+    if format not in bulk_io.FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {format}")
+    with tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_BYTES) as upload:
+        async for chunk in request.stream():
+            upload.write(chunk)
+        upload.seek(0)
+        try:
+            result = await asyncio.to_thread(_run_import, kind, upload, format, strict)
+        except (ValueError, UnicodeDecodeError) as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+    return result.as_dict()
+
+@app.get("/admin/export/bookings", dependencies=[Depends(require_admin)])
+async def admin_export_bookings(
+    format: str = "csv",
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+):
+    if format not in bulk_io.FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {format}")
+    query = bulk_io.bookings_export_query(as_naive_utc(since), as_naive_utc(until))
+    return StreamingResponse(
+        async_crud.stream_export(query, format),
+        media_type="text/csv" if format == "csv" else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="bookings.{format}"'},
+    )
+
+# ─────────────────────────────────────────
+#  Bay sensors
+# ─────────────────────────────────────────
+
+SENSOR_TOKEN = os.getenv("PARKWISE_SENSOR_TOKEN")
+
+def require_sensor(x_sensor_token: Optional[str] = Header(None)):
+    if not SENSOR_TOKEN or x_sensor_token != SENSOR_TOKEN:
+        raise HTTPException(status_code=403, detail="Sensor token required")
+
+@app.post("/api/sensors/events", status_code=202, dependencies=[Depends(require_sensor)])
+async def ingest_sensor_events(request: Request):
+    # JSON array of readings, or packed binary records (application/octet-stream)
+    body = await request.body()
+    try:
+        if request.headers.get("content-type", "").startswith("application/octet-stream"):
+            events = sensor_ingest.decode_frames(body)
+        else:
+            events = sensor_ingest.decode_json(body)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if len(events) > sensor_ingest.MAX_REQUEST_EVENTS:
+        raise HTTPException(status_code=413, detail=f"At most {sensor_ingest.MAX_REQUEST_EVENTS} readings per request")
+    if not sensor_ingestor.offer(events):
+        raise HTTPException(status_code=429, detail="Sensor queue full", headers={"Retry-After": "1"})
+    return {"accepted": len(events), "pending": sensor_ingestor.pending}
+
+# ─────────────────────────────────────────
+#  Analytics dashboards (admin)
+# ─────────────────────────────────────────
+
+def _report_range(start: Optional[datetime], end: Optional[datetime], by: str, default: timedelta):
+    end = as_naive_utc(end) or analytics.hour_of(datetime.utcnow()) + analytics.HOUR
+    start = as_naive_utc(start) or end - default
+    if not start < end or end - start > analytics.PERIODS[by] * analytics.MAX_REPORT_PERIODS:
+        raise HTTPException(
+            status_code=400, detail=f"start must be before end, at most {analytics.MAX_REPORT_PERIODS} {by}s apart",
+        )
+    return start, end
+
+@app.get("/api/analytics/occupancy", dependencies=[Depends(require_admin)])
+async def analytics_occupancy(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    zone: Optional[str] = None,
+    by: str = Query("hour", pattern="^(hour|day)$"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    # Defaults: the last 24 hours by hour, the last 30 days by day
+    start, end = _report_range(start, end, by, timedelta(hours=24) if by == "hour" else timedelta(days=30))
+    return {
+        "start": start.isoformat(), "end": end.isoformat(), "by": by,
+        "rows": await async_crud.get_rollup_report(db, start, end, zone, by),
+    }
+
+@app.get("/api/analytics/revenue", dependencies=[Depends(require_admin)])
+async def analytics_revenue(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    zone: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    start, end = _report_range(start, end, "day", timedelta(days=30))
+    days = {}
+    for row in await async_crud.get_rollup_report(db, start, end, zone, by="day"):
+        day = days.setdefault(row["period"][:10], {"day": row["period"][:10], "bookings": 0, "revenue": 0.0, "zones": {}})
+        day["bookings"] += row["bookings"]
+        day["revenue"] = round(day["revenue"] + row["revenue"], 2)
+        day["zones"][row["zone"]] = row["revenue"]
+    return {
+        "start": start.isoformat(), "end": end.isoformat(),
+        "total": round(sum(day["revenue"] for day in days.values()), 2),
+        "days": list(days.values()),
+    }
+
+def _rebuild_rollups():
+    # Not the write engine: the long history read must not hold the write
+    # lock; its one write transaction starts with the DELETE
+    with SessionLocal() as db:
+        return analytics.rebuild_rollups(db)
+
+@app.post("/admin/analytics/rebuild", dependencies=[Depends(require_admin)])
+async def admin_rebuild_rollups():
+    # Backfill from existing history, e.g. once after upgrading
+    return await asyncio.to_thread(_rebuild_rollups)
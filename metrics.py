@@ -0,0 +1,317 @@
+import bisect
+import logging
+import os
+import re
+import threading
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+import jinja2
+from sqlalchemy import event
+
+# Off: no middleware, no SQL hooks, timed() returns the function unchanged.
+METRICS_ENABLED = os.getenv("PARKWISE_METRICS", "1") == "1"
+# Debugging only: requests sent with "X-Profile: 1" get a Server-Timing
+# breakdown header back. Off, the header is never sent.
+PROFILE_HEADER = os.getenv("PARKWISE_PROFILE_HEADER", "0") == "1"
+# /metrics needs the admin token, except from these client addresses
+# (comma-separated, e.g. the Prometheus host's).
+METRICS_ALLOW = frozenset(
+    address.strip() for address in os.getenv("PARKWISE_METRICS_ALLOW", "").split(",") if address.strip()
+)
+# The same SELECT this many times in one request is reported as an N+1 pattern.
+N_PLUS_ONE_THRESHOLD = int(os.getenv("PARKWISE_N_PLUS_ONE_THRESHOLD", "5"))
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0)
+
+log = logging.getLogger("parkwise.metrics")
+
+
+# ─────────────────────────────────────────
+#  Metric types (Prometheus text format)
+# ─────────────────────────────────────────
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels=()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        lines.extend(f"{self.name}{_labels(self.label_names, key)} {value}" for key, value in items)
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram; observe() is one bisect and three adds."""
+
+    def __init__(self, name: str, help: str, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, *labels):
+        i = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][i] += 1
+            series[1] += seconds
+            series[2] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((key, [list(s[0]), s[1], s[2]]) for key, s in self._series.items())
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {total}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, key)} {count}")
+        return lines
+
+
+REQUEST_SECONDS = Histogram(
+    "parkwise_http_request_duration_seconds", "Request latency by route template.",
+    labels=("method", "route", "status"),
+)
+QUERY_SECONDS = Histogram(
+    "parkwise_db_query_duration_seconds", "SQL statement latency by kind and main table.",
+    labels=("operation", "table"), buckets=QUERY_BUCKETS,
+)
+REQUEST_QUERIES = Histogram(
+    "parkwise_db_queries_per_request", "SQL statements executed per request.",
+    labels=("route",), buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 500),
+)
+N_PLUS_ONE = Counter(
+    "parkwise_db_repeated_queries_total",
+    f"Requests that ran the same SELECT at least {N_PLUS_ONE_THRESHOLD} times (likely N+1 lazy loads).",
+    labels=("route", "table"),
+)
+SECTION_SECONDS = Histogram(
+    "parkwise_section_duration_seconds", "Time spent in instrumented code (scoring functions).",
+    labels=("section",),
+)
+RENDER_SECONDS = Histogram(
+    "parkwise_template_render_seconds", "Jinja2 render time by template.",
+    labels=("template",),
+)
+
+REGISTRY = [REQUEST_SECONDS, QUERY_SECONDS, REQUEST_QUERIES, N_PLUS_ONE, SECTION_SECONDS, RENDER_SECONDS]
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ─────────────────────────────────────────
+#  Per-request accounting
+# ─────────────────────────────────────────
+
+class RequestStats:
+    """What one request spent its time on. Lives in a ContextVar, so it is seen
+    from the threadpool (sync routes) and from run_sync greenlets alike."""
+
+    __slots__ = ("queries", "query_seconds", "statements", "sections", "render_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.statements = {}  # SELECT text -> times run
+        self.sections = {}
+        self.render_seconds = 0.0
+
+    def repeated(self):
+        return [(sql, n) for sql, n in self.statements.items() if n >= N_PLUS_ONE_THRESHOLD]
+
+
+_current = ContextVar("parkwise_request_stats", default=None)
+
+_TABLE = re.compile(r"\b(?:FROM|INTO|UPDATE)\s+\"?(\w+)", re.IGNORECASE)
+
+
+def _table(statement: str) -> str:
+    match = _TABLE.search(statement)
+    return match.group(1) if match else ""
+
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["metrics_started"].pop()
+    operation = statement.lstrip()[:6].upper()
+    QUERY_SECONDS.observe(elapsed, operation, _table(statement))
+    stats = _current.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.query_seconds += elapsed
+        if operation == "SELECT":
+            stats.statements[statement] = stats.statements.get(statement, 0) + 1
+
+
+def _on_error(context):
+    # A failed statement never reaches after_cursor_execute
+    started = context.connection.info.get("metrics_started") if context.connection is not None else None
+    if started:
+        started.pop()
+
+
+def instrument_engine(engine):
+    """Time every statement run through engine (sync or async)."""
+    if not METRICS_ENABLED:
+        return
+    target = getattr(engine, "sync_engine", engine)
+    event.listen(target, "before_cursor_execute", _before_execute)
+    event.listen(target, "after_cursor_execute", _after_execute)
+    event.listen(target, "handle_error", _on_error)
+
+
+def timed(section: str):
+    """Decorator recording a function's duration under section."""
+    def decorate(fn):
+        if not METRICS_ENABLED:
+            return fn
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started
+                SECTION_SECONDS.observe(elapsed, section)
+                stats = _current.get()
+                if stats is not None:
+                    stats.sections[section] = stats.sections.get(section, 0.0) + elapsed
+        return wrapper
+    return decorate
+
+
+class TimedTemplate(jinja2.Template):
+    """Template class for an Environment; records render time per template."""
+
+    def render(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super().render(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            RENDER_SECONDS.observe(elapsed, self.name or "<string>")
+            stats = _current.get()
+            if stats is not None:
+                stats.render_seconds += elapsed
+
+
+def instrument_templates(env: jinja2.Environment):
+    if METRICS_ENABLED:
+        env.template_class = TimedTemplate
+
+
+# ─────────────────────────────────────────
+#  ASGI middleware
+# ─────────────────────────────────────────
+
+def server_timing(stats: RequestStats, total: float) -> str:
+    parts = [
+        f'db;dur={stats.query_seconds * 1000:.2f};desc="{stats.queries} queries"',
+        f"render;dur={stats.render_seconds * 1000:.2f}",
+    ]
+    parts.extend(f"{name};dur={seconds * 1000:.2f}" for name, seconds in stats.sections.items())
+    repeated = stats.repeated()
+    if repeated:
+        desc = ", ".join(f"{_table(sql)} x{n}" for sql, n in repeated)
+        parts.append(f'n-plus-one;desc="{desc}"')
+    parts.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(parts)
+
+
+class MetricsMiddleware:
+    """Per-route latency, queries per request and N+1 detection for HTTP requests.
+
+    Routes are labelled by their path template ("/booking/{slot_id}"), so
+    label cardinality stays at the number of routes.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._routes = None
+        self._reported = set()
+
+    def _route_label(self, scope) -> str:
+        if self._routes is None:
+            self._routes = {}
+            for route in getattr(scope.get("app"), "routes", ()):
+                endpoint = getattr(route, "endpoint", None)
+                if endpoint is not None:
+                    self._routes[endpoint] = route.path
+                elif hasattr(route, "app"):
+                    self._routes[route.app] = route.path  # mounts: the endpoint is the sub-app
+        return self._routes.get(scope.get("endpoint"), "unmatched")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        stats = RequestStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        status = 500
+        profile = PROFILE_HEADER and any(
+            name == b"x-profile" and value == b"1" for name, value in scope["headers"]
+        )
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if profile:
+                    header = server_timing(stats, time.perf_counter() - started).encode()
+                    message["headers"] = list(message.get("headers", [])) + [(b"server-timing", header)]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            route = self._route_label(scope)
+            REQUEST_SECONDS.observe(time.perf_counter() - started, scope["method"], route, str(status))
+            REQUEST_QUERIES.observe(stats.queries, route)
+            for sql, count in stats.repeated():
+                table = _table(sql)
+                N_PLUS_ONE.inc(route, table)
+                if (route, sql) not in self._reported:
+                    self._reported.add((route, sql))
+                    log.warning("%s ran the same query %d times (N+1?): %s", route, count, " ".join(sql.split()))
@@ -0,0 +1,30 @@
+from sqlalchemy import inspect
+from sqlalchemy.schema import CreateColumn
+from database import Base
+import models  # noqa: F401  registers the tables on Base.metadata
+
+# Indexes older databases still carry but a wider index now covers
+RETIRED_INDEXES = (
+    "ix_bookings_slot_id",  # prefix of ix_bookings_slot_id_status_start_time
+)
+
+def apply_migrations(engine):
+    """Bring an existing database up to the current models.
+
+    create_all only creates missing tables, so nullable columns and indexes
+    added to models after a database file was created are added here, and
+    RETIRED_INDEXES dropped.
+    """
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing and column.nullable:
+                    ddl = CreateColumn(column).compile(dialect=conn.dialect)
+                    conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {ddl}")
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+        for name in RETIRED_INDEXES:
+            conn.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
@@ -1,46 +1,27 @@
-from datetime import datetime
+from session_store import session_store
 
-# In-memory mock storage
-mock_users = {}
-mock_sessions = {}
-
-class MockUser:
-    def __init__(self, name, email, vehicle_type=None):
-        self.id = len(mock_users) + 1
-        self.name = name
-        self.email = email
-        self.vehicle_type = vehicle_type
-        self.created_at = datetime.utcnow()
+# Thin facade over session_store (memory or SQLite, see PARKWISE_SESSION_STORE)
 
 def create_mock_user(name, email):
-    user = MockUser(name, email)
-    mock_users[email] = user
-    return user
+    return session_store.create_user(name, email)
 
 def authenticate_user(email, password="mock"):
-    if email in mock_users:
-        return mock_users[email]
-    return None
+    return session_store.get_user(email)
 
 def get_user_by_email(email):
-    return mock_users.get(email)
+    return session_store.get_user(email)
 
 def update_user_vehicle(email, vehicle_type):
-    if email in mock_users:
-        mock_users[email].vehicle_type = vehicle_type
-        return mock_users[email]
-    return None
+    return session_store.update_user_vehicle(email, vehicle_type)
 
 def create_session(email):
-    session_id = f"sess_{len(mock_sessions) + 1}_{email}"
-    mock_sessions[session_id] = {
-        "email": email,
-        "created_at": datetime.utcnow()
-    }
-    return session_id
+    return session_store.create_session(email)
 
 def get_session_user(session_id):
-    if session_id in mock_sessions:
-        email = mock_sessions[session_id]["email"]
-        return get_user_by_email(email)
-    return None
+    if not session_id:
+        return None
+    return session_store.get_session_user(session_id)
+
+def end_session(session_id):
+    if session_id:
+        session_store.delete_session(session_id)
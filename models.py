@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Float, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from database import Base
@@ -13,25 +13,74 @@ class ParkingSlot(Base):
     price_per_hour = Column(Float, default=50.0)
     vehicle_types = Column(String, default="Car,Bike,SUV")  # comma-separated
     last_occupied_time = Column(DateTime, nullable=True)
+    occupied_vehicle_type = Column(String, nullable=True)  # of the current booking
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     bookings = relationship("Booking", back_populates="slot")
+    
+    __table_args__ = (
+        Index("ix_parking_slots_zone_is_occupied", "zone", "is_occupied"),
+        Index("ix_parking_slots_is_occupied", "is_occupied"),
+    )
 
 class Booking(Base):
     __tablename__ = "bookings"
     
     id = Column(Integer, primary_key=True, index=True)
     slot_id = Column(Integer, ForeignKey("parking_slots.id"))
+    user_email = Column(String, nullable=True)  # the logged-in user who booked
     user_name = Column(String)
     phone_number = Column(String, nullable=True)
     vehicle_type = Column(String, nullable=True)
     vehicle_number = Column(String, nullable=True)
-    start_time = Column(DateTime)
+    start_time = Column(DateTime, index=True)
     end_time = Column(DateTime, nullable=True)
     total_cost = Column(Float, nullable=True)
-    status = Column(String, default="active")  # active | completed
+    price_per_hour = Column(Float, nullable=True)  # rate charged; None = the slot's static price
+    status = Column(String, default="active")  # active | completed | cancelled
+    auto_expired = Column(Boolean, nullable=True)  # completed by the scheduler at the booked end_time
     
     slot = relationship("ParkingSlot", back_populates="bookings")
+    
+    __table_args__ = (
+        Index("ix_bookings_status_start_time", "status", "start_time"),
+        # Auto-expiry: active bookings past their end_time
+        Index("ix_bookings_status_end_time", "status", "end_time"),
+        # Overlap checks: equality on slot and status, range on start_time
+        Index("ix_bookings_slot_id_status_start_time", "slot_id", "status", "start_time"),
+        # Per-user history, newest first, keyset-paginated on (start_time, id)
+        Index("ix_bookings_user_email_start_time_id", "user_email", "start_time", "id"),
+    )
+
+class UserBookingSummary(Base):
+    """Per-user booking totals, kept up to date in the same transaction as
+    every booking write so the history page never aggregates."""
+    __tablename__ = "user_booking_summaries"
+    
+    user_email = Column(String, primary_key=True)
+    booking_count = Column(Integer, default=0, nullable=False)
+    active_count = Column(Integer, default=0, nullable=False)
+    total_spend = Column(Float, default=0.0, nullable=False)  # completed bookings
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+class ZoneHourRollup(Base):
+    """Per zone and hour: bookings started, minutes occupied and revenue of
+    completed stays (spread over the hours they covered). Kept up to date in
+    the booking write transactions; analytics.rebuild_rollups rebuilds it."""
+    __tablename__ = "zone_hour_rollups"
+    
+    zone = Column(String, primary_key=True)
+    hour = Column(DateTime, primary_key=True)  # start of the UTC hour
+    booking_count = Column(Integer, default=0, nullable=False)
+    occupied_minutes = Column(Float, default=0.0, nullable=False)
+    revenue = Column(Float, default=0.0, nullable=False)
+    
+    __table_args__ = (
+        # All-zone dashboards: range on hour alone
+        Index("ix_zone_hour_rollups_hour", "hour"),
+    )
 
 class UserListing(Base):
     __tablename__ = "user_listings"
@@ -46,4 +95,23 @@ class UserListing(Base):
     description = Column(String, nullable=True)
     image_url = Column(String, nullable=True)
     is_available = Column(Boolean, default=True)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        Index("ix_user_listings_is_available_available_from", "is_available", "available_from"),
+    )
+
+class ChangeLogEntry(Base):
+    """One committed write, logged in the write's own transaction when several
+    workers share the database; change_log.ChangeFeed replays the other
+    workers' entries against each worker's caches and indexes."""
+    __tablename__ = "change_log"
+    
+    seq = Column(Integer, primary_key=True)  # commit order; never reused
+    kind = Column(String, nullable=False)  # slot | booking | new_booking | listing | catalog
+    ref_id = Column(Integer, nullable=True)  # the slot, booking or listing id; None for catalog
+    writer = Column(String, nullable=False)  # change_log.WRITER_ID of the writing process
+    
+    __table_args__ = {"sqlite_autoincrement": True}
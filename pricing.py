@@ -0,0 +1,197 @@
+import base64
+import hashlib
+import hmac
+import math
+import os
+import secrets
+import threading
+import time
+
+import numpy as np
+
+# PARKWISE_DYNAMIC_PRICING=0 charges every slot its static price_per_hour.
+DYNAMIC_PRICING = os.getenv("PARKWISE_DYNAMIC_PRICING", "1") == "1"
+SURGE_THRESHOLD = 0.6  # projected zone utilization where surge pricing starts
+MAX_SURGE = 2.0  # multiplier at a projected utilization of 100%
+PRICE_STEP = 0.05  # multipliers move in steps, so prices (and cached pages) are stable
+DEMAND_HALF_LIFE_MINUTES = 15.0
+LOOKAHEAD_MINUTES = 30.0  # how far ahead the arrival rate is projected
+QUOTE_TTL = int(os.getenv("PARKWISE_QUOTE_TTL", "300"))
+# Signs quote ids. Workers must share it (launcher.py sets one for the
+# workers it starts); unset, each process picks its own.
+QUOTE_SECRET = os.getenv("PARKWISE_QUOTE_SECRET") or secrets.token_hex(32)
+
+
+class PricingEngine:
+    """Surge multipliers per zone from live occupancy and recent demand.
+
+    Keeps {slot_id: (zone, is_occupied)} plus per-zone occupied/total counts,
+    updated from crud's write hooks, so pricing never counts rows. Demand is
+    an exponentially decayed rate of new bookings per zone; the forecast
+    utilization is (occupied + rate * LOOKAHEAD_MINUTES) / total, and the
+    multiplier rises linearly from 1 at SURGE_THRESHOLD to MAX_SURGE at 100%.
+    """
+
+    def __init__(self, enabled: bool = DYNAMIC_PRICING):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._decay = math.log(2) / (DEMAND_HALF_LIFE_MINUTES * 60)
+        self._reset()
+
+    def _reset(self):
+        self._slots = {}
+        self._occupied = {}
+        self._total = {}
+        self._demand = {}  # zone -> (arrivals per minute, as of monotonic time)
+        self.loaded = False
+
+    # ── building ──────────────────────────
+
+    def load(self, rows):
+        """rows: (slot_id, zone, is_occupied) for every slot."""
+        with self._lock:
+            self._reset()
+            for slot_id, zone, is_occupied in rows:
+                self._set(slot_id, zone, bool(is_occupied))
+            self.loaded = True
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+
+    def _set(self, slot_id, zone, is_occupied):
+        old = self._slots.get(slot_id)
+        if old is not None:
+            old_zone, old_occupied = old
+            self._total[old_zone] -= 1
+            self._occupied[old_zone] -= old_occupied
+        self._slots[slot_id] = (zone, is_occupied)
+        self._total[zone] = self._total.get(zone, 0) + 1
+        self._occupied[zone] = self._occupied.get(zone, 0) + is_occupied
+
+    # ── write hooks (called from crud) ────
+
+    def update_slot(self, slot_id: int, zone: str, is_occupied: bool):
+        if not self.loaded:
+            return
+        with self._lock:
+            self._set(slot_id, zone, bool(is_occupied))
+
+    def record_arrival(self, slot_id: int, now: float = None):
+        """A booking was made on slot_id: one more arrival in its zone."""
+        if not self.loaded:
+            return
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            entry = self._slots.get(slot_id)
+            if entry is None:
+                return
+            zone = entry[0]
+            rate = self._rate(zone, now)
+            # Exponentially weighted: a steady r arrivals/minute converges to r
+            self._demand[zone] = (rate + self._decay * 60, now)
+
+    def _rate(self, zone, now):
+        rate, at = self._demand.get(zone, (0.0, now))
+        return rate * math.exp(-self._decay * (now - at))
+
+    # ── pricing ───────────────────────────
+
+    def occupancy(self) -> dict:
+        """{zone: (occupied, total)}"""
+        with self._lock:
+            return {zone: (self._occupied[zone], total) for zone, total in self._total.items()}
+
+    def multipliers(self, now: float = None) -> dict:
+        """Current surge multiplier per zone; 1.0 for unknown zones."""
+        if not self.enabled:
+            return {}
+        now = time.monotonic() if now is None else now
+        result = {}
+        with self._lock:
+            for zone, total in self._total.items():
+                if total <= 0:
+                    continue
+                projected = (self._occupied[zone] + self._rate(zone, now) * LOOKAHEAD_MINUTES) / total
+                surge = (min(1.0, projected) - SURGE_THRESHOLD) / (1.0 - SURGE_THRESHOLD)
+                multiplier = 1.0 + max(0.0, surge) * (MAX_SURGE - 1.0)
+                result[zone] = round(round(multiplier / PRICE_STEP) * PRICE_STEP, 2)
+        return result
+
+    def signature(self) -> str:
+        """Changes whenever any displayed price would; for ETags and fragment keys."""
+        return ",".join(f"{zone}={m}" for zone, m in sorted(self.multipliers().items()) if m != 1.0)
+
+    def price(self, zone: str, base_price: float, multipliers: dict = None) -> float:
+        multiplier = (self.multipliers() if multipliers is None else multipliers).get(zone, 1.0)
+        return round((base_price or 0.0) * multiplier, 2)
+
+    def price_many(self, zones, base_prices) -> np.ndarray:
+        """Prices for many slots with one multiplier computation per zone."""
+        multipliers = self.multipliers()
+        base = np.asarray(base_prices, dtype=np.float64)
+        if not multipliers:
+            return np.round(base, 2)
+        factors = np.fromiter((multipliers.get(zone, 1.0) for zone in zones), dtype=np.float64, count=len(base))
+        return np.round(base * factors, 2)
+
+
+class Quote:
+    __slots__ = ("id", "slot_id", "price_per_hour", "expires_at")
+
+    def __init__(self, id, slot_id, price_per_hour, expires_at):
+        self.id = id
+        self.slot_id = slot_id
+        self.price_per_hour = price_per_hour
+        self.expires_at = expires_at
+
+    def as_dict(self) -> dict:
+        return {
+            "quote_id": self.id, "slot_id": self.slot_id, "price_per_hour": self.price_per_hour,
+            "valid_for": max(0, round(self.expires_at - time.time())),
+        }
+
+
+class QuoteBook:
+    """Prices promised to one user for one slot for QUOTE_TTL seconds.
+
+    A quote id carries its expiry and rate, signed together with the slot id
+    and the user's email, so quotes take no storage and any worker sharing
+    QUOTE_SECRET can check them. The booking form carries the id; the
+    booking POST charges the quoted rate, with no recomputation, when the id
+    is unexpired and signed for that slot and the session user. Redeeming
+    does not use a quote up: it survives a booking that fails to claim the
+    slot and holds the rate for the same user's retries until it expires.
+    """
+
+    def __init__(self, ttl: int = QUOTE_TTL, secret: str = QUOTE_SECRET):
+        self.ttl = ttl
+        self._key = secret.encode()
+
+    def _sign(self, expires_at: str, price: str, slot_id: int, user_email: str) -> str:
+        message = f"{expires_at}:{price}:{slot_id}:{user_email}".encode()
+        digest = hmac.new(self._key, message, hashlib.sha256).digest()[:16]
+        return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+    def quote(self, slot_id: int, user_email: str, price_per_hour: float) -> Quote:
+        expires_at = int(time.time()) + self.ttl
+        price = repr(float(price_per_hour))
+        signature = self._sign(str(expires_at), price, slot_id, user_email)
+        return Quote(f"{expires_at}:{price}:{signature}", slot_id, float(price), expires_at)
+
+    def redeem(self, quote_id: str, slot_id: int, user_email: str):
+        """The quoted rate, or None if the quote is malformed, expired or not
+        signed for this slot and user."""
+        try:
+            expires_at, price, signature = quote_id.split(":")
+            if int(expires_at) < time.time():
+                return None
+        except (AttributeError, ValueError):
+            return None
+        if not hmac.compare_digest(signature, self._sign(expires_at, price, slot_id, user_email)):
+            return None
+        return float(price)
+
+
+pricing_engine = PricingEngine()
+quote_book = QuoteBook()
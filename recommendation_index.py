@@ -0,0 +1,159 @@
+import heapq
+import threading
+from bisect import bisect_left, insort
+from datetime import datetime
+from itertools import islice
+
+from ai_logic import (
+    ZONE_SCORES, AVAILABLE_BONUS, FREEING_SOON_BONUS, FREEING_SOON_MINUTES,
+)
+from free_time_model import free_time_model
+from metrics import timed
+
+
+class IndexedSlot:
+    __slots__ = (
+        "id", "slot_number", "zone", "price_per_hour", "vehicle_types",
+        "is_occupied", "last_occupied_time", "occupied_vehicle_type", "score", "version",
+    )
+
+    def __init__(self, slot):
+        self.id = slot.id
+        self.slot_number = slot.slot_number
+        self.zone = slot.zone
+        self.price_per_hour = slot.price_per_hour
+        self.vehicle_types = frozenset(
+            vt.strip() for vt in (slot.vehicle_types or "").split(",") if vt.strip()
+        )
+        self.is_occupied = bool(slot.is_occupied)
+        self.last_occupied_time = slot.last_occupied_time
+        self.occupied_vehicle_type = getattr(slot, "occupied_vehicle_type", None)
+        self.score = 0
+        self.version = 0
+
+
+class RecommendationIndex:
+    """Slots bucketed by (vehicle type, availability, score), kept up to date
+    by crud's booking writes so top-k lookups never rescore the whole table.
+
+    Each bucket is a list of slot ids in ascending order, so ties are served in
+    the same order the old full sort produced. The only time-dependent part of
+    the score is the "frees up soon" bonus; the next moment each occupied slot
+    gains or loses it is kept in a heap and applied lazily on the next read.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    # ── building ──────────────────────────
+
+    def load(self, slots, now: datetime = None):
+        now = now or datetime.utcnow()
+        with self._lock:
+            self._reset()
+            for slot in sorted(slots, key=lambda s: s.id):
+                self._insert(IndexedSlot(slot), now)
+            self.loaded = True
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+
+    # ── write hooks (called from crud) ────
+
+    def update_slot(self, slot, now: datetime = None):
+        if not self.loaded:
+            return
+        now = now or datetime.utcnow()
+        with self._lock:
+            old = self._slots.get(slot.id)
+            if old is not None:
+                self._remove(old)
+            record = IndexedSlot(slot)
+            if old is not None:
+                record.version = old.version + 1
+            self._insert(record, now)
+
+    # ── reads ─────────────────────────────
+
+    @timed("recommend")
+    def top_k(self, k: int, vehicle_type: str = None, available_only: bool = True, now: datetime = None) -> list:
+        now = now or datetime.utcnow()
+        with self._lock:
+            self._rebucket(now)
+            vt = vehicle_type if vehicle_type in self._types() else None
+            groups = (True,) if available_only else (True, False)
+            scores = sorted({score for available in groups for score in self._scores[available]}, reverse=True)
+            result = []
+            for score in scores:
+                if len(result) >= k:
+                    break
+                # Equal scores from both groups are merged by id to keep tie order.
+                ids = heapq.merge(*(self._buckets.get((vt, available, score), ()) for available in groups))
+                result.extend(self._slots[slot_id] for slot_id in islice(ids, k - len(result)))
+            return result
+
+    def best(self, vehicle_type: str = None, now: datetime = None):
+        top = self.top_k(1, vehicle_type=vehicle_type, available_only=False, now=now)
+        return top[0] if top else None
+
+    # ── internals (lock held) ─────────────
+
+    def _reset(self):
+        self._slots = {}
+        self._buckets = {}
+        self._scores = {True: [], False: []}
+        self._due = []
+        self.loaded = False
+
+    def _types(self):
+        return {key[0] for key in self._buckets if key[0] is not None}
+
+    def _keys(self, record):
+        available = not record.is_occupied
+        for vt in (None, *record.vehicle_types):
+            yield (vt, available, record.score)
+
+    def _score(self, record, now):
+        # Also schedules the next time the slot enters or leaves the
+        # "frees up soon" band (see free_time_model.FreeTimeModel.band_state).
+        score = ZONE_SCORES.get(record.zone, 0)
+        if not record.is_occupied:
+            return score + AVAILABLE_BONUS
+        freeing_soon, change_at = free_time_model.band_state(
+            record.zone, record.occupied_vehicle_type, record.last_occupied_time, FREEING_SOON_MINUTES, now,
+        )
+        if change_at is not None:
+            heapq.heappush(self._due, (change_at, record.id, record.version))
+        return score + FREEING_SOON_BONUS if freeing_soon else score
+
+    def _insert(self, record, now):
+        record.score = self._score(record, now)
+        self._slots[record.id] = record
+        for key in self._keys(record):
+            insort(self._buckets.setdefault(key, []), record.id)
+        scores = self._scores[not record.is_occupied]
+        if record.score not in scores:
+            insort(scores, record.score)
+
+    def _remove(self, record):
+        for key in self._keys(record):
+            bucket = self._buckets[key]
+            del bucket[bisect_left(bucket, record.id)]
+            if not bucket:
+                del self._buckets[key]
+        del self._slots[record.id]
+
+    def _rebucket(self, now):
+        while self._due and self._due[0][0] < now:
+            _, slot_id, version = heapq.heappop(self._due)
+            record = self._slots.get(slot_id)
+            if record is None or record.version != version or not record.is_occupied:
+                continue
+            self._remove(record)
+            record.version += 1
+            self._insert(record, now)
+
+
+recommendation_index = RecommendationIndex()
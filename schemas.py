@@ -17,12 +17,14 @@ class SlotResponse(BaseModel):
 
 class BookingCreate(BaseModel):
     slot_id: int
+    user_email: Optional[str] = None
     user_name: str
     phone_number: Optional[str] = None
     vehicle_type: Optional[str] = None
     vehicle_number: Optional[str] = None
     start_time: datetime
     end_time: Optional[datetime] = None
+    price_per_hour: Optional[float] = None  # from a redeemed quote; None = price now
 
 class BookingResponse(BaseModel):
     id: int
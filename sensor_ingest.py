@@ -0,0 +1,217 @@
+import asyncio
+import json
+import logging
+import os
+import time
+
+import numpy as np
+
+import metrics
+
+# Readings are coalesced for this long before one bulk write.
+FLUSH_INTERVAL = float(os.getenv("PARKWISE_SENSOR_FLUSH_MS", "50")) / 1000
+# Queued, not yet written readings beyond this are refused with 429.
+MAX_PENDING_EVENTS = int(os.getenv("PARKWISE_SENSOR_MAX_PENDING", "200000"))
+MAX_REQUEST_EVENTS = 50_000
+# Flushes a coalesced batch gets before its readings are dropped as failed
+FLUSH_ATTEMPTS = 3
+
+# Binary frames: packed little-endian records, 13 bytes each
+#   slot_id uint32 | occupied uint8 (0/1) | timestamp float64 (Unix seconds, UTC)
+EVENT_DTYPE = np.dtype([("slot_id", "<u4"), ("occupied", "u1"), ("ts", "<f8")])
+# Readings are stored as datetime64[us], which ends with the year 9999
+MAX_TIMESTAMP = 253402300799.0
+
+log = logging.getLogger("parkwise.sensors")
+
+SENSOR_EVENTS = metrics.Counter(
+    "parkwise_sensor_events_total",
+    "Sensor occupancy readings by outcome (accepted, rejected, coalesced, unchanged, applied, failed).",
+    labels=("outcome",),
+)
+SENSOR_FLUSH_SECONDS = metrics.Histogram(
+    "parkwise_sensor_flush_seconds", "Time to coalesce and write one flush of sensor readings.",
+)
+metrics.REGISTRY.extend([SENSOR_EVENTS, SENSOR_FLUSH_SECONDS])
+
+
+def check_events(events: np.ndarray) -> np.ndarray:
+    """Refuse occupied flags other than 0/1 and timestamps that are not finite
+    Unix seconds between 1970 and MAX_TIMESTAMP."""
+    ts = events["ts"]
+    # NaN fails both comparisons
+    bad = np.flatnonzero((events["occupied"] > 1) | ~((ts >= 0) & (ts <= MAX_TIMESTAMP)))
+    if len(bad):
+        i = int(bad[0])
+        raise ValueError(f"reading {i}: occupied must be 0 or 1 and ts finite Unix seconds "
+                         f"in [0, {MAX_TIMESTAMP:.0f}], got {events[i].tolist()!r}")
+    return events
+
+
+def decode_frames(body: bytes) -> np.ndarray:
+    if len(body) % EVENT_DTYPE.itemsize:
+        raise ValueError(f"binary body must be a whole number of {EVENT_DTYPE.itemsize}-byte records")
+    return check_events(np.frombuffer(body, dtype=EVENT_DTYPE))
+
+
+def _reading(slot_id, occupied, ts, now):
+    # bool is an int subclass: type() keeps true/false out of slot_id and ts
+    if type(slot_id) is not int or not 0 <= slot_id < 2 ** 32:
+        raise ValueError(f"slot_id must be an integer id, not {slot_id!r}")
+    if not (isinstance(occupied, bool) or (type(occupied) is int and occupied in (0, 1))):
+        raise ValueError(f"occupied must be true, false, 0 or 1, not {occupied!r}")
+    if ts is None:
+        ts = now
+    elif type(ts) not in (int, float):
+        raise ValueError(f"ts must be Unix seconds, not {ts!r}")
+    return slot_id, occupied, ts
+
+
+def decode_json(body: bytes) -> np.ndarray:
+    """A JSON array of {"slot_id", "occupied", "ts"} objects or [slot_id, occupied, ts]
+    triples. occupied is a JSON boolean or 0/1; ts (Unix seconds) defaults to now."""
+    records = json.loads(body)
+    if not isinstance(records, list):
+        raise ValueError("expected a JSON array of readings")
+    now = time.time()
+    events = np.empty(len(records), dtype=EVENT_DTYPE)
+    try:
+        for i, record in enumerate(records):
+            if isinstance(record, dict):
+                slot_id, occupied, ts = record["slot_id"], record["occupied"], record.get("ts")
+            elif isinstance(record, list) and len(record) in (2, 3):
+                slot_id, occupied, ts = (record + [None])[:3]
+            else:
+                raise ValueError("expected an object or a [slot_id, occupied, ts] array")
+            events[i] = _reading(slot_id, occupied, ts, now)
+    except (KeyError, TypeError, ValueError, OverflowError) as exc:
+        raise ValueError(f"reading {i}: {exc!r}") from None
+    return check_events(events)
+
+
+def coalesce(batches) -> np.ndarray:
+    """The latest reading per slot (by timestamp, then arrival order)."""
+    events = np.concatenate(batches) if len(batches) > 1 else batches[0]
+    order = np.lexsort((np.arange(len(events)), events["ts"], events["slot_id"]))
+    events = events[order]
+    last = np.ones(len(events), dtype=bool)
+    last[:-1] = events["slot_id"][1:] != events["slot_id"][:-1]
+    return events[last]
+
+
+class SensorIngestor:
+    """Buffers sensor readings and writes them in coalesced bulk flushes.
+
+    Requests hand decoded batches to offer(), which only appends to an
+    asyncio queue. A single flush task waits FLUSH_INTERVAL after the first
+    batch arrives, drains the queue, keeps the latest reading per slot and
+    applies them with write(apply, slot_ids, occupied, timestamps) in a
+    worker thread. A flush that fails is carried into the next one, up to
+    FLUSH_ATTEMPTS times. At most MAX_PENDING_EVENTS readings wait at a time
+    (carried ones included); beyond that offer() refuses the batch, so a
+    sensor burst or a stuck writer turns into 429s instead of unbounded
+    memory.
+    """
+
+    def __init__(self, flush_interval: float = FLUSH_INTERVAL, max_pending: int = MAX_PENDING_EVENTS):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.pending = 0
+        self.flushes = 0
+        self._window = []
+        self._carry = None  # coalesced readings whose flush failed
+        self._failures = 0
+        self._queue = None
+        self._task = None
+        self._flushing = None
+
+    def start(self, write, apply):
+        """write(apply, *args) runs one write transaction, e.g. database.run_write."""
+        self._write = write
+        self._apply = apply
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if self._flushing is not None:
+            # Let a flush in progress finish (or fail and carry) before the last one
+            await self._flushing
+        # Readings already accepted are still written
+        batches = self._take_batches()
+        while batches:
+            await self._flush(batches)
+            batches = self._take_batches() if self._carry is not None else []
+
+    def offer(self, events: np.ndarray) -> bool:
+        if self._queue is None or self.pending + len(events) > self.max_pending:
+            SENSOR_EVENTS.inc("rejected", amount=len(events))
+            return False
+        self.pending += len(events)
+        self._queue.put_nowait(events)
+        SENSOR_EVENTS.inc("accepted", amount=len(events))
+        return True
+
+    def _drain(self, batches):
+        while not self._queue.empty():
+            batches.append(self._queue.get_nowait())
+        return batches
+
+    def _take_batches(self):
+        # A carried batch goes first so newer readings still win ties
+        batches = ([self._carry] if self._carry is not None else []) + self._drain(self._window)
+        self._carry, self._window = None, []
+        return batches
+
+    async def _run(self):
+        while True:
+            if self._carry is None:
+                self._window = [await self._queue.get()]
+            await asyncio.sleep(self.flush_interval)
+            # Shielded: stop() waits for it instead of racing its write thread
+            self._flushing = asyncio.ensure_future(self._flush(self._take_batches()))
+            await asyncio.shield(self._flushing)
+            self._flushing = None
+
+    async def _flush(self, batches):
+        count = sum(len(batch) for batch in batches)
+        if not count:
+            return
+        started = time.perf_counter()
+        latest = None
+        try:
+            latest = coalesce(batches)
+            SENSOR_EVENTS.inc("coalesced", amount=count - len(latest))
+            timestamps = (latest["ts"] * 1e6).astype("datetime64[us]").tolist()
+            changed = await asyncio.to_thread(
+                self._write, self._apply,
+                latest["slot_id"].tolist(), latest["occupied"].astype(bool).tolist(), timestamps,
+            )
+            self._failures = 0
+            SENSOR_EVENTS.inc("applied", amount=changed)
+            SENSOR_EVENTS.inc("unchanged", amount=len(latest) - changed)
+        except Exception:
+            self._failures += 1
+            if latest is not None and self._failures < FLUSH_ATTEMPTS:
+                log.warning("sensor flush of %d readings failed, retrying", count, exc_info=True)
+                # Still pending until written or dropped
+                self._carry = latest
+                count -= len(latest)
+            else:
+                log.exception("sensor flush of %d readings failed", count)
+                SENSOR_EVENTS.inc("failed", amount=count)
+                self._failures = 0
+        finally:
+            self.pending -= count
+            self.flushes += 1
+            SENSOR_FLUSH_SECONDS.observe(time.perf_counter() - started)
+
+
+sensor_ingestor = SensorIngestor()
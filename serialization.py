@@ -0,0 +1,49 @@
+from datetime import date, datetime
+
+import numpy as np
+import pydantic_core
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson  # in requirements.txt
+except ImportError:  # without it pydantic-core's encoder is used, same output
+    orjson = None
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def dumps(content) -> bytes:
+    """Compact JSON for plain dicts, lists, scalars and (naive) datetimes, with
+    the same output as FastAPI's jsonable_encoder + JSONResponse, without the
+    per-value Python walk."""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=_ORJSON_OPTIONS)
+    return pydantic_core.to_json(content, fallback=_default)
+
+
+def records(keys, rows) -> list:
+    """Row tuples as dicts keyed by keys, without going through RowMapping."""
+    return [dict(zip(keys, row)) for row in rows]
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with dumps().
+
+    Returned from an endpoint, it also skips FastAPI's jsonable_encoder pass,
+    which costs more than the encoding itself on large payloads; content must
+    then already be plain data (dicts, lists, scalars, datetimes).
+    """
+
+    def render(self, content) -> bytes:
+        return dumps(content)
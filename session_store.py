@@ -0,0 +1,287 @@
+import asyncio
+import itertools
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime
+
+# "memory" (per process) or "sqlite:///path/to/sessions.db" (shared by every
+# worker process on the host).
+SESSION_STORE_URL = os.getenv("PARKWISE_SESSION_STORE", "memory")
+SESSION_TTL = int(os.getenv("PARKWISE_SESSION_TTL", "86400"))
+SESSION_SWEEP_INTERVAL = int(os.getenv("PARKWISE_SESSION_SWEEP_INTERVAL", "60"))
+MAX_SESSIONS = int(os.getenv("PARKWISE_MAX_SESSIONS", "100000"))
+MAX_USERS = int(os.getenv("PARKWISE_MAX_USERS", "100000"))
+
+
+class UserRecord:
+    __slots__ = ("id", "name", "email", "vehicle_type", "created_at")
+
+    def __init__(self, id, name, email, vehicle_type=None, created_at=None):
+        self.id = id
+        self.name = name
+        self.email = email
+        self.vehicle_type = vehicle_type
+        self.created_at = created_at or datetime.utcnow()
+
+
+class SessionRecord:
+    __slots__ = ("email", "created_at", "expires_at")
+
+    def __init__(self, email, created_at, expires_at):
+        self.email = email
+        self.created_at = created_at
+        self.expires_at = expires_at
+
+
+def new_session_id() -> str:
+    return secrets.token_urlsafe(32)
+
+
+class SessionStore(ABC):
+    """Users and login sessions. Every lookup is O(1) in the number of sessions."""
+
+    @abstractmethod
+    def create_user(self, name: str, email: str) -> UserRecord:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_user(self, email: str):
+        raise NotImplementedError
+
+    @abstractmethod
+    def update_user_vehicle(self, email: str, vehicle_type):
+        raise NotImplementedError
+
+    @abstractmethod
+    def create_session(self, email: str) -> str:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_session_user(self, session_id: str):
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_session(self, session_id: str):
+        raise NotImplementedError
+
+    @abstractmethod
+    def sweep(self, now: float = None) -> int:
+        """Drop expired sessions; returns how many were removed."""
+        raise NotImplementedError
+
+
+class MemorySessionStore(SessionStore):
+    """Per-process store. Sessions share one TTL, so insertion order is expiry
+    order and sweeping only ever looks at the oldest entries.
+
+    Beyond max_users the least recently seen users are dropped, but never one
+    that still has a session: it would be logged out on its next request.
+    Those stay (so users are bounded by max_users + max_sessions) until their
+    last session is deleted, swept or evicted.
+    """
+
+    def __init__(self, ttl: int = SESSION_TTL, max_sessions: int = MAX_SESSIONS, max_users: int = MAX_USERS):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.max_users = max_users
+        self._users = OrderedDict()
+        self._sessions = OrderedDict()
+        self._live = {}  # email -> sessions not yet deleted or swept
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def create_user(self, name, email):
+        user = UserRecord(next(self._ids), name, email)
+        with self._lock:
+            self._users[email] = user
+            self._users.move_to_end(email)
+            self._evict_users(keep=email)
+        return user
+
+    def _evict_users(self, keep):
+        # Oldest first, stopping at a user who still has a session (or is the
+        # one logging in); such a user goes when its last session does
+        while len(self._users) > self.max_users:
+            email = next(iter(self._users))
+            if email == keep or self._live.get(email):
+                break
+            del self._users[email]
+
+    def _drop_session(self, session_id):
+        session = self._sessions.pop(session_id, None)
+        if session is None:
+            return
+        email = session.email
+        if self._live[email] > 1:
+            self._live[email] -= 1
+            return
+        del self._live[email]
+        if len(self._users) > self.max_users:
+            self._users.pop(email, None)
+
+    def get_user(self, email):
+        return self._users.get(email)
+
+    def update_user_vehicle(self, email, vehicle_type):
+        user = self._users.get(email)
+        if user is not None:
+            user.vehicle_type = vehicle_type
+        return user
+
+    def create_session(self, email):
+        session_id = new_session_id()
+        now = time.time()
+        with self._lock:
+            self._sessions[session_id] = SessionRecord(email, now, now + self.ttl)
+            self._live[email] = self._live.get(email, 0) + 1
+            while len(self._sessions) > self.max_sessions:
+                self._drop_session(next(iter(self._sessions)))
+        return session_id
+
+    def get_session_user(self, session_id):
+        session = self._sessions.get(session_id)
+        if session is None or session.expires_at < time.time():
+            return None
+        with self._lock:
+            user = self._users.get(session.email)
+            if user is not None:
+                self._users.move_to_end(session.email)
+        return user
+
+    def delete_session(self, session_id):
+        with self._lock:
+            self._drop_session(session_id)
+
+    def sweep(self, now=None):
+        now = now or time.time()
+        removed = 0
+        with self._lock:
+            while self._sessions:
+                session_id, session = next(iter(self._sessions.items()))
+                if session.expires_at >= now:
+                    break
+                self._drop_session(session_id)
+                removed += 1
+        return removed
+
+
+class SQLiteSessionStore(SessionStore):
+    """Store in a small SQLite file (WAL) so all worker processes share sessions.
+
+    Lookups are primary-key reads; expiry is an indexed range delete.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY,
+            email TEXT NOT NULL UNIQUE,
+            name TEXT NOT NULL,
+            vehicle_type TEXT,
+            created_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS sessions (
+            session_id TEXT PRIMARY KEY,
+            email TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            expires_at REAL NOT NULL
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS ix_sessions_expires_at ON sessions (expires_at);
+    """
+
+    def __init__(self, path: str, ttl: int = SESSION_TTL, max_sessions: int = MAX_SESSIONS):
+        self.path = path
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.executescript(self.SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _user(row):
+        if row is None:
+            return None
+        id, name, email, vehicle_type, created_at = row
+        return UserRecord(id, name, email, vehicle_type, datetime.utcfromtimestamp(created_at))
+
+    def create_user(self, name, email):
+        conn = self._conn()
+        conn.execute(
+            "INSERT INTO users (email, name, created_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(email) DO UPDATE SET name = excluded.name",
+            (email, name, time.time()),
+        )
+        return self.get_user(email)
+
+    def get_user(self, email):
+        row = self._conn().execute(
+            "SELECT id, name, email, vehicle_type, created_at FROM users WHERE email = ?", (email,)
+        ).fetchone()
+        return self._user(row)
+
+    def update_user_vehicle(self, email, vehicle_type):
+        self._conn().execute("UPDATE users SET vehicle_type = ? WHERE email = ?", (vehicle_type, email))
+        return self.get_user(email)
+
+    def create_session(self, email):
+        session_id = new_session_id()
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            "INSERT INTO sessions (session_id, email, created_at, expires_at) VALUES (?, ?, ?, ?)",
+            (session_id, email, now, now + self.ttl),
+        )
+        return session_id
+
+    def get_session_user(self, session_id):
+        row = self._conn().execute(
+            "SELECT u.id, u.name, u.email, u.vehicle_type, u.created_at "
+            "FROM sessions s JOIN users u ON u.email = s.email "
+            "WHERE s.session_id = ? AND s.expires_at >= ?",
+            (session_id, time.time()),
+        ).fetchone()
+        return self._user(row)
+
+    def delete_session(self, session_id):
+        self._conn().execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def sweep(self, now=None):
+        conn = self._conn()
+        removed = conn.execute("DELETE FROM sessions WHERE expires_at < ?", (now or time.time(),)).rowcount
+        # Bound the table: drop the oldest sessions beyond max_sessions
+        removed += conn.execute(
+            "DELETE FROM sessions WHERE expires_at < ("
+            " SELECT expires_at FROM sessions ORDER BY expires_at DESC LIMIT 1 OFFSET ?)",
+            (self.max_sessions - 1,),
+        ).rowcount
+        return removed
+
+
+def make_session_store(url: str = SESSION_STORE_URL) -> SessionStore:
+    if url == "memory":
+        return MemorySessionStore()
+    if url.startswith("sqlite:///"):
+        return SQLiteSessionStore(url[len("sqlite:///"):])
+    raise ValueError(f"Unsupported session store: {url}")
+
+
+async def run_sweeper(store: SessionStore, interval: float = SESSION_SWEEP_INTERVAL):
+    while True:
+        await asyncio.sleep(interval)
+        await asyncio.to_thread(store.sweep)
+
+
+session_store = make_session_store()
@@ -53,3 +53,42 @@ function endBooking(bookingId) {
   startInput.addEventListener('change', updateEstimate);
   endInput.addEventListener('change', updateEstimate);
 })();
+
+(function initLiveOccupancy() {
+  const roots = document.querySelectorAll('[data-live-occupancy]');
+
+  if (!roots.length || !window.EventSource) {
+    return;
+  }
+
+  const zone = roots[0].dataset.liveZone;
+  const url = zone ? `/api/slots/events?zone=${encodeURIComponent(zone)}` : '/api/slots/events';
+  const source = new EventSource(url);
+
+  source.addEventListener('slot', (event) => {
+    const slot = JSON.parse(event.data);
+
+    document.querySelectorAll(`[data-slot-id="${slot.slot_id}"]`).forEach((el) => {
+      if (el.classList.contains('slot-list-row')) {
+        // Zone lists only show available slots
+        el.classList.toggle('d-none', slot.is_occupied);
+        return;
+      }
+
+      el.classList.toggle('slot-occupied', slot.is_occupied);
+
+      const pill = el.querySelector('.status-pill');
+      if (pill) {
+        pill.textContent = slot.is_occupied ? 'Occupied' : 'Available';
+        pill.classList.toggle('status-occupied', slot.is_occupied);
+        pill.classList.toggle('status-available', !slot.is_occupied);
+      }
+
+      const book = el.querySelector(`a[href="/booking/${slot.slot_id}"]`);
+      if (book) {
+        book.classList.toggle('disabled', slot.is_occupied);
+        book.setAttribute('aria-disabled', String(slot.is_occupied));
+      }
+    });
+  });
+})();
@@ -0,0 +1,288 @@
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import sys
+import time
+
+import jinja2
+from fastapi.staticfiles import StaticFiles
+from fastapi.templating import Jinja2Templates
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import Response
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip variants are built
+    brotli = None
+
+SOURCE_DIR = "static"
+# Output of `python static_assets.py build`: hashed copies, .gz/.br variants
+# and manifest.json (source path -> hashed path).
+BUILD_DIR = os.getenv("PARKWISE_STATIC_BUILD_DIR", "static_build")
+TEMPLATE_CACHE_DIR = os.getenv("PARKWISE_TEMPLATE_CACHE_DIR", ".template_cache")
+MANIFEST = "manifest.json"
+HASH_LENGTH = 12
+# Hashed URLs change whenever the content does, so they can be cached forever
+IMMUTABLE = "public, max-age=31536000, immutable"
+COMPRESSIBLE = ("text/", "application/javascript", "application/json", "application/xml", "image/svg+xml")
+
+log = logging.getLogger("parkwise.static")
+
+
+# (encoding, file suffix, compress) in order of preference
+ENCODERS = [("br", ".br", lambda data: brotli.compress(data, quality=11))] if brotli is not None else []
+# mtime=0 keeps the output byte-identical across builds
+ENCODERS.append(("gzip", ".gz", lambda data: gzip.compress(data, 9, mtime=0)))
+
+
+def _source_files(source: str):
+    for root, _, files in os.walk(source):
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            yield os.path.relpath(path, source).replace(os.sep, "/"), path
+
+
+def media_type_of(path: str) -> str:
+    return mimetypes.guess_type(path)[0] or "application/octet-stream"
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+
+
+def hashed_name(path: str, digest: str) -> str:
+    stem, ext = os.path.splitext(path)
+    return f"{stem}.{digest}{ext}"
+
+
+def compress_variants(path: str, data: bytes) -> dict:
+    """encoding -> body for each encoding that makes this file smaller."""
+    if not media_type_of(path).startswith(COMPRESSIBLE):
+        return {}
+    variants = {}
+    for encoding, _, compress in ENCODERS:
+        body = compress(data)
+        if len(body) < len(data):
+            variants[encoding] = body
+    return variants
+
+
+# ─────────────────────────────────────────
+#  Build step
+# ─────────────────────────────────────────
+
+def build(source: str = SOURCE_DIR, dest: str = BUILD_DIR) -> dict:
+    """Write content-hashed, precompressed copies of every file in source.
+
+    Earlier builds' files are left in place, so pages still cached by
+    browsers keep resolving their (old) hashed URLs.
+    """
+    manifest = {}
+    written = 0
+    for rel, path in _source_files(source):
+        with open(path, "rb") as f:
+            data = f.read()
+        name = hashed_name(rel, content_hash(data))
+        manifest[rel] = name
+        target = os.path.join(dest, name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        files = {target: data}
+        variants = compress_variants(rel, data)
+        for encoding, suffix, _ in ENCODERS:
+            if encoding in variants:
+                files[target + suffix] = variants[encoding]
+        for file_path, body in files.items():
+            with open(file_path, "wb") as f:
+                f.write(body)
+            written += len(body)
+    tmp = os.path.join(dest, MANIFEST + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, os.path.join(dest, MANIFEST))
+    return {"assets": len(manifest), "bytes_written": written}
+
+
+# ─────────────────────────────────────────
+#  Serving
+# ─────────────────────────────────────────
+
+class Asset:
+    __slots__ = ("media_type", "etag", "bodies")
+
+    def __init__(self, media_type, etag, bodies):
+        self.media_type = media_type
+        self.etag = etag
+        self.bodies = bodies  # encoding ("identity", "gzip", "br") -> bytes
+
+
+class AssetBundle:
+    """Hashed static assets with their compressed variants, held in memory.
+
+    load() reads the precompressed files written by build(). An asset whose
+    build output is missing or stale (source edited since the last build) is
+    hashed and compressed at load time instead, so a checkout that was never
+    built still serves correct, compressed, cache-busted assets.
+    """
+
+    def __init__(self, prefix: str = "/static/"):
+        self.prefix = prefix
+        self.manifest = {}
+        self.files = {}  # hashed path -> Asset
+
+    @classmethod
+    def load(cls, source: str = SOURCE_DIR, build_dir: str = BUILD_DIR, prefix: str = "/static/") -> "AssetBundle":
+        bundle = cls(prefix)
+        try:
+            with open(os.path.join(build_dir, MANIFEST)) as f:
+                built = json.load(f)
+        except (OSError, ValueError):
+            built = {}
+        stale = []
+        for rel, path in _source_files(source):
+            with open(path, "rb") as f:
+                data = f.read()
+            digest = content_hash(data)
+            name = hashed_name(rel, digest)
+            if built.get(rel) == name:
+                bodies = bundle._read_built(os.path.join(build_dir, name))
+            else:
+                stale.append(rel)
+                bodies = compress_variants(rel, data)
+            bodies["identity"] = data
+            bundle.manifest[rel] = name
+            bundle.files[name] = Asset(media_type_of(rel), f'"{digest}"', bodies)
+        if stale:
+            log.info("compressed %d static assets at startup (run `python static_assets.py build`): %s",
+                     len(stale), ", ".join(stale))
+        return bundle
+
+    @staticmethod
+    def _read_built(path):
+        bodies = {}
+        for encoding, suffix, _ in ENCODERS:
+            try:
+                with open(path + suffix, "rb") as f:
+                    bodies[encoding] = f.read()
+            except FileNotFoundError:
+                pass
+        return bodies
+
+    def url(self, path: str) -> str:
+        """Template helper: the hashed URL for a source path such as 'css/style.css'."""
+        path = path.lstrip("/")
+        return self.prefix + self.manifest.get(path, path)
+
+
+def choose_encoding(accept_encoding: str, available) -> str:
+    accepted = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token] = q
+    for encoding, _, _ in ENCODERS:
+        if encoding in available and accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return "identity"
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles that answers hashed URLs from an AssetBundle.
+
+    Hashed paths get the best precompressed variant the client accepts,
+    straight from memory, with immutable cache headers. Any other path (the
+    unhashed originals) falls through to plain StaticFiles and must be
+    revalidated.
+    """
+
+    def __init__(self, *, directory: str, bundle: AssetBundle, **kwargs):
+        super().__init__(directory=directory, **kwargs)
+        self.bundle = bundle
+
+    async def get_response(self, path: str, scope) -> Response:
+        asset = self.bundle.files.get(path.replace(os.sep, "/"))
+        if asset is None:
+            response = await super().get_response(path, scope)
+            response.headers.setdefault("cache-control", "no-cache")
+            return response
+        if scope["method"] not in ("GET", "HEAD"):
+            raise HTTPException(status_code=405)
+        request_headers = Headers(scope=scope)
+        headers = {"Cache-Control": IMMUTABLE, "ETag": asset.etag, "Vary": "Accept-Encoding"}
+        # The hash is in the URL, so any validator the client holds is current
+        if request_headers.get("if-none-match"):
+            return Response(status_code=304, headers=headers)
+        encoding = choose_encoding(request_headers.get("accept-encoding", ""), asset.bodies)
+        body = asset.bodies[encoding]
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        if scope["method"] == "HEAD":
+            headers["Content-Length"] = str(len(body))
+            body = b""
+        return Response(body, media_type=asset.media_type, headers=headers)
+
+
+# ─────────────────────────────────────────
+#  Templates
+# ─────────────────────────────────────────
+
+def enable_bytecode_cache(env: jinja2.Environment, directory: str = TEMPLATE_CACHE_DIR):
+    """Keep compiled templates on disk so a new worker loads them instead of compiling."""
+    try:
+        os.makedirs(directory, exist_ok=True)
+    except OSError as exc:
+        log.warning("template bytecode cache disabled: %s", exc)
+        return
+    env.bytecode_cache = jinja2.FileSystemBytecodeCache(directory)
+
+
+def precompile_templates(env: jinja2.Environment) -> int:
+    """Load every template now instead of on its first request."""
+    names = env.list_templates(extensions=["html"])
+    for name in names:
+        env.get_template(name)
+    return len(names)
+
+
+# ─────────────────────────────────────────
+#  Command line
+# ─────────────────────────────────────────
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Build hashed, precompressed static assets and precompile templates.",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_cmd = sub.add_parser("build", help="write the asset build and warm the template bytecode cache")
+    build_cmd.add_argument("--source", default=SOURCE_DIR)
+    build_cmd.add_argument("--dest", default=BUILD_DIR)
+    build_cmd.add_argument("--templates", default="templates")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    stats = build(args.source, args.dest)
+    # Same environment options as the app's, or the cached bytecode would not match it
+    env = Jinja2Templates(directory=args.templates).env
+    enable_bytecode_cache(env)
+    stats["templates"] = precompile_templates(env)
+    stats["brotli"] = brotli is not None
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    print(json.dumps(stats), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+"""Point the app at a throwaway database before any repo module is imported."""
+import os
+import sys
+import tempfile
+import uuid
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TMP = tempfile.mkdtemp(prefix="parkwise-tests-")
+
+os.environ["PARKWISE_DATABASE_URL"] = f"sqlite:///{TMP}/parkwise.db"
+os.environ["PARKWISE_SESSION_STORE"] = "memory"
+os.environ["PARKWISE_ADMIN_TOKEN"] = "test-admin"
+os.environ["PARKWISE_SENSOR_TOKEN"] = "test-sensor"
+os.environ["PARKWISE_FREE_TIME_MODEL"] = f"{TMP}/free_time_model.npz"
+os.environ["PARKWISE_STATIC_BUILD_DIR"] = f"{TMP}/static_build"
+os.environ["PARKWISE_TEMPLATE_CACHE_DIR"] = f"{TMP}/template_cache"
+sys.path.insert(0, ROOT)
+# main.py serves static/ and templates/ relative to the repo root
+os.chdir(ROOT)
+
+from database import WriteSessionLocal, engine  # noqa: E402
+from migrations import apply_migrations  # noqa: E402
+from models import ParkingSlot  # noqa: E402
+
+apply_migrations(engine)
+
+
+@pytest.fixture
+def make_slots():
+    """make_slots(n, zone="T") -> ids of n new free slots."""
+    def make(n, zone="T"):
+        prefix = f"{zone}-{uuid.uuid4().hex[:8]}"
+        with WriteSessionLocal() as db:
+            slots = [ParkingSlot(slot_number=f"{prefix}-{i}", zone=zone, is_occupied=False) for i in range(n)]
+            db.add_all(slots)
+            db.commit()
+            return [s.id for s in slots]
+    return make
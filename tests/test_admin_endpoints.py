@@ -0,0 +1,39 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+import metrics
+
+ADMIN = {"X-Admin-Token": "test-admin"}
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(main.app) as client:
+        yield client
+
+
+@pytest.mark.parametrize("path", ["/api/cache/stats", "/metrics"])
+def test_admin_token_required(client, path):
+    assert client.get(path).status_code == 403
+    assert client.get(path, headers={"X-Admin-Token": "wrong"}).status_code == 403
+    assert client.get(path, headers=ADMIN).status_code == 200
+
+
+def test_cache_stats(client):
+    stats = client.get("/api/cache/stats", headers=ADMIN).json()
+    assert "keys" in stats
+
+
+def test_metrics_open_to_allowed_addresses(client, monkeypatch):
+    # TestClient connects as "testclient"
+    monkeypatch.setattr(metrics, "METRICS_ALLOW", frozenset({"testclient"}))
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert "parkwise_" in response.text
+
+
+def test_no_server_timing_unless_profiling_is_enabled(client, monkeypatch):
+    assert "server-timing" not in client.get("/api/slots", headers={"X-Profile": "1"}).headers
+    monkeypatch.setattr(metrics, "PROFILE_HEADER", True)
+    assert "server-timing" in client.get("/api/slots", headers={"X-Profile": "1"}).headers
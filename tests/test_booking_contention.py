@@ -0,0 +1,54 @@
+import random
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy import func
+
+import crud
+from database import SessionLocal, run_write
+from models import Booking, ParkingSlot
+from schemas import BookingCreate
+
+
+def test_concurrent_bookings_claim_each_slot_once(make_slots):
+    slot_ids = make_slots(12, zone="C")
+    rng = random.Random(3)
+    targets = [rng.choice(slot_ids) for _ in range(300)]
+
+    def book(slot_id):
+        booking = run_write(crud.create_booking, BookingCreate(
+            slot_id=slot_id, user_name="load", start_time=datetime.utcnow(),
+        ))
+        return slot_id if booking else None
+
+    with ThreadPoolExecutor(max_workers=64) as pool:
+        winners = [slot_id for slot_id in pool.map(book, targets) if slot_id is not None]
+
+    assert sorted(winners) == sorted(set(targets))
+    with SessionLocal() as db:
+        active = Counter(dict(
+            db.query(Booking.slot_id, func.count())
+            .filter(Booking.slot_id.in_(slot_ids), Booking.status == "active")
+            .group_by(Booking.slot_id)
+        ))
+        occupied = {s.id for s in db.query(ParkingSlot).filter(ParkingSlot.id.in_(slot_ids), ParkingSlot.is_occupied)}
+    assert set(active.values()) == {1}
+    assert set(active) == occupied == set(targets)
+
+
+def test_overlapping_reservations_claim_once(make_slots):
+    slot_id, = make_slots(1, zone="C")
+    start = datetime.utcnow() + timedelta(days=2)
+
+    def reserve(offset_minutes):
+        begin = start + timedelta(minutes=offset_minutes)
+        return run_write(crud.create_booking, BookingCreate(
+            slot_id=slot_id, user_name="load", start_time=begin, end_time=begin + timedelta(hours=2),
+        ))
+
+    # Every window overlaps every other: exactly one may win
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        booked = [b for b in pool.map(reserve, range(100)) if b is not None]
+
+    assert len(booked) == 1
@@ -0,0 +1,55 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy.exc import OperationalError
+
+import booking_lifecycle
+import crud
+from booking_lifecycle import BookingScheduler
+from database import SessionLocal, run_write
+from models import Booking
+from schemas import BookingCreate
+
+
+def test_run_due_expires_ended_bookings(make_slots):
+    slot_id, = make_slots(1, zone="L")
+    start = datetime.utcnow() - timedelta(hours=2)
+    booking = run_write(crud.create_booking, BookingCreate(
+        slot_id=slot_id, user_name="exp", start_time=start, end_time=start + timedelta(hours=1),
+    ))
+    scheduler = BookingScheduler()
+    scheduler._write = run_write
+    scheduler._apply_due = crud.apply_due_lifecycle
+
+    expired, _ = asyncio.run(scheduler.run_due())
+
+    assert expired >= 1
+    with SessionLocal() as db:
+        assert db.get(Booking, booking.id).status == "completed"
+
+
+def test_locked_database_retries_without_long_sleep(monkeypatch):
+    sleeps = []
+    real_sleep = asyncio.sleep
+    calls = []
+
+    def write(fn, *args):
+        calls.append(fn)
+        if len(calls) == 1:
+            raise OperationalError("UPDATE", {}, Exception("database is locked"))
+        return fn(None, *args)
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+        await real_sleep(0)
+
+    async def run():
+        scheduler = BookingScheduler()
+        monkeypatch.setattr(booking_lifecycle.asyncio, "sleep", fake_sleep)
+        scheduler.start(write, lambda db, now: (0, 0), lambda db, now, until: [])
+        while len(calls) < 3:
+            await real_sleep(0.001)
+        await scheduler.stop()
+
+    asyncio.run(run())
+    assert sleeps == [booking_lifecycle.LOCKED_RETRY_SECONDS]
@@ -0,0 +1,54 @@
+import io
+import json
+import uuid
+
+import pytest
+
+import bulk_io
+from database import SessionLocal, WriteSessionLocal
+from models import ParkingSlot
+
+
+@pytest.mark.parametrize("value", ["nan", "inf", "-inf", "NaN", float("nan")])
+def test_non_finite_numbers_rejected(value):
+    with pytest.raises(ValueError, match="must be finite"):
+        bulk_io.validate_slot({"slot_number": "X1", "zone": "A", "price_per_hour": value})
+
+
+@pytest.mark.parametrize("record, error", [
+    ({"zone": "A"}, "slot_number is required"),
+    ({"slot_number": "X1", "zone": "A", "price_per_hour": "-1"}, "out of range"),
+    ({"slot_number": "X1", "zone": "A", "latitude": "91", "longitude": "0"}, "out of range"),
+    ({"slot_number": "X1", "zone": "A", "latitude": "10"}, "go together"),
+    ({"slot_number": "X1", "zone": "A", "vehicle_types": "Car,Truck"}, "unknown vehicle types"),
+    ({"slot_number": "X1", "zone": "A", "is_occupied": "maybe"}, "not a boolean"),
+])
+def test_invalid_slot_rows(record, error):
+    with pytest.raises(ValueError, match=error):
+        bulk_io.validate_slot(record)
+
+
+def test_import_skips_invalid_rows_and_duplicates():
+    prefix = uuid.uuid4().hex[:8]
+    lines = [
+        {"slot_number": f"{prefix}-1", "zone": "I", "price_per_hour": 40},
+        {"slot_number": f"{prefix}-2", "zone": "I", "latitude": float("inf"), "longitude": 0},
+        {"slot_number": f"{prefix}-1", "zone": "I"},
+        "not an object",
+    ]
+    stream = io.StringIO("\n".join(json.dumps(line) for line in lines) + "\n{broken\n")
+
+    with WriteSessionLocal() as db:
+        result = bulk_io.import_file(db, "slots", stream, "jsonl")
+
+    assert (result.read, result.inserted, result.skipped, result.invalid) == (5, 1, 1, 3)
+    assert [line for line, _ in result.errors] == [2, 4, 5]
+    with SessionLocal() as db:
+        slots = db.query(ParkingSlot).filter(ParkingSlot.slot_number.like(f"{prefix}-%")).all()
+    assert [(s.slot_number, s.price_per_hour) for s in slots] == [(f"{prefix}-1", 40.0)]
+
+
+def test_strict_import_stops_at_first_invalid_row():
+    stream = io.StringIO("slot_number,zone,price_per_hour\nS1,A,nan\n")
+    with WriteSessionLocal() as db, pytest.raises(ValueError, match="line 2: price_per_hour must be finite"):
+        bulk_io.import_file(db, "slots", stream, "csv", strict=True)
@@ -0,0 +1,54 @@
+import asyncio
+import threading
+
+from sqlalchemy import insert
+
+import change_log
+from change_log import ChangeFeed
+from database import SessionLocal, engine
+from models import ChangeLogEntry
+
+
+def log_entries(kind, ref_ids, writer="other-worker"):
+    with engine.begin() as conn:
+        conn.execute(insert(ChangeLogEntry.__table__),
+                     [{"kind": kind, "ref_id": ref_id, "writer": writer} for ref_id in ref_ids])
+
+
+def test_catch_up_applies_other_workers_entries_off_the_loop():
+    applied, probed_on = [], []
+    feed = ChangeFeed(enabled=True, interval=3600)
+    newest = feed.newest
+
+    def probe():
+        probed_on.append(threading.current_thread())
+        return newest()
+
+    feed.newest = probe
+
+    async def run():
+        feed.start(SessionLocal, lambda db, entries: applied.extend(entries), lambda: None)
+        log_entries(change_log.SLOT, [1, 2])
+        log_entries(change_log.SLOT, [3], writer=change_log.WRITER_ID)
+        await feed.catch_up()
+        await feed.stop()
+        return threading.current_thread()
+
+    loop_thread = asyncio.run(run())
+    assert applied == [(change_log.SLOT, 1), (change_log.SLOT, 2)]
+    assert probed_on and loop_thread not in probed_on
+
+
+def test_concurrent_catch_ups_share_checks():
+    checks = []
+    feed = ChangeFeed(enabled=True, interval=3600)
+
+    async def run():
+        feed.start(SessionLocal, lambda db, entries: None, lambda: None)
+        check = feed._check
+        feed._check = lambda: (checks.append(1), check())
+        await asyncio.gather(*(feed.catch_up() for _ in range(50)))
+        await feed.stop()
+
+    asyncio.run(run())
+    assert 1 <= len(checks) <= 2
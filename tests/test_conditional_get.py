@@ -0,0 +1,81 @@
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+import crud
+import main
+from database import run_write
+from http_cache import is_not_modified, make_etag
+from schemas import BookingCreate
+
+
+def request_with(if_none_match):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match is not None else []
+    return Request({"type": "http", "headers": headers})
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, False),
+    ('W/"abc"', True),
+    ('"abc"', True),  # weak comparison ignores W/
+    ('W/"other", W/"abc"', True),
+    ("*", True),
+    ('W/"other"', False),
+])
+def test_is_not_modified(header, expected):
+    assert is_not_modified(request_with(header), 'W/"abc"') is expected
+
+
+def test_make_etag_depends_on_every_part():
+    assert make_etag("slots", 1, "a") == make_etag("slots", 1, "a")
+    assert make_etag("slots", 1, "a") != make_etag("slots", 2, "a")
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(main.app) as client:
+        client.post("/login", data={"email": "etag@x", "name": "E"}, follow_redirects=False)
+        yield client
+
+
+def revalidate(client, path, etag):
+    return client.get(path, headers={"If-None-Match": etag})
+
+
+@pytest.mark.parametrize("path", ["/api/slots", "/slots", "/slots?zone=A"])
+def test_unchanged_resource_revalidates_with_304(client, path):
+    first = client.get(path)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "private, no-cache"
+
+    again = revalidate(client, path, etag)
+    assert again.status_code == 304
+    assert again.headers["etag"] == etag
+    assert again.content == b""
+
+
+def test_occupancy_change_invalidates_etag(client, make_slots):
+    slot_id, = make_slots(1, zone="A")
+    crud.notify_inventory_changed()
+    before = client.get("/api/slots")
+    etag = before.headers["etag"]
+    assert not next(s for s in before.json() if s["id"] == slot_id)["is_occupied"]
+
+    run_write(crud.create_booking, BookingCreate(slot_id=slot_id, user_name="E", start_time=datetime.utcnow()))
+
+    after = revalidate(client, "/api/slots", etag)
+    assert after.status_code == 200
+    assert after.headers["etag"] != etag
+    assert next(s for s in after.json() if s["id"] == slot_id)["is_occupied"]
+
+
+def test_pages_are_tagged_per_user(client):
+    etag = client.get("/slots").headers["etag"]
+    with TestClient(main.app) as other:
+        other.post("/login", data={"email": "other@x", "name": "O"}, follow_redirects=False)
+        response = revalidate(other, "/slots", etag)
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+import crud
+from database import SessionLocal, run_write
+from free_time_model import FreeTimeModel, completed_stays, load_model
+from models import ParkingSlot
+from schemas import BookingCreate
+
+MONDAY = datetime(2030, 1, 7, 9)
+
+
+def test_workers_add_their_observations_to_the_file(tmp_path):
+    path = str(tmp_path / "model.npz")
+    FreeTimeModel().save(path)
+    first, second = load_model(path), load_model(path)
+    first.observe("A", "Car", MONDAY, MONDAY + timedelta(minutes=30))
+    second.observe("B", "SUV", MONDAY, MONDAY + timedelta(minutes=90))
+    second.observe("B", "SUV", MONDAY, MONDAY + timedelta(minutes=90))
+
+    first.save_observed(path)
+    second.save_observed(path)
+    second.save_observed(path)  # nothing new: nothing added twice
+
+    merged = load_model(path)
+    assert int(merged.counts.sum()) == 3
+    assert np.array_equal(merged.counts, first.counts + second.counts)
+
+
+def test_fit_query_leaves_out_auto_expired_bookings(make_slots):
+    by_hand, expired = make_slots(2, zone="F")
+    start = datetime.utcnow() - timedelta(hours=3)
+    manual = run_write(crud.create_booking, BookingCreate(slot_id=by_hand, user_name="f", start_time=start))
+    run_write(crud.end_booking, manual.id)
+    run_write(crud.create_booking, BookingCreate(
+        slot_id=expired, user_name="f", start_time=start, end_time=start + timedelta(hours=1),
+    ))
+    run_write(crud.apply_due_lifecycle, datetime.utcnow())
+
+    with SessionLocal() as db:
+        stays = completed_stays(db).filter(ParkingSlot.id.in_([by_hand, expired])).all()
+    assert [(zone, start_time) for zone, _, start_time, _ in stays] == [("F", start)]
@@ -0,0 +1,73 @@
+"""The hot queries must be served by an index: EXPLAIN QUERY PLAN shows
+SEARCH ... USING INDEX for every table they touch and never a bare SCAN."""
+import re
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+import async_crud
+import crud
+from migrations import apply_migrations
+
+TABLE_STEP = re.compile(r"^(SEARCH|SCAN) (?!CONSTANT ROW)")
+INDEXED = re.compile(r"USING (COVERING )?INDEX|USING INTEGER PRIMARY KEY")
+LATER = datetime(2030, 1, 1, 18)
+
+
+@pytest.fixture(scope="module")
+def db(tmp_path_factory):
+    engine = create_engine(f"sqlite:///{tmp_path_factory.mktemp('plans')}/plans.db")
+    apply_migrations(engine)
+    with sessionmaker(bind=engine)() as session:
+        crud.seed_parking_slots(session)
+        yield session
+    engine.dispose()
+
+
+def plans(db, fn):
+    """EXPLAIN QUERY PLAN steps of each statement fn runs (rolled back after)."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+        db.rollback()
+    with engine.connect() as conn:
+        return [
+            [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", params)]
+            for statement, params in statements
+        ]
+
+
+HOT_QUERIES = {
+    "available slots": lambda db: crud.get_available_slots(db),
+    "zone filter": lambda db: crud.get_all_slots(db, zone="A"),
+    "history page": lambda db: crud.get_user_booking_history(db, "a@b.c", before=(LATER, 100)),
+    "bookings API page": lambda db: db.execute(async_crud.booking_rows_query((LATER, 100), 50, "a@b.c")).all(),
+    "claim_slot overlap check": lambda db: crud.claim_slot(db, 1, LATER, datetime(2030, 1, 1, 21)),
+}
+
+
+@pytest.mark.parametrize("name", HOT_QUERIES)
+def test_hot_query_uses_index(db, name):
+    statement_plans = plans(db, lambda: HOT_QUERIES[name](db))
+    assert statement_plans
+    for plan in statement_plans:
+        steps = [step for step in plan if TABLE_STEP.match(step)]
+        assert steps, plan
+        for step in steps:
+            assert step.startswith("SEARCH") and INDEXED.search(step), f"{name}: {' | '.join(plan)}"
+
+
+def test_overlap_check_uses_composite_index(db):
+    plan, = plans(db, lambda: crud.claim_slot(db, 1, LATER, datetime(2030, 1, 1, 21)))
+    assert any("ix_bookings_slot_id_status_start_time (slot_id=? AND status=? AND start_time<?)" in step
+               for step in plan), plan
@@ -0,0 +1,71 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+import crud
+import main
+from database import SessionLocal
+from models import Booking
+from pricing import QuoteBook
+
+
+def test_quote_redeems_for_its_slot_and_user():
+    book = QuoteBook(ttl=60, secret="s")
+    quote = book.quote(7, "a@x", 42.5)
+    assert book.redeem(quote.id, 7, "a@x") == 42.5
+    # Not used up: a failed booking can retry at the same rate
+    assert book.redeem(quote.id, 7, "a@x") == 42.5
+    assert book.redeem(quote.id, 8, "a@x") is None
+    assert book.redeem(quote.id, 7, "b@x") is None
+
+
+def test_quote_valid_on_every_worker_with_the_secret():
+    quote = QuoteBook(secret="shared").quote(7, "a@x", 42.5)
+    assert QuoteBook(secret="shared").redeem(quote.id, 7, "a@x") == 42.5
+    assert QuoteBook(secret="other").redeem(quote.id, 7, "a@x") is None
+
+
+def test_expired_quote_is_refused(monkeypatch):
+    book = QuoteBook(ttl=60, secret="s")
+    quote = book.quote(7, "a@x", 42.5)
+    monkeypatch.setattr(time, "time", lambda: quote.expires_at + 1)
+    assert book.redeem(quote.id, 7, "a@x") is None
+
+
+@pytest.mark.parametrize("quote_id", [None, "", "abc", "1:2", "x:42.5:sig", "9999999999:42.5:sig"])
+def test_malformed_or_forged_quote_is_refused(quote_id):
+    assert QuoteBook(secret="s").redeem(quote_id, 7, "a@x") is None
+
+
+def test_tampered_price_is_refused():
+    book = QuoteBook(ttl=60, secret="s")
+    expires_at, _, signature = book.quote(7, "a@x", 42.5).id.split(":")
+    assert book.redeem(f"{expires_at}:1.0:{signature}", 7, "a@x") is None
+
+
+def test_booking_charges_the_quoted_rate(make_slots):
+    quoted, foreign = make_slots(2, zone="Q")
+    crud.notify_inventory_changed()
+    start = (datetime.utcnow() + timedelta(days=3)).isoformat()
+    with TestClient(main.app) as client:
+        client.post("/login", data={"email": "q@x", "name": "Q"}, follow_redirects=False)
+        quote = client.post(f"/api/slots/{quoted}/quote").json()
+        assert quote["slot_id"] == quoted and quote["valid_for"] > 0
+        # Rates the pricing engine would not come up with by itself
+        held = main.quote_book.quote(quoted, "q@x", 12.25).id
+        other_users = main.quote_book.quote(foreign, "someone@else", 0.5).id
+
+        ids = []
+        for slot_id, quote_id in ((quoted, held), (foreign, other_users)):
+            response = client.post(f"/booking/{slot_id}", data={
+                "user_name": "Q", "start_time": start, "quote_id": quote_id,
+            }, follow_redirects=False)
+            assert response.status_code == 303
+            ids.append(int(response.headers["location"].rsplit("/", 1)[1]))
+
+    with SessionLocal() as db:
+        charged, unquoted = (db.get(Booking, booking_id).price_per_hour for booking_id in ids)
+    assert charged == 12.25
+    assert unquoted not in (None, 0.5)
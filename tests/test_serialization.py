@@ -0,0 +1,39 @@
+from datetime import date, datetime
+
+import numpy as np
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+import serialization
+
+CONTENT = {
+    "when": datetime(2030, 1, 7, 9, 30, 0, 123),
+    "day": date(2030, 1, 7),
+    "values": [1, 2.5, None, True, "é"],
+    "nested": {"ids": [1, 2], "empty": {}},
+}
+
+
+@pytest.fixture(params=["orjson", "pydantic"])
+def backend(request, monkeypatch):
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(serialization, "orjson", None)
+    return request.param
+
+
+def test_dumps_matches_fastapi_json(backend):
+    assert serialization.dumps(CONTENT) == JSONResponse(jsonable_encoder(CONTENT)).body
+
+
+def test_dumps_numpy_values_and_int_keys(backend):
+    content = {"count": np.int64(3), "score": np.float32(1.5), "ids": np.arange(2), "by_slot": {7: "A"}}
+    assert serialization.dumps(content) == b'{"count":3,"score":1.5,"ids":[0,1],"by_slot":{"7":"A"}}'
+
+
+def test_fast_json_response(backend):
+    response = serialization.FastJSONResponse([{"id": 1, "at": datetime(2030, 1, 1)}])
+    assert response.body == b'[{"id":1,"at":"2030-01-01T00:00:00"}]'
+    assert response.headers["content-type"] == "application/json"
@@ -0,0 +1,59 @@
+import pytest
+
+from session_store import MemorySessionStore, SessionStore, SQLiteSessionStore
+
+
+def test_session_store_is_abstract():
+    with pytest.raises(TypeError):
+        SessionStore()
+
+
+def test_user_cap_keeps_logged_in_users():
+    store = MemorySessionStore(max_users=2)
+    store.create_user("A", "a@x")
+    session_a = store.create_session("a@x")
+    store.create_user("B", "b@x")
+    store.create_user("C", "c@x")
+
+    # a@x is the oldest but logged in: over the cap rather than logged out
+    assert store.get_session_user(session_a).email == "a@x"
+    assert store.get_user("b@x") is not None
+
+    # Its last session going releases it
+    store.delete_session(session_a)
+    assert store.get_user("a@x") is None
+    store.create_user("D", "d@x")
+    assert [store.get_user(e) is not None for e in ("b@x", "c@x", "d@x")] == [False, True, True]
+
+
+def test_user_cap_may_be_exceeded_by_logged_in_users():
+    store = MemorySessionStore(max_users=1)
+    sessions = []
+    for email in ("a@x", "b@x", "c@x"):
+        store.create_user(email, email)
+        sessions.append(store.create_session(email))
+    assert [store.get_session_user(s).email for s in sessions] == ["a@x", "b@x", "c@x"]
+
+
+def test_expired_and_evicted_sessions_release_their_user():
+    store = MemorySessionStore(ttl=10, max_sessions=2, max_users=1)
+    store.create_user("A", "a@x")
+    old = store.create_session("a@x")
+    store.create_session("a@x")
+    store.create_session("a@x")  # evicts old
+    assert store.get_session_user(old) is None
+    assert store.sweep(now=10**12) == 2
+    store.create_user("B", "b@x")
+    assert store.get_user("a@x") is None
+
+
+@pytest.mark.parametrize("make", [MemorySessionStore, lambda: SQLiteSessionStore(":memory:")])
+def test_session_round_trip(make):
+    store = make()
+    store.create_user("Ann", "ann@x")
+    store.update_user_vehicle("ann@x", "SUV")
+    session_id = store.create_session("ann@x")
+    user = store.get_session_user(session_id)
+    assert (user.name, user.email, user.vehicle_type) == ("Ann", "ann@x", "SUV")
+    store.delete_session(session_id)
+    assert store.get_session_user(session_id) is None
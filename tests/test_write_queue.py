@@ -0,0 +1,28 @@
+import asyncio
+from datetime import datetime
+
+from sqlalchemy import text
+
+import crud
+from database import WriteBusy, WriteQueue
+from schemas import BookingCreate
+
+
+def test_submit_runs_write():
+    queue = WriteQueue(limit=4)
+    assert asyncio.run(queue.submit(lambda db: db.execute(text("select 1")).scalar())) == 1
+
+
+def test_full_queue_raises_write_busy(make_slots):
+    slot_id, = make_slots(1)
+    queue = WriteQueue(limit=2)
+    booking = BookingCreate(slot_id=slot_id, user_name="busy", start_time=datetime.utcnow())
+
+    async def burst():
+        return await asyncio.gather(
+            *(queue.submit(crud.create_booking, booking) for _ in range(5)), return_exceptions=True,
+        )
+
+    results = asyncio.run(burst())
+    assert sum(isinstance(r, WriteBusy) for r in results) == 3
+    assert queue.pending == 0